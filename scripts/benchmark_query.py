@@ -0,0 +1,78 @@
+"""Compare query parsers on large generated queries
+
+Usage: python -m scripts.benchmark_query [--tables N] [--repeat N]
+"""
+
+import argparse
+import timeit
+
+from src.stairlight.query import Query, QueryParser
+
+
+def generate_query(tables: int) -> str:
+    ctes = [
+        f"cte_{i} AS (\n"
+        f"    -- Read PROJECT_X.DATASET_X.TABLE_{i}\n"
+        "    SELECT\n"
+        "        id,\n"
+        f"        EXTRACT(DATE FROM created_at) AS date_{i},\n"
+        f"        'FROM PROJECT_X.DATASET_X.TABLE_{i}' AS source\n"
+        "    FROM\n"
+        f"        PROJECT_X.DATASET_X.TABLE_{i}\n"
+        "    WHERE\n"
+        "        0 = 0\n"
+        ")"
+        for i in range(tables)
+    ]
+    joins = [
+        f"LEFT JOIN cte_{i} ON cte_{i}.id = main.id\n"
+        f"LEFT JOIN PROJECT_Y.DATASET_Y.TABLE_{i} AS y_{i} ON y_{i}.id = main.id"
+        for i in range(tables)
+    ]
+    return (
+        "WITH "
+        + ",\n".join(ctes)
+        + "\nSELECT\n    *\nFROM\n    PROJECT_Z.DATASET_Z.MAIN AS main\n"
+        + "\n".join(joins)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    query_str = generate_query(tables=args.tables)
+    print(f"{len(query_str.splitlines())} lines, {len(query_str)} characters")
+
+    results = {}
+    for query_parser in QueryParser:
+        query = Query(query_str=query_str, parser=query_parser.value)
+        results[query_parser] = list(query.detect_upstair_table_reference())
+        seconds = min(
+            timeit.repeat(
+                lambda: list(query.detect_upstair_table_reference()),
+                repeat=args.repeat,
+                number=1,
+            )
+        )
+        print(
+            f"{query_parser.value:>10}: {seconds:.3f}s, "
+            f"{len(results[query_parser])} lines of references"
+        )
+
+    # Lines may differ, regex takes every line that contains a table name
+    tables = {
+        query_parser: {reference.TableName for reference in references}
+        for query_parser, references in results.items()
+    }
+    for query_parser in QueryParser:
+        others = set().union(*(v for k, v in tables.items() if k != query_parser))
+        only = sorted(tables[query_parser] - others)
+        if only:
+            print(f"Only detected by {query_parser.value}: {only}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from logging import getLogger
+from typing import Any, Callable
+
+from src.stairlight.query import UpstairTableReference
+
+logger = getLogger(__name__)
+
+
+class CacheFile:
+    """A JSON file in a cache directory that keeps entries used in the last run"""
+
+    FILE_NAME = ""
+
+    # Increment it when the format of entries changes
+    VERSION = 1
+
+    def __init__(self, cache_dir: str | None = None) -> None:
+        """A JSON file in a cache directory that keeps entries used in the last run
+
+        Args:
+            cache_dir (str, optional):
+                A directory where the cache file is saved.
+                If it is not set, entries are only kept in memory. Defaults to None.
+        """
+        self.cache_dir = cache_dir
+        self.file = os.path.join(cache_dir, self.FILE_NAME) if cache_dir else None
+        self._entries: dict[str, Any] = {}
+        self._used_entries: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.hits: int = 0
+
+    def load(self) -> None:
+        """Load the cache file if exists"""
+        if not self.file or not os.path.exists(self.file):
+            return
+        try:
+            with open(self.file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load {self.file}, it will be recreated: {e}")
+            return
+        if cache.get("Version") == self.VERSION:
+            self._entries = cache.get("Entries", {})
+
+    def save(self) -> None:
+        """Save entries used in this run, to drop stale entries
+
+        Saved entries are also kept in memory for the next run in the same process.
+        """
+        if self.cache_dir and self.file:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temporary_file = f"{self.file}.tmp"
+            with open(temporary_file, "w") as f:
+                json.dump({"Version": self.VERSION, "Entries": self._used_entries}, f)
+            os.replace(temporary_file, self.file)
+        self._entries = self._used_entries
+        self._used_entries = {}
+
+    def get_entry(self, key: str) -> Any | None:
+        """Get a cached entry and mark it as used
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Any | None: Cached entry, or None if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._used_entries[key] = entry
+            self.hits += 1
+        return entry
+
+    def set_entry(self, key: str, entry: Any) -> None:
+        """Set an entry
+
+        Args:
+            key (str): Cache key
+            entry (Any): Entry to be cached
+        """
+        with self._lock:
+            self._used_entries[key] = entry
+
+
+class ParseCache(CacheFile):
+    """A persistent cache of upstair table references detected in templates"""
+
+    FILE_NAME = "parse_cache.json"
+
+    # Increment it when detection results may change
+    VERSION = 2
+
+    def get(self, key: str) -> list[UpstairTableReference] | None:
+        """Get cached upstair table references
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            list[UpstairTableReference] | None:
+                Upstair table references, or None if not cached
+        """
+        entry = self.get_entry(key=key)
+        if entry is None:
+            return None
+        return [UpstairTableReference(**reference) for reference in entry]
+
+    def set(self, key: str, references: list[UpstairTableReference]) -> None:
+        """Set upstair table references
+
+        Args:
+            key (str): Cache key
+            references (list[UpstairTableReference]): Upstair table references
+        """
+        self.set_entry(key=key, entry=[asdict(reference) for reference in references])
+
+    @staticmethod
+    def create_key(
+        template_type: str,
+        template_fingerprint: str,
+        params: dict[str, Any],
+        ignore_params: list[str] | None,
+        default_table_prefix: str | None,
+        query_parser: str,
+    ) -> str:
+        """Create a cache key from a template and its effective parameters
+
+        Args:
+            template_type (str): Template class name, which decides how to render
+            template_fingerprint (str): A hash of the template string
+            params (dict[str, Any]): Parameters to render the template
+            ignore_params (list[str] | None): Parameters to ignore
+            default_table_prefix (str | None): Default table prefix
+            query_parser (str): Engine to detect upstair tables
+
+        Returns:
+            str: Cache key
+        """
+        attributes = json.dumps(
+            [
+                template_type,
+                template_fingerprint,
+                params,
+                ignore_params,
+                default_table_prefix,
+                query_parser,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(attributes.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class FileManifestEntry:
+    MTime: int
+    Size: int
+    Hash: str
+    Parameters: list[str]
+
+
+class FileManifest(CacheFile):
+    """A persistent manifest of template files in local file system
+
+    Files whose modification time and size are unchanged since the last run
+    are not read again, their hashes and parameters are taken from the manifest.
+    """
+
+    FILE_NAME = "file_manifest.json"
+
+    def __init__(self, cache_dir: str | None = None) -> None:
+        """A persistent manifest of template files in local file system
+
+        Args:
+            cache_dir (str, optional):
+                A directory where the manifest is saved.
+                If it is not set, entries are only kept in memory. Defaults to None.
+        """
+        super().__init__(cache_dir=cache_dir)
+        self.added: int = 0
+        self.changed: int = 0
+
+    def get(self, path: str, mtime: int, size: int) -> FileManifestEntry | None:
+        """Get a manifest entry of an unchanged file
+
+        Args:
+            path (str): File path
+            mtime (int): Modification time in nanoseconds
+            size (int): File size
+
+        Returns:
+            FileManifestEntry | None:
+                Manifest entry, or None if the file is added or changed
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                self.added += 1
+                return None
+            if entry["MTime"] != mtime or entry["Size"] != size:
+                self.changed += 1
+                return None
+            self._used_entries[path] = entry
+            self.hits += 1
+        return FileManifestEntry(**entry)
+
+    def set(self, path: str, entry: FileManifestEntry) -> None:
+        """Set a manifest entry
+
+        Args:
+            path (str): File path
+            entry (FileManifestEntry): Manifest entry
+        """
+        self.set_entry(key=path, entry=asdict(entry))
+
+    def save(self) -> None:
+        """Save entries of files found in this run, to drop deleted files"""
+        deleted = len(self._entries.keys() - self._used_entries.keys())
+        unchanged = len(self._used_entries) - self.added - self.changed
+        logger.info(
+            f"Template files: {unchanged} unchanged, {self.added} added, "
+            f"{self.changed} changed, {deleted} deleted"
+        )
+        super().save()
+        self.added = 0
+        self.changed = 0
+
+
+@dataclass
+class ObjectManifestEntry:
+    Validator: str
+    Hash: str
+    Parameters: list[str]
+
+
+class ObjectManifest(CacheFile):
+    """A persistent manifest of template objects in GCS and S3
+
+    Objects whose validators, generations in GCS and ETags in S3, are unchanged
+    since the last run are not downloaded again, their hashes and parameters
+    are taken from the manifest.
+    """
+
+    FILE_NAME = "object_manifest.json"
+
+    def __init__(self, cache_dir: str | None = None) -> None:
+        """A persistent manifest of template objects in GCS and S3
+
+        Args:
+            cache_dir (str, optional):
+                A directory where the manifest is saved.
+                If it is not set, entries are only kept in memory. Defaults to None.
+        """
+        super().__init__(cache_dir=cache_dir)
+        self.added: int = 0
+        self.changed: int = 0
+
+    def get(self, uri: str, validator: str) -> ObjectManifestEntry | None:
+        """Get a manifest entry of an unchanged object
+
+        Args:
+            uri (str): Object URI
+            validator (str): Validator given by listing objects
+
+        Returns:
+            ObjectManifestEntry | None:
+                Manifest entry, or None if the object is added or changed
+        """
+        with self._lock:
+            entry = self._entries.get(uri)
+            if entry is None:
+                self.added += 1
+                return None
+            if entry["Validator"] != validator:
+                self.changed += 1
+                return None
+            self._used_entries[uri] = entry
+            self.hits += 1
+        return ObjectManifestEntry(**entry)
+
+    def set(self, uri: str, entry: ObjectManifestEntry) -> None:
+        """Set a manifest entry
+
+        Args:
+            uri (str): Object URI
+            entry (ObjectManifestEntry): Manifest entry
+        """
+        self.set_entry(key=uri, entry=asdict(entry))
+
+    def save(self) -> None:
+        """Save entries of objects found in this run, to drop deleted objects"""
+        deleted = len(self._entries.keys() - self._used_entries.keys())
+        unchanged = len(self._used_entries) - self.added - self.changed
+        logger.info(
+            f"Template objects: {unchanged} unchanged, {self.added} added, "
+            f"{self.changed} changed, {deleted} deleted"
+        )
+        super().save()
+        self.added = 0
+        self.changed = 0
+
+
+@dataclass
+class RedashSyncState:
+    UpdatedAt: str | None
+    Queries: dict[str, list[Any]]
+
+
+class RedashSyncManifest(CacheFile):
+    """A persistent copy of Redash queries, to fetch only updated ones
+
+    Each entry keeps queries found by a Redash include and the maximum
+    updated_at of them, which is a watermark of the next fetch.
+    """
+
+    FILE_NAME = "redash_sync.json"
+
+    def get(self, key: str) -> RedashSyncState | None:
+        """Get a synchronized state
+
+        Args:
+            key (str): A key that identifies a Redash include
+
+        Returns:
+            RedashSyncState | None: Synchronized state, or None if not synchronized
+        """
+        entry = self.get_entry(key=key)
+        if entry is None:
+            return None
+        return RedashSyncState(**entry)
+
+    def set(self, key: str, state: RedashSyncState) -> None:
+        """Set a synchronized state
+
+        Args:
+            key (str): A key that identifies a Redash include
+            state (RedashSyncState): Synchronized state
+        """
+        self.set_entry(key=key, entry=asdict(state))
+
+
+class TemplateBodyCache:
+    """An in-memory cache of template strings, kept while a map is built
+
+    Templates read their strings several times, to find parameters,
+    to create a cache key and to render a query for each mapped table.
+    Strings are kept here so that each template is read only once.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """An in-memory cache of template strings, kept while a map is built
+
+        Args:
+            max_size (int):
+                The maximum total length of cached strings.
+                The least recently used strings are evicted over it.
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._size: int = 0
+        self._lock = threading.Lock()
+        self.fetches: int = 0
+        self.hits: int = 0
+        self.evictions: int = 0
+
+    def get(self, key: str, fetch: Callable[[], str]) -> str:
+        """Get a cached template string, or fetch and cache it
+
+        Args:
+            key (str): Cache key that identifies a template
+            fetch (Callable[[], str]): A function to read a template string
+
+        Returns:
+            str: Template string
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        template_str = fetch()
+        with self._lock:
+            self.fetches += 1
+            if key in self._entries or len(template_str) > self.max_size:
+                return template_str
+            self._entries[key] = template_str
+            self._size += len(template_str)
+            while self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+        return template_str
+
+    def clear(self) -> None:
+        """Log a summary and drop all cached strings"""
+        logger.info(
+            f"Template bodies: {self.fetches} fetched, "
+            f"{self.hits} fetches avoided, {self.evictions} evicted"
+        )
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.fetches = 0
+            self.hits = 0
+            self.evictions = 0
@@ -3,10 +3,12 @@ from __future__ import annotations
 import argparse
 import json
 import textwrap
-from typing import Any, Callable
+from typing import Any
 
 from src import stairlight
 from src.stairlight.map import MappedTemplate
+from src.stairlight.query import QueryParser
+from src.stairlight.stairlight import SearchDirection
 
 
 def command_init(stairlight: stairlight.StairLight, args: argparse.Namespace) -> str:
@@ -68,9 +70,10 @@ def command_up(
         dict[str, Any] | list[dict[str, Any]]: Upstairs results
     """
     return search(
-        func=stairlight.up,
+        stairlight=stairlight,
         args=args,
         tables=find_tables_to_search(stairlight=stairlight, args=args),
+        direction=SearchDirection.UP,
     )
 
 
@@ -87,37 +90,83 @@ def command_down(
         dict[str, Any] | list[dict[str, Any]]: Downstairs results
     """
     return search(
-        func=stairlight.down,
+        stairlight=stairlight,
         args=args,
         tables=find_tables_to_search(stairlight=stairlight, args=args),
+        direction=SearchDirection.DOWN,
     )
 
 
+def command_watch(stairlight: stairlight.StairLight, args: argparse.Namespace) -> str:
+    """Execute watch command
+
+    Args:
+        stairlight (StairLight): Stairlight class
+        args (argparse.Namespace): CLI arguments
+
+    Returns:
+        str: return messages
+    """
+    try:
+        for changes in stairlight.watch(interval=args.interval, debounce=args.debounce):
+            if not args.quiet:
+                print(f"Map updated, {len(changes)} files changed", flush=True)
+    except KeyboardInterrupt:
+        pass
+    return ""
+
+
+def command_serve(stairlight: stairlight.StairLight, args: argparse.Namespace) -> str:
+    """Execute serve command
+
+    Args:
+        stairlight (StairLight): Stairlight class
+        args (argparse.Namespace): CLI arguments
+
+    Returns:
+        str: return messages
+    """
+    from src.stairlight.server import create_server, serve
+
+    server = create_server(
+        stairlight=stairlight,
+        host=args.host,
+        port=args.port,
+        socket_path=args.socket,
+    )
+    if not args.quiet:
+        print(f"Serving on {server.server_address}", flush=True)
+    serve(server=server)
+    return ""
+
+
 def search(
-    func: Callable, args: argparse.Namespace, tables: str | list[str]
+    stairlight: stairlight.StairLight,
+    args: argparse.Namespace,
+    tables: list[str],
+    direction: SearchDirection,
 ) -> dict[str, Any] | list[dict[str, Any]]:
-    """Search tables by executing stairlight.up() or stairlight.down()
+    """Search tables at once by executing stairlight.search_many()
 
     Args:
-        func (Callable): Either stairlight.up() or stairlight.down()
+        stairlight (StairLight): Stairlight class
         args (argparse.Namespace): CLI arguments
-        tables (str | list[str]): Tables to search
+        tables (list[str]): Tables to search
+        direction (SearchDirection): Search direction
 
     Returns:
         dict[str, Any] | list[dict[str, Any]]: Results
     """
-    results = []
-    for table_name in tables:
-        result = func(
-            table_name=table_name,
-            recursive=args.recursive,
-            verbose=args.verbose,
-            response_type=args.output,
-        )
-        if len(tables) > 1:
-            results.append(result)
-        else:
-            return result
+    search_results = stairlight.search_many(
+        table_names=tables,
+        recursive=args.recursive,
+        verbose=args.verbose,
+        response_type=args.output,
+        direction=direction,
+    )
+    results: list[Any] = [search_results.results[table_name] for table_name in tables]
+    if len(results) == 1:
+        return results[0]
     return results
 
 
@@ -171,11 +220,12 @@ def set_general_parser(parser: argparse.ArgumentParser) -> None:
     )
 
 
-def set_save_load_parser(parser: argparse.ArgumentParser) -> None:
-    """Set arguments, '--save' and '--load'
+def set_save_parser(parser: argparse.ArgumentParser, default: Any = None) -> None:
+    """Set an argument, '--save'
 
     Args:
         parser (argparse.ArgumentParser): ArgumentParser
+        default (Any, optional): Default value. Defaults to None.
     """
     parser.add_argument(
         "--save",
@@ -186,8 +236,17 @@ def set_save_load_parser(parser: argparse.ArgumentParser) -> None:
         """
         ),
         type=str,
-        default=None,
+        default=default,
     )
+
+
+def set_save_load_parser(parser: argparse.ArgumentParser) -> None:
+    """Set arguments, '--save' and '--load'
+
+    Args:
+        parser (argparse.ArgumentParser): ArgumentParser
+    """
+    set_save_parser(parser=parser)
     parser.add_argument(
         "--load",
         help=textwrap.dedent(
@@ -201,6 +260,93 @@ def set_save_load_parser(parser: argparse.ArgumentParser) -> None:
     )
 
 
+def set_map_parser(parser: argparse.ArgumentParser) -> None:
+    """Set arguments about creating a map
+
+    Args:
+        parser (argparse.ArgumentParser): ArgumentParser
+    """
+    parser.add_argument(
+        "--max-workers",
+        help=textwrap.dedent(
+            """\
+            The number of threads to read and parse templates concurrently.
+            It overrides MaxWorkers in the settings section.
+        """
+        ),
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--max-processes",
+        help=textwrap.dedent(
+            """\
+            The number of processes to parse queries.
+            It overrides MaxProcesses in the settings section.
+        """
+        ),
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--max-downloads",
+        help=textwrap.dedent(
+            """\
+            The number of threads to download templates from GCS and S3.
+            It overrides MaxDownloads in the settings section.
+        """
+        ),
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--max-dbt-compiles",
+        help=textwrap.dedent(
+            """\
+            The number of dbt projects compiled concurrently.
+            It overrides MaxDbtCompiles in the settings section.
+        """
+        ),
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=textwrap.dedent(
+            """\
+            A directory to cache parsed results and manifests of
+            template files and objects across runs.
+            It overrides CacheDir in the settings section.
+        """
+        ),
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--query-parser",
+        help=textwrap.dedent(
+            """\
+            Engine to detect upstair tables in queries.
+            It overrides QueryParser in the settings section.
+        """
+        ),
+        type=str,
+        choices=[query_parser.value for query_parser in QueryParser],
+        default=None,
+    )
+    parser.add_argument(
+        "--dbt-no-compile",
+        help=textwrap.dedent(
+            """\
+            Read compiled files of dbt projects without executing dbt compile.
+            It overrides DbtNoCompile in the settings section.
+        """
+        ),
+        action="store_true",
+        default=False,
+    )
+
+
 def set_search_parser(parser: argparse.ArgumentParser) -> None:
     """Set arguments used by up and down
 
@@ -248,6 +394,57 @@ def set_search_parser(parser: argparse.ArgumentParser) -> None:
     )
 
 
+def set_watch_parser(parser: argparse.ArgumentParser) -> None:
+    """Set arguments used by watch
+
+    Args:
+        parser (argparse.ArgumentParser): ArgumentParser
+    """
+    parser.add_argument(
+        "--interval",
+        help="polling interval in seconds",
+        type=float,
+        default=1.0,
+    )
+    parser.add_argument(
+        "--debounce",
+        help="seconds to wait until files stop changing",
+        type=float,
+        default=0.5,
+    )
+
+
+def set_serve_parser(parser: argparse.ArgumentParser) -> None:
+    """Set arguments used by serve
+
+    Args:
+        parser (argparse.ArgumentParser): ArgumentParser
+    """
+    parser.add_argument(
+        "--host",
+        help="host to listen on",
+        type=str,
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        help="port to listen on",
+        type=int,
+        default=8642,
+    )
+    parser.add_argument(
+        "--socket",
+        help=textwrap.dedent(
+            """\
+            A path of a Unix socket to listen on.
+            If it is set, host and port are ignored.
+        """
+        ),
+        type=str,
+        default=None,
+    )
+
+
 def set_output_parser(parser: argparse.ArgumentParser) -> None:
     """Set arguments about outputs
 
@@ -282,6 +479,7 @@ def create_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="Stairlight", description=description)
     set_general_parser(parser=parser)
     set_save_load_parser(parser=parser)
+    set_map_parser(parser=parser)
 
     subparsers = parser.add_subparsers()
 
@@ -303,12 +501,14 @@ def create_parser() -> argparse.ArgumentParser:
     )
     parser_check.set_defaults(handler=command_check)
     set_general_parser(parser=parser_check)
+    set_map_parser(parser=parser_check)
 
     # list
     parser_list = subparsers.add_parser("list", help="return all ( tables | URIs )")
     parser_list.set_defaults(handler=command_list)
     set_general_parser(parser=parser_list)
     set_save_load_parser(parser=parser_list)
+    set_map_parser(parser=parser_list)
     set_output_parser(parser=parser_list)
 
     # up
@@ -316,6 +516,7 @@ def create_parser() -> argparse.ArgumentParser:
     parser_up.set_defaults(handler=command_up)
     set_general_parser(parser=parser_up)
     set_save_load_parser(parser=parser_up)
+    set_map_parser(parser=parser_up)
     set_output_parser(parser=parser_up)
     set_search_parser(parser=parser_up)
 
@@ -326,9 +527,31 @@ def create_parser() -> argparse.ArgumentParser:
     parser_down.set_defaults(handler=command_down)
     set_general_parser(parser=parser_down)
     set_save_load_parser(parser=parser_down)
+    set_map_parser(parser=parser_down)
     set_output_parser(parser=parser_down)
     set_search_parser(parser=parser_down)
 
+    # watch
+    parser_watch = subparsers.add_parser(
+        "watch", help="keep a map up to date while templates change"
+    )
+    parser_watch.set_defaults(handler=command_watch)
+    set_general_parser(parser=parser_watch)
+    # Keep '--save' set before the subcommand, the map is saved on each rebuild
+    set_save_parser(parser=parser_watch, default=argparse.SUPPRESS)
+    set_map_parser(parser=parser_watch)
+    set_watch_parser(parser=parser_watch)
+
+    # serve
+    parser_serve = subparsers.add_parser(
+        "serve", help="answer list, up and down requests as a JSON API"
+    )
+    parser_serve.set_defaults(handler=command_serve)
+    set_general_parser(parser=parser_serve)
+    set_save_load_parser(parser=parser_serve)
+    set_map_parser(parser=parser_serve)
+    set_serve_parser(parser=parser_serve)
+
     return parser
 
 
@@ -337,7 +560,17 @@ def main() -> None:
     parser = create_parser()
     args = parser.parse_args()
     _stairlight = stairlight.StairLight(
-        config_dir=args.config, load_files=args.load, save_file=args.save
+        config_dir=args.config,
+        load_files=args.load,
+        save_file=args.save,
+        max_workers=args.max_workers,
+        max_processes=args.max_processes,
+        max_downloads=args.max_downloads,
+        max_dbt_compiles=args.max_dbt_compiles,
+        cache_dir=args.cache_dir,
+        query_parser=args.query_parser,
+        dbt_no_compile=args.dbt_no_compile,
+        keep_caches=getattr(args, "handler", None) == command_watch,
     )
     _stairlight.create_map()
 
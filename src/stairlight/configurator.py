@@ -42,6 +42,8 @@ class Configurator:
             dir (str): A directory that Configuration files exists.
         """
         self.dir = dir
+        # Configuration files that have been read, to be watched
+        self.read_files: set[str] = set()
 
     def read_stairlight(self, prefix: str) -> StairlightConfig:
         """Read stairlight configurations from yaml
@@ -85,12 +87,13 @@ class Configurator:
             dict: configurations
         """
         results: dict[str, Any] = {}
-        pattern = regex or rf"^{self.dir}/{prefix}\.ya?ml$"
+        pattern = re.compile(regex or rf"^{self.dir}/{prefix}\.ya?ml$")
         config_files = [
             p
             for p in glob.glob(f"{self.dir}/**", recursive=True)
-            if re.fullmatch(pattern, p)
+            if pattern.fullmatch(p)
         ]
+        self.read_files.update(config_files)
         for config_file in config_files:
             with open(config_file) as file:
                 config = yaml.safe_load(file)
@@ -1,10 +1,25 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import chain, islice
 from logging import getLogger
-from typing import Any, Iterator, OrderedDict, Type
-
-from src.stairlight.query import Query, UpstairTableReference
+from typing import Any, Iterable, Iterator, OrderedDict, Sequence, Type
+
+from src.stairlight.cache import (
+    FileManifest,
+    ObjectManifest,
+    ParseCache,
+    RedashSyncManifest,
+    TemplateBodyCache,
+)
+from src.stairlight.query import (
+    Query,
+    QueryParser,
+    UpstairTableReference,
+    detect_upstair_table_references,
+)
 from src.stairlight.source.config import (
     MappingConfig,
     MappingConfigGlobal,
@@ -43,14 +58,53 @@ class MappedTemplateRedash(MappedTemplate):
     DataSourceType: str | None = None
 
 
+@dataclass
+class ParsedTable:
+    table_attributes: MappingConfigMappingTable
+    unmapped_params: list[str]
+    query: Query | None = None
+    cache_key: str | None = None
+    upstair_table_references: list[UpstairTableReference] = field(default_factory=list)
+
+
+@dataclass
+class ParsedTemplate:
+    template: Template
+    mapped: bool
+    unmapped_params: list[str] = field(default_factory=list)
+    tables: list[ParsedTable] = field(default_factory=list)
+
+
 class Map:
     """Manages functions related to dependency map objects"""
 
+    # The number of templates sent to a worker process at once
+    PARSING_CHUNK_SIZE = 64
+
+    # The maximum total length of template strings kept while a map is built
+    TEMPLATE_BODY_CACHE_SIZE = 64 * 1024 * 1024
+
+    # Sources that download templates, and can download them concurrently
+    DOWNLOADING_SOURCE_TYPES = (
+        TemplateSourceType.GCS.value,
+        TemplateSourceType.S3.value,
+    )
+
     def __init__(
         self,
         stairlight_config: StairlightConfig,
         mapping_config: MappingConfig,
         mapped: dict[str, dict[str, list[MappedTemplate]] | None] | None = None,
+        max_workers: int = 1,
+        max_processes: int = 1,
+        max_downloads: int = 1,
+        max_dbt_compiles: int = 1,
+        parse_cache: ParseCache | None = None,
+        file_manifest: FileManifest | None = None,
+        object_manifest: ObjectManifest | None = None,
+        redash_sync_manifest: RedashSyncManifest | None = None,
+        query_parser: str = QueryParser.REGEX.value,
+        dbt_no_compile: bool = False,
     ) -> None:
         """Manages functions related to dependency map objects
 
@@ -60,6 +114,43 @@ class Map:
                 Mapping configurations.
             mapped (dict[str, Any], optional):
                 Mapped templates. Defaults to None.
+            max_workers (int, optional):
+                The number of threads to read and parse templates concurrently.
+                Defaults to 1.
+            max_processes (int, optional):
+                The number of processes to parse rendered queries.
+                If it is more than one, parsing is moved to a process pool.
+                Defaults to 1.
+            max_downloads (int, optional):
+                The number of threads to download templates from GCS and S3.
+                If it is more than one, templates are downloaded while
+                they are listed. Defaults to 1.
+            max_dbt_compiles (int, optional):
+                The number of dbt projects compiled concurrently.
+                If it is more than one, all the projects are compiled
+                before templates are searched. Defaults to 1.
+            parse_cache (ParseCache, optional):
+                A cache of parsed results. If it is set, templates whose contents
+                and parameters are unchanged are not rendered and parsed again.
+                Defaults to None.
+            file_manifest (FileManifest, optional):
+                A manifest of template files. If it is set, files in local file
+                system are not read again unless they are added or changed.
+                Defaults to None.
+            object_manifest (ObjectManifest, optional):
+                A manifest of template objects. If it is set, objects in GCS and S3
+                are not downloaded again unless their validators are changed.
+                Defaults to None.
+            redash_sync_manifest (RedashSyncManifest, optional):
+                A copy of Redash queries. If it is set, Redash includes whose
+                Incremental is true fetch only queries updated since the last run.
+                Defaults to None.
+            query_parser (str, optional):
+                Engine to detect upstair tables, "regex" or "tokenizer".
+                Defaults to "regex".
+            dbt_no_compile (bool, optional):
+                Read compiled files of dbt projects without executing dbt compile.
+                Defaults to False.
         """
         if mapped:
             self.mapped = mapped
@@ -68,15 +159,44 @@ class Map:
         self.unmapped: list[dict] = []
         self._stairlight_config = stairlight_config
         self._mapping_config = mapping_config
+        self.max_workers = max_workers
+        self.max_processes = max_processes
+        self.max_downloads = max_downloads
+        self.max_dbt_compiles = max_dbt_compiles
+        self.parse_cache = parse_cache
+        self.file_manifest = file_manifest
+        self.object_manifest = object_manifest
+        self.redash_sync_manifest = redash_sync_manifest
+        self.query_parser = query_parser
+        self.dbt_no_compile = dbt_no_compile
+        self.template_body_cache = TemplateBodyCache(
+            max_size=self.TEMPLATE_BODY_CACHE_SIZE
+        )
 
     def write(self) -> None:
         """Write a dependency map"""
-        template_source: TemplateSource
-        for template_source in self.find_template_source():
-            self.write_by_template_source(template_source=template_source)
+        template_sources: Iterable[TemplateSource] = self.find_template_source()
+        if self.max_dbt_compiles > 1:
+            template_sources = list(template_sources)
+            self.prepare_template_sources(template_sources=template_sources)
+
+        templates: Iterator[Template] = chain.from_iterable(
+            template_source.search_templates() for template_source in template_sources
+        )
+        self.write_by_templates(templates=templates)
 
         self.mapped = {k: v for k, v in self.mapped.items() if v}
 
+        self.template_body_cache.clear()
+        if self.parse_cache:
+            self.parse_cache.save()
+        if self.file_manifest:
+            self.file_manifest.save()
+        if self.object_manifest:
+            self.object_manifest.save()
+        if self.redash_sync_manifest:
+            self.redash_sync_manifest.save()
+
     def find_template_source(self) -> Iterator[TemplateSource]:
         """find template source
 
@@ -90,64 +210,310 @@ class Map:
             if not template_source:
                 logger.warning(msg=f"Template source is not found: {type}")
                 continue
+            options: dict[str, Any] = {"include": include}
+            if (
+                include.TemplateSourceType == TemplateSourceType.FILE.value
+                and self.file_manifest
+            ):
+                options["manifest"] = self.file_manifest
+            elif include.TemplateSourceType in self.DOWNLOADING_SOURCE_TYPES:
+                options["max_downloads"] = self.max_downloads
+                if self.object_manifest:
+                    options["manifest"] = self.object_manifest
+            elif (
+                include.TemplateSourceType == TemplateSourceType.REDASH.value
+                and self.redash_sync_manifest
+            ):
+                options["manifest"] = self.redash_sync_manifest
+            elif include.TemplateSourceType == TemplateSourceType.DBT.value:
+                options["no_compile"] = self.dbt_no_compile
             yield template_source(
                 stairlight_config=self._stairlight_config,
                 mapping_config=self._mapping_config,
-                **{"include": include},
+                **options,
             )
 
+    def prepare_template_sources(
+        self, template_sources: Sequence[TemplateSource]
+    ) -> None:
+        """Prepare template sources concurrently, to compile dbt projects at once
+
+        Args:
+            template_sources (Sequence[TemplateSource]): Template sources
+        """
+        with ThreadPoolExecutor(max_workers=self.max_dbt_compiles) as executor:
+            futures = [
+                executor.submit(template_source.prepare)
+                for template_source in template_sources
+            ]
+            for future in futures:
+                future.result()
+
     def write_by_template_source(self, template_source: TemplateSource) -> None:
         """Write a dependency map by template source
 
         Args:
             template_source (TemplateSource): Template source
         """
-        for template in template_source.search_templates():
-            if not self._mapping_config or not template.mapped:
-                self.add_unmapped_params(template=template)
+        self.write_by_templates(templates=template_source.search_templates())
+
+    def write_by_templates(self, templates: Iterable[Template]) -> None:
+        """Write a dependency map by templates
+
+        Args:
+            templates (Iterable[Template]): Query templates
+        """
+        for parsed_template in self.parse_templates(templates=templates):
+            template = parsed_template.template
+            if not parsed_template.mapped:
+                self.add_unmapped_params(
+                    template=template, params=parsed_template.unmapped_params
+                )
                 continue
 
-            for table_attributes in template.find_mapped_table_attributes():
-                unmapped_params = self.detect_unmapped_params(
+            for parsed_table in parsed_template.tables:
+                if self.parse_cache and parsed_table.cache_key and parsed_table.query:
+                    self.parse_cache.set(
+                        key=parsed_table.cache_key,
+                        references=parsed_table.upstair_table_references,
+                    )
+                if parsed_table.unmapped_params:
+                    self.add_unmapped_params(
+                        template=template, params=parsed_table.unmapped_params
+                    )
+                self.remap(
+                    template=template,
+                    table_attributes=parsed_table.table_attributes,
+                    upstair_table_references=parsed_table.upstair_table_references,
+                )
+
+    def parse_templates(
+        self, templates: Iterable[Template]
+    ) -> Iterator[ParsedTemplate]:
+        """Parse templates
+
+        Parsed templates are yielded in the same order as templates,
+        so that the dependency map is the same as the one written serially.
+
+        Args:
+            templates (Iterable[Template]): Query templates
+
+        Yields:
+            Iterator[ParsedTemplate]: Parsed templates
+        """
+        parsed_templates = self.read_templates(templates=templates)
+        if self.max_processes <= 1:
+            yield from parsed_templates
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_processes) as executor:
+            chunks: deque[
+                tuple[
+                    list[ParsedTemplate],
+                    list[ParsedTable],
+                    Future[list[list[UpstairTableReference]]],
+                ]
+            ] = deque()
+            while True:
+                parsed_chunk = list(islice(parsed_templates, self.PARSING_CHUNK_SIZE))
+                if parsed_chunk:
+                    parsed_tables = [
+                        parsed_table
+                        for parsed_template in parsed_chunk
+                        for parsed_table in parsed_template.tables
+                        if parsed_table.query
+                    ]
+                    future = executor.submit(
+                        detect_upstair_table_references,
+                        [parsed_table.query for parsed_table in parsed_tables],
+                    )
+                    chunks.append((parsed_chunk, parsed_tables, future))
+
+                # Keep chunks in flight while the next templates are read
+                while chunks and (
+                    not parsed_chunk or len(chunks) >= self.max_processes * 2
+                ):
+                    parsed_templates_done, parsed_tables, future = chunks.popleft()
+                    for parsed_table, upstair_table_references in zip(
+                        parsed_tables, future.result()
+                    ):
+                        parsed_table.upstair_table_references = upstair_table_references
+                    yield from parsed_templates_done
+
+                if not parsed_chunk:
+                    break
+
+    def read_templates(self, templates: Iterable[Template]) -> Iterator[ParsedTemplate]:
+        """Read templates, in a thread pool if max_workers is more than one
+
+        Args:
+            templates (Iterable[Template]): Query templates
+
+        Yields:
+            Iterator[ParsedTemplate]: Parsed templates in the order of templates
+        """
+        if self.max_workers <= 1:
+            for template in templates:
+                yield self.parse_template(template=template)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures: deque[Future[ParsedTemplate]] = deque()
+            for template in templates:
+                futures.append(executor.submit(self.parse_template, template))
+                if len(futures) >= self.max_workers * 2:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+
+    def parse_template(self, template: Template) -> ParsedTemplate:
+        """Read a template and detect upstair tables of each mapped table
+
+        It does not change the dependency map, so it can be called concurrently.
+        If max_processes is more than one, queries are only rendered
+        to be parsed in a process pool.
+
+        Args:
+            template (Template): Query template
+
+        Returns:
+            ParsedTemplate: Parsed template
+        """
+        template.body_cache = self.template_body_cache
+        if not self._mapping_config or not template.mapped:
+            return ParsedTemplate(
+                template=template,
+                mapped=False,
+                unmapped_params=template.find_jinja_params(),
+            )
+
+        parsed_template = ParsedTemplate(template=template, mapped=True)
+        for table_attributes in template.find_mapped_table_attributes():
+            parsed_table = ParsedTable(
+                table_attributes=table_attributes,
+                unmapped_params=self.detect_unmapped_params(
+                    template=template, table_attributes=table_attributes
+                ),
+            )
+            parsed_template.tables.append(parsed_table)
+
+            cached_references: list[UpstairTableReference] | None = None
+            if self.parse_cache:
+                parsed_table.cache_key = self.create_cache_key(
                     template=template, table_attributes=table_attributes
                 )
-                if unmapped_params:
-                    self.add_unmapped_params(template=template, params=unmapped_params)
-                self.remap(template=template, table_attributes=table_attributes)
+                cached_references = self.parse_cache.get(key=parsed_table.cache_key)
+            if cached_references is not None:
+                parsed_table.upstair_table_references = cached_references
+                continue
 
-    def remap(
+            parsed_table.query = self.create_query(
+                template=template, table_attributes=table_attributes
+            )
+            if self.max_processes <= 1:
+                parsed_table.upstair_table_references = list(
+                    parsed_table.query.detect_upstair_table_reference()
+                )
+        return parsed_template
+
+    def create_cache_key(
         self, template: Template, table_attributes: MappingConfigMappingTable
-    ) -> None:
-        """Remap a dependency map
+    ) -> str:
+        """Create a key of the parse cache
 
         Args:
             template (Template): Query template
             table_attributes (MappingConfigMappingTable):
                 Table attributes from mapping configuration
+
+        Returns:
+            str: Cache key
         """
-        current_floor_name: str = table_attributes.TableName
-        current_floor_label: dict[str, Any] = table_attributes.Labels
-        if self._mapping_config:
-            extra_labels: list[dict[str, Any]] = self._mapping_config.ExtraLabels or []
+        return ParseCache.create_key(
+            template_type=type(template).__name__,
+            template_fingerprint=template.get_template_fingerprint(),
+            params=self.merge_global_params(
+                table_attributes=table_attributes,
+                global_params=self.get_global_params(),
+            ),
+            ignore_params=table_attributes.IgnoreParameters,
+            default_table_prefix=template.default_table_prefix,
+            query_parser=self.query_parser,
+        )
 
-        current_floor_map: dict[str, Any] = self.mapped.get(current_floor_name) or {}
-        if not current_floor_map:
-            self.mapped[current_floor_name] = {}
+    def create_query(
+        self, template: Template, table_attributes: MappingConfigMappingTable
+    ) -> Query:
+        """Render a query from a template
 
+        Args:
+            template (Template): Query template
+            table_attributes (MappingConfigMappingTable):
+                Table attributes from mapping configuration
+
+        Returns:
+            Query: Rendered query
+        """
         global_params: dict[str, Any] = self.get_global_params()
         params = self.merge_global_params(
             table_attributes=table_attributes, global_params=global_params
         )
-        query = Query(
+        return Query(
             query_str=template.render(
                 params=params,
                 ignore_params=table_attributes.IgnoreParameters,
             ),
             default_table_prefix=template.default_table_prefix,
+            parser=self.query_parser,
         )
 
+    def detect_upstair_table_references(
+        self, template: Template, table_attributes: MappingConfigMappingTable
+    ) -> list[UpstairTableReference]:
+        """Render a query and detect upstair table references
+
+        Args:
+            template (Template): Query template
+            table_attributes (MappingConfigMappingTable):
+                Table attributes from mapping configuration
+
+        Returns:
+            list[UpstairTableReference]: Upstair table references
+        """
+        query = self.create_query(template=template, table_attributes=table_attributes)
+        return list(query.detect_upstair_table_reference())
+
+    def remap(
+        self,
+        template: Template,
+        table_attributes: MappingConfigMappingTable,
+        upstair_table_references: list[UpstairTableReference] | None = None,
+    ) -> None:
+        """Remap a dependency map
+
+        Args:
+            template (Template): Query template
+            table_attributes (MappingConfigMappingTable):
+                Table attributes from mapping configuration
+            upstair_table_references (list[UpstairTableReference], optional):
+                Upstair table references detected in advance. Defaults to None.
+        """
+        current_floor_name: str = table_attributes.TableName
+        current_floor_label: dict[str, Any] = table_attributes.Labels
+        if self._mapping_config:
+            extra_labels: list[dict[str, Any]] = self._mapping_config.ExtraLabels or []
+
+        current_floor_map: dict[str, Any] = self.mapped.get(current_floor_name) or {}
+        if not current_floor_map:
+            self.mapped[current_floor_name] = {}
+
+        if upstair_table_references is None:
+            upstair_table_references = self.detect_upstair_table_references(
+                template=template, table_attributes=table_attributes
+            )
+
         upstair_table_reference: UpstairTableReference
-        for upstair_table_reference in query.detect_upstair_table_reference():
+        for upstair_table_reference in upstair_table_references:
             upstair = Stair(
                 name=upstair_table_reference.TableName,
                 mapped_templates=current_floor_map.get(
@@ -290,9 +656,8 @@ class Map:
             template (Template): Query template
             params (list[str], optional): Jinja parameters
         """
-        if not params:
-            template_str = template.get_template_str()
-            params = template.get_jinja_params(template_str=template_str)
+        if params is None:
+            params = template.find_jinja_params()
         self.unmapped.append(
             {
                 MapKey.TEMPLATE: template,
@@ -313,8 +678,7 @@ class Map:
         Returns:
             list[str]: Unmapped parameters
         """
-        template_str: str = template.get_template_str()
-        template_params: list[str] = template.get_jinja_params(template_str)
+        template_params: list[str] = template.find_jinja_params()
         if not template_params:
             return []
 
@@ -1,9 +1,39 @@
 from __future__ import annotations
 
+import enum
 import re
+from collections import defaultdict
 from dataclasses import asdict, dataclass
 from typing import Iterator
 
+COMMENT_PATTERN = re.compile(r"\-\-.*\n")
+CTE_PATTERN = re.compile(r"(?:with|,)\s*(\w+)\s+as\s*", re.IGNORECASE)
+MAIN_PATTERN = re.compile(r"select", re.IGNORECASE)
+MAIN_AFTER_CTE_PATTERN = re.compile(r"\)[;\s]*select", re.IGNORECASE)
+TABLE_PATTERN = re.compile(r"\s(?:from|join)\s+([`.\-\w]+)", re.IGNORECASE)
+BQ_EXTRACT_PATTERN = re.compile(r"(?:EXTRACT\(.+ FROM)\s+([`.\-\w]+)", re.IGNORECASE)
+
+# Comments and strings are matched first, so that words in them are not names
+SQL_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+    |(?P<string>'(?:[^'\\]+|\\.)*'?|"(?:[^"\\]+|\\.)*"?)
+    |(?P<name>(?:`[^`\n]*`|\w+|-(?!-)|\.)+)
+    |(?P<symbol>\S)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+class QueryParser(enum.Enum):
+    """Enum: Engine to detect upstair tables in a query"""
+
+    REGEX = "regex"
+    TOKENIZER = "tokenizer"
+
+    def __str__(self):
+        return self.name
+
 
 @dataclass
 class UpstairTableReference:
@@ -20,7 +50,12 @@ class UpstairTableReferenceLine:
 class Query:
     """SQL query"""
 
-    def __init__(self, query_str: str, default_table_prefix: str = None) -> None:
+    def __init__(
+        self,
+        query_str: str,
+        default_table_prefix: str = None,
+        parser: str = QueryParser.REGEX.value,
+    ) -> None:
         """SQL query
 
         Args:
@@ -28,9 +63,13 @@ class Query:
             default_table_prefix (str, optional):
                 If project or dataset that configured table have are omitted,
                 it will be complement this prefix. Defaults to None.
+            parser (str, optional):
+                Engine to detect upstair tables, "regex" or "tokenizer".
+                Defaults to "regex".
         """
         self.query_str = query_str
         self.default_table_prefix = default_table_prefix
+        self.parser = QueryParser(parser).value
 
     def detect_upstair_table_reference(self) -> Iterator[UpstairTableReference]:
         """Parse a query statement and detect a upstream table reference
@@ -38,35 +77,58 @@ class Query:
         Yields:
             Iterator[UpstairsResults]: upstream table results
         """
-        upstairs_tables = self.parse_and_get_upstairs_tables()
+        if self.parser == QueryParser.TOKENIZER.value:
+            line_numbers = self.tokenize_and_get_upstairs_tables()
+        else:
+            line_numbers = self.find_line_numbers(
+                upstairs_tables=self.parse_and_get_upstairs_tables()
+            )
 
-        for upstairs_table in upstairs_tables:
-            line_indexes = [
-                i
-                for i, line in enumerate(self.query_str.splitlines())
-                if upstairs_table in line
-                and "--" not in line.split(upstairs_table)[0]  # exclude comments
-            ]
-
-            for line_index in line_indexes:
-                table_name = (
-                    solve_table_prefix(
-                        table=upstairs_table,
-                        default_table_prefix=self.default_table_prefix,
-                    )
-                    if self.default_table_prefix
-                    else upstairs_table
+        lines = self.query_str.splitlines()
+        for upstairs_table in sorted(line_numbers):
+            table_name = (
+                solve_table_prefix(
+                    table=upstairs_table,
+                    default_table_prefix=self.default_table_prefix,
                 )
+                if self.default_table_prefix
+                else upstairs_table
+            )
+            for line_number in line_numbers[upstairs_table]:
                 yield UpstairTableReference(
                     TableName=table_name.replace("`", ""),
                     Line=asdict(
                         UpstairTableReferenceLine(
-                            LineNumber=line_index + 1,
-                            LineString=self.query_str.splitlines()[line_index],
+                            LineNumber=line_number,
+                            LineString=(
+                                lines[line_number - 1]
+                                if line_number <= len(lines)
+                                else ""
+                            ),
                         )
                     ),
                 )
 
+    def find_line_numbers(self, upstairs_tables: list[str]) -> dict[str, list[int]]:
+        """Find lines where upstairs tables appear, except in comments
+
+        Args:
+            upstairs_tables (list[str]): Upstairs tables
+
+        Returns:
+            dict[str, list[int]]: Line numbers by upstairs table
+        """
+        lines = self.query_str.splitlines()
+        return {
+            upstairs_table: [
+                i + 1
+                for i, line in enumerate(lines)
+                if upstairs_table in line
+                and "--" not in line.split(upstairs_table)[0]  # exclude comments
+            ]
+            for upstairs_table in upstairs_tables
+        }
+
     def parse_and_get_upstairs_tables(self) -> list[str]:
         """Parse query and get upstairs tables
 
@@ -74,17 +136,15 @@ class Query:
             list[str]: A list of upstairs tables
         """
         # Remove comments
-        comments_pattern = r"\-\-.*\n"
-        query_str = re.sub(comments_pattern, "", self.query_str)
+        query_str = COMMENT_PATTERN.sub("", self.query_str)
 
         # Get Common-Table-Expressions(CTE) from query string
-        cte_pattern = r"(?:with|,)\s*(\w+)\s+as\s*"
-        cte_alias: list[str] = re.findall(cte_pattern, query_str, re.IGNORECASE)
+        cte_alias: list[str] = CTE_PATTERN.findall(query_str)
 
         # Search a boundary line number that a main query starts
         boundary_num: int = 0
-        main_pattern = r"\)[;\s]*select" if any(cte_alias) else r"select"
-        main_search_result = re.search(main_pattern, query_str, re.IGNORECASE)
+        main_pattern = MAIN_AFTER_CTE_PATTERN if any(cte_alias) else MAIN_PATTERN
+        main_search_result = main_pattern.search(query_str)
         if main_search_result:
             boundary_num = main_search_result.start()
 
@@ -93,16 +153,10 @@ class Query:
         query_group["main"] = query_str[boundary_num:].strip()
         query_group["cte"] = query_str[:boundary_num].strip()
 
-        table_pattern = r"\s(?:from|join)\s+([`.\-\w]+)"
-        main_tables_with_alias: list[str] = re.findall(
-            table_pattern, query_group["main"], re.IGNORECASE
-        )
+        main_tables_with_alias: list[str] = TABLE_PATTERN.findall(query_group["main"])
 
         # Exclude Google BigQuery EXTRACT function
-        bq_extract_pattern = r"(?:EXTRACT\(.+ FROM)\s+([`.\-\w]+)"
-        bq_extracts: list[str] = re.findall(
-            bq_extract_pattern, query_group["main"], re.IGNORECASE
-        )
+        bq_extracts: list[str] = BQ_EXTRACT_PATTERN.findall(query_group["main"])
 
         main_tables = [
             table
@@ -113,9 +167,7 @@ class Query:
         ]
 
         # Exclude table alias from CTEs
-        cte_tables_with_alias: list[str] = re.findall(
-            table_pattern, query_group["cte"], re.IGNORECASE
-        )
+        cte_tables_with_alias: list[str] = TABLE_PATTERN.findall(query_group["cte"])
         cte_tables = [
             cte_table
             for cte_table in cte_tables_with_alias
@@ -124,6 +176,106 @@ class Query:
 
         return sorted(set(main_tables + cte_tables))
 
+    def tokenize_and_get_upstairs_tables(self) -> dict[str, list[int]]:
+        """Tokenize query once and get upstairs tables with their line numbers
+
+        Words in comments and strings are never taken as tables.
+        FROM is taken as a table clause only at the top level or in parentheses
+        that have SELECT, so that FROM in functions like EXTRACT is ignored.
+
+        Returns:
+            dict[str, list[int]]: Line numbers by upstairs table
+        """
+        cte_alias: set[str] = set()
+        references: dict[str, set[int]] = defaultdict(set)
+
+        # Whether SELECT has appeared, for each level of parentheses
+        selects: list[bool] = [False]
+        with_depth: int = -1
+        expects_cte = False
+        cte_candidate: str | None = None
+        expects_table = False
+        table_candidate: tuple[str, int] | None = None
+
+        line_number = 1
+        position = 0
+        for token in SQL_TOKEN_PATTERN.finditer(self.query_str):
+            line_number += self.query_str.count("\n", position, token.start())
+            position = token.start()
+
+            kind = token.lastgroup
+            if kind == "comment":
+                continue
+            text = token.group()
+            keyword = text.upper() if kind == "name" else text
+
+            # A table name followed by parentheses is a table function
+            if table_candidate and keyword != "(":
+                references[table_candidate[0]].add(table_candidate[1])
+            table_candidate = None
+
+            if cte_candidate and keyword == "AS":
+                cte_alias.add(cte_candidate)
+            cte_candidate = None
+
+            if expects_table:
+                expects_table = False
+                if kind == "name" and keyword != "UNNEST":
+                    table_candidate = (text, line_number)
+                    continue
+
+            if expects_cte:
+                expects_cte = False
+                if keyword == "RECURSIVE":
+                    expects_cte = True
+                elif kind == "name":
+                    cte_candidate = text
+                    continue
+
+            if keyword == "(":
+                selects.append(False)
+            elif keyword == ")":
+                if len(selects) > 1:
+                    selects.pop()
+            elif keyword == "SELECT":
+                selects[-1] = True
+                if with_depth == len(selects):
+                    with_depth = -1
+            elif keyword == "WITH":
+                with_depth = len(selects)
+                expects_cte = True
+            elif keyword == "," and with_depth == len(selects):
+                expects_cte = True
+            elif keyword == "JOIN" or (
+                keyword == "FROM" and (len(selects) == 1 or selects[-1])
+            ):
+                expects_table = True
+
+        if table_candidate:
+            references[table_candidate[0]].add(table_candidate[1])
+
+        return {
+            table: sorted(line_numbers)
+            for table, line_numbers in references.items()
+            if table not in cte_alias
+        }
+
+
+def detect_upstair_table_references(
+    queries: list[Query],
+) -> list[list[UpstairTableReference]]:
+    """Detect upstream table references of queries
+
+    It is a module-level function to be called in worker processes.
+
+    Args:
+        queries (list[Query]): Queries
+
+    Returns:
+        list[list[UpstairTableReference]]: Upstream table references of each query
+    """
+    return [list(query.detect_upstair_table_reference()) for query in queries]
+
 
 def solve_table_prefix(table: str, default_table_prefix: str) -> str:
     """Solve table name prefix
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import os
+import stat
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import getLogger
+from socketserver import BaseServer, ThreadingMixIn, UnixStreamServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from src.stairlight.stairlight import ResponseType, SearchDirection, StairLight
+
+logger = getLogger(__name__)
+
+TRUE_VALUES = ("1", "true", "yes")
+
+
+class RequestError(Exception):
+    """Raised when a request is invalid"""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def respond(stairlight: StairLight, path: str, query: dict[str, list[str]]) -> Any:
+    """Answer a request with a built or loaded map
+
+    Args:
+        stairlight (StairLight): Stairlight class
+        path (str): Request path, one of /list, /up and /down
+        query (dict[str, list[str]]): Query parameters
+
+    Raises:
+        RequestError: The request is invalid
+
+    Returns:
+        Any: Results, which are the same as the ones of CLI
+    """
+    command = path.strip("/")
+    response_type = query.get("output", [ResponseType.TABLE.value])[-1]
+    if response_type not in (ResponseType.TABLE.value, ResponseType.URI.value):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid output: {response_type}")
+
+    if command == "list":
+        return stairlight.list_(response_type=response_type)
+    elif command not in ("up", "down"):
+        raise RequestError(HTTPStatus.NOT_FOUND, f"Not found: {path}")
+
+    tables: list[str] = query.get("table", [])
+    if not tables and query.get("label"):
+        tables = stairlight.find_tables_by_labels(target_labels=query["label"])
+    elif not tables:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "table or label is required")
+
+    search_results = stairlight.search_many(
+        table_names=tables,
+        recursive=query.get("recursive", [""])[-1].lower() in TRUE_VALUES,
+        verbose=query.get("verbose", [""])[-1].lower() in TRUE_VALUES,
+        response_type=response_type,
+        direction=SearchDirection.UP if command == "up" else SearchDirection.DOWN,
+    )
+    results = [search_results.results[table_name] for table_name in tables]
+    return results[0] if len(results) == 1 else results
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Answers GET requests as JSON"""
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        status = HTTPStatus.OK
+        try:
+            result = respond(
+                stairlight=getattr(self.server, "stairlight"),
+                path=url.path,
+                query=parse_qs(url.query),
+            )
+        except RequestError as e:
+            status = e.status
+            result = {"Error": str(e)}
+        except Exception as e:
+            logger.exception(f"Failed to answer {self.path}")
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            result = {"Error": str(e)}
+
+        body = json.dumps(result).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Clients of a Unix socket have no address
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(
+    stairlight: StairLight,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    socket_path: str | None = None,
+) -> BaseServer:
+    """Create a server that answers lineage queries
+
+    Args:
+        stairlight (StairLight): Stairlight class that has a map
+        host (str, optional): Host to listen on. Defaults to "127.0.0.1".
+        port (int, optional):
+            Port to listen on, 0 means an arbitrary free port. Defaults to 0.
+        socket_path (str, optional):
+            A path of a Unix socket. If it is set, host and port are ignored.
+            Defaults to None.
+
+    Returns:
+        BaseServer: Server
+    """
+    server: BaseServer
+    if socket_path:
+        # Remove a socket left by a previous server
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.remove(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, RequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), RequestHandler)
+    setattr(server, "stairlight", stairlight)
+    return server
+
+
+def serve(server: BaseServer) -> None:
+    """Serve lineage queries until interrupted
+
+    Args:
+        server (BaseServer): Server created by create_server()
+    """
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if isinstance(server, UnixStreamServer) and os.path.exists(
+            str(server.server_address)
+        ):
+            os.remove(str(server.server_address))
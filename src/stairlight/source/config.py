@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import re
 from dataclasses import dataclass, field
 from typing import Any, Iterator, OrderedDict, Type
 
@@ -8,6 +9,16 @@ from src.stairlight.source.config_key import MapKey
 
 logger = logging.getLogger()
 
+# Backreferences are numbered across a whole pattern, so they can't be merged
+BACKREFERENCE_PATTERN = re.compile(r"\\[1-9]|\(\?P=")
+# Global inline flags apply to a whole pattern wherever they are
+GLOBAL_FLAGS_PATTERN = re.compile(r"\(\?[aiLmsux]+\)")
+
+# Characters that end a literal prefix of a regex
+REGEX_SPECIAL_CHARACTERS = frozenset(".^$*+?{}[]|()\\")
+# Quantifiers that make a preceding character optional
+REGEX_OPTIONAL_QUANTIFIERS = frozenset("*?{")
+
 
 class ConfigAttributeNotFoundException(Exception):
     def __init__(self, msg: str) -> None:
@@ -32,6 +43,13 @@ class StairlightConfigExclude:
 class StairlightConfigSettings:
     MappingFilesRegex: list[str] | None = None
     MappingPrefix: str | None = None
+    MaxWorkers: int | None = None
+    MaxProcesses: int | None = None
+    MaxDownloads: int | None = None
+    MaxDbtCompiles: int | None = None
+    CacheDir: str | None = None
+    QueryParser: str | None = None
+    DbtNoCompile: bool | None = None
 
 
 @dataclass
@@ -40,6 +58,10 @@ class StairlightConfig:
     Exclude: list[dict[str, Any]] = field(default_factory=list)
     Settings: OrderedDict = field(default_factory=OrderedDict)
 
+    def __post_init__(self) -> None:
+        # Not a field, to keep it out of asdict()
+        self._exclude_patterns: dict[str, list[re.Pattern[str]]] | None = None
+
     @staticmethod
     def select_config_include(source_type: str) -> Type[StairlightConfigInclude]:
         """Select a data class of include section by source type
@@ -100,6 +122,94 @@ class StairlightConfig:
         for _exclude in self.Exclude:
             yield StairlightConfigExclude(**_exclude)
 
+    def get_exclude_patterns(self, source_type: str) -> list[re.Pattern[str]]:
+        """Get compiled regexes of a exclude section by source type
+
+        Regexes are compiled once, and merged into one alternation
+        unless they have backreferences or flags that can't be merged.
+
+        Args:
+            source_type (str): Source type
+
+        Returns:
+            list[re.Pattern[str]]: Compiled regexes, usually one or none
+        """
+        if self._exclude_patterns is None:
+            from src.stairlight.source.template import TemplateSourceType
+
+            regexes: dict[str, list[str]] = {}
+            for exclude in self.get_exclude():
+                regexes.setdefault(
+                    TemplateSourceType(exclude.TemplateSourceType).value, []
+                ).append(rf"{exclude.Regex}")
+            self._exclude_patterns = {
+                key: compile_merged_patterns(regexes=value)
+                for key, value in regexes.items()
+            }
+        return self._exclude_patterns.get(source_type, [])
+
+
+def compile_merged_patterns(regexes: list[str]) -> list[re.Pattern[str]]:
+    """Compile regexes, merging them into one alternation if possible
+
+    Args:
+        regexes (list[str]): Regexes
+
+    Returns:
+        list[re.Pattern[str]]: Compiled regexes
+    """
+    mergeable: list[str] = []
+    patterns: list[re.Pattern[str]] = []
+    for regex in regexes:
+        if BACKREFERENCE_PATTERN.search(regex) or GLOBAL_FLAGS_PATTERN.search(regex):
+            patterns.append(re.compile(regex))
+        else:
+            mergeable.append(regex)
+    if len(mergeable) == 1:
+        patterns.append(re.compile(mergeable[0]))
+    elif mergeable:
+        try:
+            patterns.append(re.compile("|".join(f"(?:{regex})" for regex in mergeable)))
+        except re.error:
+            patterns.extend(re.compile(regex) for regex in mergeable)
+    return patterns
+
+
+def find_regex_prefix(regex: str | None) -> str:
+    """Find a literal prefix that every string fully matched by a regex starts with
+
+    It is conservative, an empty string is returned for alternations
+    and inline flags, which can match strings with different prefixes.
+
+    Args:
+        regex (str | None): Regex
+
+    Returns:
+        str: Literal prefix
+    """
+    if not regex or "|" in regex or regex.startswith("(?"):
+        return ""
+
+    prefix: list[str] = []
+    i = 1 if regex.startswith("^") else 0
+    while i < len(regex):
+        character = regex[i]
+        if character == "\\":
+            # Escaped punctuations are literal, others are character classes
+            if i + 1 >= len(regex) or regex[i + 1].isalnum():
+                break
+            character = regex[i + 1]
+            i += 2
+        elif character in REGEX_SPECIAL_CHARACTERS:
+            break
+        else:
+            i += 1
+
+        if i < len(regex) and regex[i] in REGEX_OPTIONAL_QUANTIFIERS:
+            break
+        prefix.append(character)
+    return "".join(prefix)
+
 
 @dataclass
 class MappingConfigGlobal:
@@ -137,6 +247,10 @@ class MappingConfig:
     ExtraLabels: list[dict[str, Any]] | None = None
     Metadata: list[dict[str, Any]] | None = None  # Deprecated
 
+    def __post_init__(self) -> None:
+        # Not a field, to keep it out of asdict()
+        self._index: MappingConfigIndex | None = None
+
     def get_global(self) -> MappingConfigGlobal:
         """Get global section
 
@@ -161,6 +275,44 @@ class MappingConfig:
             )
             yield mapping_config(**_mapping)
 
+    def get_index(self) -> MappingConfigIndex:
+        """Get indexes of mapping section, which are built once
+
+        Returns:
+            MappingConfigIndex: Indexes of mapping section
+        """
+        if self._index is None:
+            self._index = MappingConfigIndex(mappings=self.get_mapping())
+        return self._index
+
+    def find_mapping(self, key: str, uri: str) -> MappingConfigMapping | None:
+        """Find the first mapping of a file, dbt, GCS or S3 template
+
+        Args:
+            key (str): Template key, matched with FileSuffix
+            uri (str): Template URI, matched with Uri
+
+        Returns:
+            MappingConfigMapping | None: Mapping section if found
+        """
+        return self.get_index().find_mapping(key=key, uri=uri)
+
+    def find_redash_mappings(
+        self, data_source_name: str | None, query_id: int | None
+    ) -> Iterator[MappingConfigMapping]:
+        """Find mappings of a Redash query
+
+        Args:
+            data_source_name (str | None): Data source name
+            query_id (int | None): Query ID
+
+        Yields:
+            Iterator[MappingConfigMapping]: Mapping sections in order
+        """
+        return self.get_index().find_redash_mappings(
+            data_source_name=data_source_name, query_id=query_id
+        )
+
     def get_extra_labels(self) -> Iterator[MappingConfigExtraLabels]:
         """Get extra labels section
 
@@ -214,3 +366,86 @@ class MappingConfig:
 
             mapping_config = MappingConfigMappingS3
         return mapping_config
+
+
+class MappingConfigIndex:
+    """Indexes of mapping section to find a template's mapping at once
+
+    File and dbt suffixes are grouped by length, so a key is looked up
+    once for each distinct suffix length instead of once for each mapping.
+    The first mapping in the section wins, as when it is scanned in order.
+    """
+
+    def __init__(self, mappings: Iterator[MappingConfigMapping]) -> None:
+        """Indexes of mapping section
+
+        Args:
+            mappings (Iterator[MappingConfigMapping]): Mapping section
+        """
+        from src.stairlight.source.template import TemplateSourceType
+
+        self._mappings: list[MappingConfigMapping] = []
+        self._uris: dict[str, int] = {}
+        self._suffixes: dict[str, int] = {}
+        self._redash_queries: dict[tuple[str | None, int | None], list[int]] = {}
+
+        mapping: Any
+        for position, mapping in enumerate(mappings):
+            self._mappings.append(mapping)
+            if mapping.TemplateSourceType in (
+                TemplateSourceType.FILE.value,
+                TemplateSourceType.DBT.value,
+            ):
+                if mapping.FileSuffix is not None:
+                    self._suffixes.setdefault(mapping.FileSuffix, position)
+            elif mapping.TemplateSourceType in (
+                TemplateSourceType.GCS.value,
+                TemplateSourceType.S3.value,
+            ):
+                if mapping.Uri is not None:
+                    self._uris.setdefault(mapping.Uri, position)
+            elif mapping.TemplateSourceType == TemplateSourceType.REDASH.value:
+                self._redash_queries.setdefault(
+                    (mapping.DataSourceName, mapping.QueryId), []
+                ).append(position)
+
+        self._suffix_lengths = sorted({len(suffix) for suffix in self._suffixes})
+
+    def find_mapping(self, key: str, uri: str) -> MappingConfigMapping | None:
+        """Find the first mapping whose FileSuffix ends a key or Uri is a URI
+
+        Args:
+            key (str): Template key
+            uri (str): Template URI
+
+        Returns:
+            MappingConfigMapping | None: Mapping section if found
+        """
+        positions: list[int] = []
+        if uri in self._uris:
+            positions.append(self._uris[uri])
+        for length in self._suffix_lengths:
+            if length > len(key):
+                break
+            suffix = key[-length:] if length else ""
+            if suffix in self._suffixes:
+                positions.append(self._suffixes[suffix])
+
+        if not positions:
+            return None
+        return self._mappings[min(positions)]
+
+    def find_redash_mappings(
+        self, data_source_name: str | None, query_id: int | None
+    ) -> Iterator[MappingConfigMapping]:
+        """Find mappings of a Redash query
+
+        Args:
+            data_source_name (str | None): Data source name
+            query_id (int | None): Query ID
+
+        Yields:
+            Iterator[MappingConfigMapping]: Mapping sections in order
+        """
+        for position in self._redash_queries.get((data_source_name, query_id), []):
+            yield self._mappings[position]
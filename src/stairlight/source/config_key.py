@@ -30,6 +30,13 @@ class StairlightConfigKey(Key):
     REGEX = "Regex"
 
     MAPPING_PREFIX = "MappingPrefix"
+    MAX_WORKERS = "MaxWorkers"
+    MAX_PROCESSES = "MaxProcesses"
+    MAX_DOWNLOADS = "MaxDownloads"
+    MAX_DBT_COMPILES = "MaxDbtCompiles"
+    CACHE_DIR = "CacheDir"
+    QUERY_PARSER = "QueryParser"
+    DBT_NO_COMPILE = "DbtNoCompile"
 
     class File(Key):
         FILE_SYSTEM_PATH = "FileSystemPath"
@@ -37,11 +44,14 @@ class StairlightConfigKey(Key):
     class Gcs(Key):
         PROJECT_ID = "ProjectId"
         BUCKET_NAME = "BucketName"
+        PREFIX = "Prefix"
 
     class Redash(Key):
         DATABASE_URL_ENV_VAR = "DatabaseUrlEnvironmentVariable"
         DATA_SOURCE_NAME = "DataSourceName"
         QUERY_IDS = "QueryIds"
+        BATCH_SIZE = "BatchSize"
+        INCREMENTAL = "Incremental"
 
     class Dbt(Key):
         PROJECT_DIR = "ProjectDir"
@@ -51,6 +61,7 @@ class StairlightConfigKey(Key):
 
     class S3(Key):
         BUCKET_NAME = "BucketName"
+        PREFIX = "Prefix"
 
 
 class MappingConfigKey(Key):
@@ -90,10 +101,22 @@ class MappingConfigKey(Key):
 class DbtProjectKey(Key):
     PROJECT_NAME = "name"
     MODEL_PATHS = "model-paths"
+    MACRO_PATHS = "macro-paths"
     TARGET_PATH = "target-path"
     PROFILE = "Profile"
 
 
+class DbtManifestKey(Key):
+    NODES = "nodes"
+    RESOURCE_TYPE = "resource_type"
+    PACKAGE_NAME = "package_name"
+    ORIGINAL_FILE_PATH = "original_file_path"
+    COMPILED_PATH = "compiled_path"
+    COMPILED_CODE = "compiled_code"
+    # Until dbt 1.3
+    COMPILED_SQL = "compiled_sql"
+
+
 class MapKey(Key):
     TABLE_NAME = "TableName"
     TEMPLATE_SOURCE_TYPE = "TemplateSourceType"
@@ -148,12 +148,12 @@ class SaveMapController:
 
     def _save_map_s3(self) -> None:
         """Save mapped results to Amazon S3"""
-        from mypy_boto3_s3.service_resource import Object
+        from src.stairlight.source.s3.map import get_s3_client, split_s3_uri
 
-        from src.stairlight.source.s3.map import get_s3_object
-
-        _object: Object = get_s3_object(uri=self.save_file)
-        _ = _object.put(Body=json.dumps(obj=self._mapped, indent=2))
+        bucket_name, key = split_s3_uri(uri=self.save_file)
+        _ = get_s3_client().put_object(
+            Bucket=bucket_name, Key=key, Body=json.dumps(obj=self._mapped, indent=2)
+        )
 
 
 class LoadMapController:
@@ -198,13 +198,14 @@ class LoadMapController:
     def _load_map_s3(self) -> dict:
         """Load mapped results from Amazon S3"""
         from botocore.response import StreamingBody
-        from mypy_boto3_s3.service_resource import Object
         from mypy_boto3_s3.type_defs import GetObjectOutputTypeDef
 
-        from src.stairlight.source.s3.map import get_s3_object
+        from src.stairlight.source.s3.map import get_s3_client, split_s3_uri
 
-        _object: Object = get_s3_object(uri=self.load_file)
-        object_output: GetObjectOutputTypeDef = _object.get()
+        bucket_name, key = split_s3_uri(uri=self.load_file)
+        object_output: GetObjectOutputTypeDef = get_s3_client().get_object(
+            Bucket=bucket_name, Key=key
+        )
         body: StreamingBody = object_output["Body"]
         if not body:
             logger.error(f"{self.load_file} is not found.")
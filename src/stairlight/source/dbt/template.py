@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 import glob
+import hashlib
+import json
 import os
 import pathlib
 import re
 import shlex
 import subprocess
+import time
 from typing import Any, Iterator
 
 import yaml
 
 from src.stairlight.source.config import MappingConfig, StairlightConfig
-from src.stairlight.source.config_key import DbtProjectKey
+from src.stairlight.source.config_key import DbtManifestKey, DbtProjectKey
 from src.stairlight.source.dbt.config import StairlightConfigIncludeDbt
 from src.stairlight.source.template import Template, TemplateSource, TemplateSourceType
 
@@ -22,6 +25,7 @@ class DbtTemplate(Template):
         mapping_config: MappingConfig | None,
         key: str,
         project_name: str,
+        template_str: str | None = None,
     ):
         super().__init__(
             mapping_config=mapping_config,
@@ -31,6 +35,9 @@ class DbtTemplate(Template):
         self.uri = self.get_uri()
         self.project_name = project_name
 
+        # Compiled code in manifest.json, to read it without opening the file
+        self._template_str = template_str
+
     def get_uri(self) -> str:
         """Get uri from a key
 
@@ -45,6 +52,8 @@ class DbtTemplate(Template):
         Returns:
             str: Template string
         """
+        if self._template_str is not None:
+            return self._template_str
         with open(self.key) as f:
             return f.read()
 
@@ -60,24 +69,45 @@ class DbtTemplate(Template):
         Returns:
             str: Query statement
         """
-        return self.get_template_str()
+        return self.read_template_str()
 
 
 class DbtTemplateSource(TemplateSource):
     DBT_PROJECT_YAML = "dbt_project.yml"
+    DBT_PROFILES_YAML = "profiles.yml"
+    DBT_MANIFEST_JSON = "manifest.json"
+    DBT_MACRO_PATHS_DEFAULT = ["macros"]
+    DBT_MODEL_RESOURCE_TYPE = "model"
     REGEX_SCHEMA_TEST_FILE = re.compile(r".*/schema.yml/.*\.sql$")
 
+    # A file in the target path, which has a fingerprint of the last compile
+    COMPILE_FINGERPRINT_FILE = ".stairlight_compile_fingerprint"
+
     def __init__(
         self,
         stairlight_config: StairlightConfig,
         mapping_config: MappingConfig,
         include: StairlightConfigIncludeDbt,
+        no_compile: bool = False,
     ) -> None:
+        """dbt template source
+
+        Args:
+            stairlight_config (StairlightConfig): Stairlight configuration
+            mapping_config (MappingConfig): Mapping configuration
+            include (StairlightConfigIncludeDbt): Include section
+            no_compile (bool, optional):
+                Read compiled files without executing dbt compile.
+                Defaults to False.
+        """
         super().__init__(
             stairlight_config=stairlight_config,
             mapping_config=mapping_config,
         )
         self._include = include
+        self._no_compile = no_compile
+        self._prepared = False
+        self._dbt_project_config: dict[str, Any] | None = None
 
     def search_templates(self) -> Iterator[Template]:
         """Search query template files
@@ -88,26 +118,27 @@ class DbtTemplateSource(TemplateSource):
         if not self._include:
             return None
 
+        self.prepare()
         project_dir: str | None = self._include.ProjectDir
-        profiles_dir: str | None = self._include.ProfilesDir
-        if not project_dir or not profiles_dir:
+        dbt_project_config = self._dbt_project_config
+        if not project_dir or not dbt_project_config:
             return None
 
-        dbt_project_config: dict[str, Any] = self.read_dbt_project_yml(
-            project_dir=project_dir
-        )
-        _ = self.execute_dbt_compile(
-            project_dir=project_dir,
-            profiles_dir=profiles_dir,
-            profile=dbt_project_config.get(DbtProjectKey.PROFILE),
-            target=self._include.Target,
-            vars=self._include.Vars,
-        )
-
         target_path = dbt_project_config[DbtProjectKey.TARGET_PATH]
         project_name = dbt_project_config[DbtProjectKey.PROJECT_NAME]
         model_paths = dbt_project_config[DbtProjectKey.MODEL_PATHS]
 
+        manifest_file = f"{project_dir}/{target_path}/{self.DBT_MANIFEST_JSON}"
+        if os.path.exists(manifest_file):
+            yield from self.search_templates_in_manifest(
+                manifest_file=manifest_file,
+                project_dir=project_dir,
+                target_path=target_path,
+                project_name=project_name,
+                model_paths=model_paths,
+            )
+            return
+
         for model_path in model_paths:
             dbt_model_path_str = self.concat_dbt_model_path_str(
                 project_dir=project_dir,
@@ -127,6 +158,175 @@ class DbtTemplateSource(TemplateSource):
                     project_name=project_name,
                 )
 
+    def prepare(self) -> None:
+        """Read dbt_project.yml and execute dbt compile if needed
+
+        It is called once, by search_templates() or in advance
+        to compile dbt projects concurrently.
+        """
+        if self._prepared:
+            return
+        self._prepared = True
+
+        project_dir: str | None = self._include.ProjectDir
+        profiles_dir: str | None = self._include.ProfilesDir
+        if not project_dir or not profiles_dir:
+            return
+
+        self._dbt_project_config = self.read_dbt_project_yml(project_dir=project_dir)
+        if not self._no_compile:
+            self.compile(
+                project_dir=project_dir,
+                profiles_dir=profiles_dir,
+                dbt_project_config=self._dbt_project_config,
+            )
+
+    def search_templates_in_manifest(
+        self,
+        manifest_file: str,
+        project_dir: str,
+        target_path: str,
+        project_name: str,
+        model_paths: list[str],
+    ) -> Iterator[Template]:
+        """Search models in manifest.json, with their compiled code
+
+        Compiled files are not searched, and tests are skipped by their
+        resource types. A compiled file is read only if its model has no
+        compiled code, and a model that is not compiled yet is skipped.
+
+        Args:
+            manifest_file (str): A path of manifest.json
+            project_dir (str): dbt project directory
+            target_path (str): dbt target path
+            project_name (str): dbt project name
+            model_paths (list[str]): dbt model paths
+
+        Yields:
+            Iterator[Template]: Attributes of query templates
+        """
+        with open(manifest_file) as f:
+            nodes: dict[str, Any] = json.load(f).get(DbtManifestKey.NODES, {})
+
+        keyed_template_strs: dict[str, str | None] = {}
+        for node in nodes.values():
+            original_file_path = node.get(DbtManifestKey.ORIGINAL_FILE_PATH, "")
+            if (
+                node.get(DbtManifestKey.RESOURCE_TYPE) != self.DBT_MODEL_RESOURCE_TYPE
+                or node.get(DbtManifestKey.PACKAGE_NAME) != project_name
+                or not any(
+                    original_file_path.startswith(f"{str(model_path).rstrip('/')}/")
+                    for model_path in model_paths
+                )
+            ):
+                continue
+
+            compiled_path = node.get(DbtManifestKey.COMPILED_PATH) or (
+                f"{target_path}/compiled/{project_name}/{original_file_path}"
+            )
+            key = str(pathlib.Path(project_dir, compiled_path))
+            if self.is_excluded(
+                source_type=TemplateSourceType(self._include.TemplateSourceType),
+                key=key,
+            ):
+                self.logger.debug(f"{key} is skipped.")
+                continue
+
+            template_str: str | None = node.get(DbtManifestKey.COMPILED_CODE)
+            if template_str is None:
+                template_str = node.get(DbtManifestKey.COMPILED_SQL)
+            if template_str is None and not os.path.exists(key):
+                self.logger.warning(f"{key} is not compiled, so it is skipped.")
+                continue
+            keyed_template_strs[key] = template_str
+
+        # Sorted, so that a map doesn't depend on the order of nodes
+        for key in sorted(keyed_template_strs):
+            yield DbtTemplate(
+                mapping_config=self._mapping_config,
+                key=key,
+                project_name=project_name,
+                template_str=keyed_template_strs[key],
+            )
+
+    def compile(
+        self, project_dir: str, profiles_dir: str, dbt_project_config: dict[str, Any]
+    ) -> None:
+        """Execute dbt compile, unless compiled files are up to date
+
+        Args:
+            project_dir (str): dbt project directory
+            profiles_dir (str): dbt profile directory
+            dbt_project_config (dict[str, Any]): dbt project settings
+        """
+        target_dir = f"{project_dir}/{dbt_project_config[DbtProjectKey.TARGET_PATH]}"
+        fingerprint_file = f"{target_dir}/{self.COMPILE_FINGERPRINT_FILE}"
+        fingerprint = self.create_compile_fingerprint(
+            project_dir=project_dir,
+            profiles_dir=profiles_dir,
+            dbt_project_config=dbt_project_config,
+        )
+        if os.path.isdir(f"{target_dir}/compiled") and os.path.exists(fingerprint_file):
+            with open(fingerprint_file) as f:
+                if f.read() == fingerprint:
+                    self.logger.info(
+                        f"dbt compile is skipped, {project_dir} is unchanged."
+                    )
+                    return
+
+        _ = self.execute_dbt_compile(
+            project_dir=project_dir,
+            profiles_dir=profiles_dir,
+            profile=dbt_project_config.get(DbtProjectKey.PROFILE),
+            target=self._include.Target,
+            vars=self._include.Vars,
+        )
+        if os.path.isdir(target_dir):
+            with open(fingerprint_file, "w") as f:
+                f.write(fingerprint)
+
+    def create_compile_fingerprint(
+        self, project_dir: str, profiles_dir: str, dbt_project_config: dict[str, Any]
+    ) -> str:
+        """Create a hash of the inputs of dbt compile
+
+        It covers models, macros, dbt_project.yml, profiles.yml,
+        the profile, the target and variables.
+
+        Args:
+            project_dir (str): dbt project directory
+            profiles_dir (str): dbt profile directory
+            dbt_project_config (dict[str, Any]): dbt project settings
+
+        Returns:
+            str: Hash of the inputs
+        """
+        fingerprint = hashlib.sha256()
+        attributes = [
+            dbt_project_config.get(DbtProjectKey.PROFILE),
+            self._include.Target,
+            self._include.Vars,
+        ]
+        fingerprint.update(json.dumps(attributes, sort_keys=True).encode("utf-8"))
+
+        source_paths = [
+            pathlib.Path(project_dir, source_path)
+            for source_path in dbt_project_config.get(DbtProjectKey.MODEL_PATHS, [])
+            + dbt_project_config.get(
+                DbtProjectKey.MACRO_PATHS, self.DBT_MACRO_PATHS_DEFAULT
+            )
+        ]
+        files = [
+            pathlib.Path(project_dir, self.DBT_PROJECT_YAML),
+            pathlib.Path(profiles_dir, self.DBT_PROFILES_YAML),
+        ] + sorted(p for source_path in source_paths for p in source_path.glob("**/*"))
+        for file in files:
+            if not file.is_file():
+                continue
+            fingerprint.update(str(file).encode("utf-8"))
+            fingerprint.update(hashlib.sha256(file.read_bytes()).digest())
+        return fingerprint.hexdigest()
+
     def is_skipped(self, p: pathlib.Path) -> bool:
         """Check the target path is skipped or not
 
@@ -267,10 +467,25 @@ class DbtTemplateSource(TemplateSource):
             target=target,
             vars=vars,
         )
-        proc = subprocess.run(
-            args=shlex.split(command),
-            shell=False,
-            check=True,
-            stdout=subprocess.DEVNULL,
+
+        # Output is captured, not to mix outputs of projects compiled concurrently
+        started_at = time.perf_counter()
+        try:
+            proc = subprocess.run(
+                args=shlex.split(command),
+                shell=False,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except subprocess.CalledProcessError as e:
+            self.logger.error(
+                f"dbt compile of {project_dir} failed: {e.stdout or ''}{e.stderr or ''}"
+            )
+            raise
+        self.logger.info(
+            f"dbt compile of {project_dir} finished in "
+            f"{time.perf_counter() - started_at:.1f}s."
         )
+        self.logger.debug(proc.stdout)
         return proc.returncode
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import os
 import pathlib
 import re
 from typing import Iterator
 
+from src.stairlight.cache import FileManifest, FileManifestEntry
 from src.stairlight.source.config import (
     ConfigAttributeNotFoundException,
     MappingConfig,
@@ -19,6 +21,7 @@ class FileTemplate(Template):
         mapping_config: MappingConfig,
         key: str,
         default_table_prefix: str | None = None,
+        manifest: FileManifest | None = None,
     ):
         super().__init__(
             mapping_config=mapping_config,
@@ -27,6 +30,8 @@ class FileTemplate(Template):
             default_table_prefix=default_table_prefix,
         )
         self.uri = self.get_uri()
+        self._manifest = manifest
+        self._manifest_entry: FileManifestEntry | None = None
 
     def get_uri(self) -> str:
         """Get uri from a key
@@ -45,6 +50,54 @@ class FileTemplate(Template):
         with open(self.key) as f:
             return f.read()
 
+    def get_template_fingerprint(self) -> str:
+        """Get a hash of template string, from the manifest if the file is unchanged
+
+        Returns:
+            str: Hash of template string
+        """
+        if not self._manifest:
+            return super().get_template_fingerprint()
+        return self.get_manifest_entry().Hash
+
+    def find_jinja_params(self) -> list[str]:
+        """Find jinja parameters, from the manifest if the file is unchanged
+
+        Returns:
+            list[str]: Jinja parameters
+        """
+        if not self._manifest:
+            return super().find_jinja_params()
+        return list(self.get_manifest_entry().Parameters)
+
+    def get_manifest_entry(self) -> FileManifestEntry:
+        """Get a manifest entry, the file is read only if it is added or changed
+
+        Returns:
+            FileManifestEntry: Manifest entry
+        """
+        if self._manifest_entry:
+            return self._manifest_entry
+
+        stat = os.stat(self.key)
+        entry: FileManifestEntry | None = None
+        if self._manifest:
+            entry = self._manifest.get(
+                path=self.key, mtime=stat.st_mtime_ns, size=stat.st_size
+            )
+        if not entry:
+            template_str = self.read_template_str()
+            entry = FileManifestEntry(
+                MTime=stat.st_mtime_ns,
+                Size=stat.st_size,
+                Hash=self.create_fingerprint(template_str=template_str),
+                Parameters=self.get_jinja_params(template_str=template_str),
+            )
+            if self._manifest:
+                self._manifest.set(path=self.key, entry=entry)
+        self._manifest_entry = entry
+        return entry
+
 
 class FileTemplateSource(TemplateSource):
     def __init__(
@@ -52,12 +105,16 @@ class FileTemplateSource(TemplateSource):
         stairlight_config: StairlightConfig,
         mapping_config: MappingConfig,
         include: StairlightConfigIncludeFile,
+        manifest: FileManifest | None = None,
     ) -> None:
         super().__init__(
             stairlight_config=stairlight_config,
             mapping_config=mapping_config,
         )
         self._include = include
+        self._include_pattern = re.compile(rf"{self._include.Regex}")
+        self._source_type = TemplateSourceType(self._include.TemplateSourceType)
+        self._manifest = manifest
 
     def search_templates(self) -> Iterator[Template]:
         """Search SQL template files from local file system
@@ -80,6 +137,7 @@ class FileTemplateSource(TemplateSource):
                 mapping_config=self._mapping_config,
                 key=str(p),
                 default_table_prefix=self._include.DefaultTablePrefix,
+                manifest=self._manifest,
             )
 
     def is_skipped(self, p: pathlib.Path):
@@ -93,9 +151,6 @@ class FileTemplateSource(TemplateSource):
         """
         return (
             p.is_dir()
-            or not re.fullmatch(rf"{self._include.Regex}", str(p))
-            or self.is_excluded(
-                source_type=TemplateSourceType(self._include.TemplateSourceType),
-                key=str(p),
-            )
+            or not self._include_pattern.fullmatch(str(p))
+            or self.is_excluded(source_type=self._source_type, key=str(p))
         )
@@ -12,6 +12,7 @@ class StairlightConfigIncludeGcs(StairlightConfigInclude):
     TemplateSourceType: str = source_type.GCS.value
     ProjectId: str | None = None
     BucketName: str | None = None
+    Prefix: str | None = None
     Regex: str | None = None
     DefaultTablePrefix: str | None = None
 
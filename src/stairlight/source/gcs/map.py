@@ -1,7 +1,59 @@
-from google.cloud.storage import Blob, Client
+from __future__ import annotations
+
+import threading
+
+from google.cloud.storage import Blob, Bucket, Client
 
 from src.stairlight.source.config_key import GCS_URI_SCHEME
 
+# Clients and buckets are shared, to reuse connections and to avoid
+# a metadata request for each object
+_clients: dict[str | None, Client] = {}
+_buckets: dict[tuple[str | None, str], Bucket] = {}
+_lock = threading.Lock()
+
+
+def get_gcs_client(project: str | None = None) -> Client:
+    """Get a Google Cloud Storage client shared by project
+
+    Args:
+        project (str, optional): Project ID. Defaults to None.
+
+    Returns:
+        Client: Client
+    """
+    with _lock:
+        if project not in _clients:
+            _clients[project] = Client(credentials=None, project=project)
+        return _clients[project]
+
+
+def get_gcs_bucket(bucket_name: str, project: str | None = None) -> Bucket:
+    """Get a Google Cloud Storage bucket shared by project and name
+
+    It does not request bucket metadata, a missing bucket raises errors
+    when its objects are read or written.
+
+    Args:
+        bucket_name (str): Bucket name
+        project (str, optional): Project ID. Defaults to None.
+
+    Returns:
+        Bucket: Bucket
+    """
+    client = get_gcs_client(project=project)
+    with _lock:
+        if (project, bucket_name) not in _buckets:
+            _buckets[(project, bucket_name)] = client.bucket(bucket_name)
+        return _buckets[(project, bucket_name)]
+
+
+def clear_gcs_clients() -> None:
+    """Drop shared clients and buckets, e.g. after credentials change"""
+    with _lock:
+        _clients.clear()
+        _buckets.clear()
+
 
 def get_gcs_blob(uri: str) -> Blob:
     """Get a Google Cloud Storage blob
@@ -15,6 +67,5 @@ def get_gcs_blob(uri: str) -> Blob:
     bucket_name = uri.replace(GCS_URI_SCHEME, "").split("/")[0]
     key = uri.replace(f"{GCS_URI_SCHEME}{bucket_name}/", "")
 
-    client = Client(credentials=None, project=None)
-    bucket = client.get_bucket(bucket_name)
+    bucket = get_gcs_bucket(bucket_name=bucket_name)
     return bucket.blob(key)
@@ -5,17 +5,25 @@ from typing import Any, Iterator
 
 from google.cloud import storage
 
+from src.stairlight.cache import ObjectManifest
 from src.stairlight.source.config import (
     ConfigAttributeNotFoundException,
     MappingConfig,
     StairlightConfig,
+    find_regex_prefix,
 )
 from src.stairlight.source.controller import GCS_URI_SCHEME
 from src.stairlight.source.gcs.config import StairlightConfigIncludeGcs
-from src.stairlight.source.template import Template, TemplateSource, TemplateSourceType
+from src.stairlight.source.gcs.map import get_gcs_bucket, get_gcs_client
+from src.stairlight.source.template import (
+    ObjectTemplate,
+    Template,
+    TemplateSource,
+    TemplateSourceType,
+)
 
 
-class GcsTemplate(Template):
+class GcsTemplate(ObjectTemplate):
     def __init__(
         self,
         mapping_config: MappingConfig,
@@ -23,6 +31,9 @@ class GcsTemplate(Template):
         bucket: str | None = None,
         project: str | None = None,
         default_table_prefix: str | None = None,
+        blob: storage.Blob | None = None,
+        validator: str | None = None,
+        manifest: ObjectManifest | None = None,
     ):
         super().__init__(
             mapping_config=mapping_config,
@@ -31,9 +42,14 @@ class GcsTemplate(Template):
             bucket=bucket,
             project=project,
             default_table_prefix=default_table_prefix,
+            validator=validator,
+            manifest=manifest,
         )
         self.uri = self.get_uri()
 
+        # A blob found by listing, to read it without looking it up again
+        self._blob = blob
+
     def get_uri(self) -> str:
         """Get uri from bucket and key
 
@@ -48,9 +64,10 @@ class GcsTemplate(Template):
         Returns:
             str: Template string
         """
-        client = storage.Client(credentials=None, project=self.project)
-        bucket = client.get_bucket(self.bucket)
-        blob = bucket.blob(self.key)
+        blob = self._blob
+        if not blob:
+            bucket = get_gcs_bucket(bucket_name=self.bucket, project=self.project)
+            blob = bucket.blob(self.key)
         return blob.download_as_bytes().decode("utf-8")
 
 
@@ -60,12 +77,23 @@ class GcsTemplateSource(TemplateSource):
         stairlight_config: StairlightConfig,
         mapping_config: MappingConfig,
         include: StairlightConfigIncludeGcs,
+        max_downloads: int = 1,
+        manifest: ObjectManifest | None = None,
     ) -> None:
         super().__init__(
             stairlight_config=stairlight_config,
             mapping_config=mapping_config,
         )
         self._include = include
+        self._max_downloads = max_downloads
+        self._manifest = manifest
+        self._include_pattern = re.compile(rf"{self._include.Regex}")
+
+        # Only objects under the prefix are listed, derived from Regex if not set
+        self._prefix = self._include.Prefix or find_regex_prefix(
+            regex=self._include.Regex
+        )
+        self._source_type = TemplateSourceType(self._include.TemplateSourceType)
 
     def search_templates(self) -> Iterator[Template]:
         """Search SQL template objects from GCS
@@ -73,6 +101,16 @@ class GcsTemplateSource(TemplateSource):
         Yields:
             Iterator[SQLTemplate]: attributes of SQL template object
         """
+        return self.prefetch_templates(
+            templates=self.list_templates(), max_downloads=self._max_downloads
+        )
+
+    def list_templates(self) -> Iterator[Template]:
+        """List SQL template objects in GCS
+
+        Yields:
+            Iterator[Template]: Attributes of SQL template object
+        """
         project = self._include.ProjectId
         bucket_name = self._include.BucketName
 
@@ -81,8 +119,8 @@ class GcsTemplateSource(TemplateSource):
                 f"BucketName is not found. {self._include}"
             )
 
-        client = storage.Client(credentials=None, project=self._include.ProjectId)
-        blobs: Any = client.list_blobs(bucket_name)
+        client = get_gcs_client(project=project)
+        blobs: Any = client.list_blobs(bucket_name, prefix=self._prefix or None)
         for blob in blobs:
             if self.is_skipped(blob=blob):
                 self.logger.debug(f"{blob.name} is skipped.")
@@ -94,8 +132,25 @@ class GcsTemplateSource(TemplateSource):
                 project=project,
                 bucket=bucket_name,
                 default_table_prefix=self._include.DefaultTablePrefix,
+                blob=blob,
+                validator=self.get_validator(blob=blob),
+                manifest=self._manifest,
             )
 
+    @staticmethod
+    def get_validator(blob: Any) -> str | None:
+        """Get a value that changes when the object changes
+
+        Args:
+            blob (Any): Blob in a listing
+
+        Returns:
+            str | None: Generation, or MD5 hash if it is not given
+        """
+        if blob.generation:
+            return str(blob.generation)
+        return blob.md5_hash
+
     def is_skipped(self, blob: Any) -> bool:
         """Check the target path is skipped or not
 
@@ -105,10 +160,6 @@ class GcsTemplateSource(TemplateSource):
         Returns:
             bool: Is skipped or not
         """
-        return not re.fullmatch(
-            rf"{self._include.Regex}",
-            blob.name,
-        ) or self.is_excluded(
-            source_type=TemplateSourceType(self._include.TemplateSourceType),
-            key=blob.name,
+        return not self._include_pattern.fullmatch(blob.name) or self.is_excluded(
+            source_type=self._source_type, key=blob.name
         )
@@ -13,6 +13,8 @@ class StairlightConfigIncludeRedash(StairlightConfigInclude):
     DatabaseUrlEnvironmentVariable: str = "REDASH_DATABASE_URL"
     DataSourceName: str | None = None
     QueryIds: list[int] = field(default_factory=list)
+    BatchSize: int | None = None
+    Incremental: bool = False
 
 
 @dataclass
@@ -0,0 +1,11 @@
+SELECT
+    queries.id,
+    queries.name,
+    queries.query,
+    data_sources.name,
+    queries.updated_at,
+    queries.is_archived
+FROM
+    queries
+    INNER JOIN data_sources
+        ON queries.data_source_id = data_sources.id
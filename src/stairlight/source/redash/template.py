@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
+import threading
 from dataclasses import asdict
+from datetime import datetime, timezone
 from logging import getLogger
 from typing import Any, Iterator
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.engine.row import Row
 
+from src.stairlight.cache import RedashSyncManifest, RedashSyncState
 from src.stairlight.source.config import (
     MappingConfig,
     MappingConfigMappingTable,
@@ -19,6 +25,50 @@ from src.stairlight.source.template import Template, TemplateSource, TemplateSou
 
 logger = getLogger(__name__)
 
+# Engines keep connection pools, so one engine is shared by database URL
+_engines: dict[str, Engine] = {}
+_lock = threading.Lock()
+
+
+def get_redash_engine(connection_str: str) -> Engine:
+    """Get a database engine shared by connection string
+
+    Args:
+        connection_str (str): Connection string
+
+    Returns:
+        Engine: Engine
+    """
+    with _lock:
+        if connection_str not in _engines:
+            _engines[connection_str] = create_engine(connection_str)
+        return _engines[connection_str]
+
+
+def clear_redash_engines() -> None:
+    """Dispose shared engines and their connection pools"""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def parse_updated_at(updated_at: Any) -> datetime:
+    """Parse updated_at into a datetime in UTC, to compare it as a time
+
+    Args:
+        updated_at (Any): A datetime, or a string in some databases
+
+    Returns:
+        datetime: Timezone-aware updated_at in UTC
+    """
+    if not isinstance(updated_at, datetime):
+        updated_at = datetime.fromisoformat(str(updated_at))
+    if updated_at.tzinfo is None:
+        # Redash saves timestamps in UTC
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return updated_at.astimezone(timezone.utc)
+
 
 class RedashTemplate(Template):
     def __init__(
@@ -45,18 +95,11 @@ class RedashTemplate(Template):
         Yields:
             Iterator[dict]: Mapped table attributes
         """
-        mapping: Any
-        for mapping in self._mapping_config.get_mapping():
-            if mapping.TemplateSourceType != self.source_type.value:
-                continue
-
-            if (
-                mapping.DataSourceName == self.data_source_name
-                and mapping.QueryId == self.query_id
-            ):
-                for table_attributes in mapping.get_table():
-                    yield table_attributes
-                break
+        for mapping in self._mapping_config.find_redash_mappings(
+            data_source_name=self.data_source_name, query_id=self.query_id
+        ):
+            for table_attributes in mapping.get_table():
+                yield table_attributes
 
     def get_template_str(self) -> str:
         """Get template string that read from Redash
@@ -69,9 +112,21 @@ class RedashTemplate(Template):
         """Get uri"""
         return self.uri
 
+    def get_body_cache_key(self) -> str:
+        """Get a key of the body cache by a query id, not to be shared by names
+
+        Returns:
+            str: Cache key
+        """
+        return f"{self.source_type.value}:{self.data_source_name}:{self.key}"
+
 
 class RedashTemplateSource(TemplateSource):
     REDASH_QUERIES = "sql/redash_queries.sql"
+    REDASH_UPDATED_QUERIES = "sql/redash_updated_queries.sql"
+    UPDATED_AT_WHERE_CLAUSE = "queries.updated_at >= :updated_at"
+    # The number of queries fetched at once, when BatchSize is not set
+    BATCH_SIZE_DEFAULT = 1000
     WHERE_CLAUSE_TEMPLATES = {
         StairlightConfigKey.Redash.DATA_SOURCE_NAME: "data_sources.name = :data_source",
         StairlightConfigKey.Redash.QUERY_IDS: "queries.id IN :query_ids",
@@ -82,12 +137,14 @@ class RedashTemplateSource(TemplateSource):
         stairlight_config: StairlightConfig,
         mapping_config: MappingConfig,
         include: StairlightConfigIncludeRedash,
+        manifest: RedashSyncManifest | None = None,
     ) -> None:
         super().__init__(
             stairlight_config=stairlight_config,
             mapping_config=mapping_config,
         )
         self._include = include
+        self._manifest = manifest
         self.where_clause: list[str] = []
         self.conditions: dict[str, Any] = {}
 
@@ -97,7 +154,11 @@ class RedashTemplateSource(TemplateSource):
         Yields:
             Iterator[Template]: Attributes of query template files
         """
-        results = self.get_redash_queries()
+        results: Iterator[Any]
+        if self._include.Incremental and self._manifest:
+            results = self.sync_redash_queries()
+        else:
+            results = self.get_redash_queries()
         for result in results:
             # see columns "src/stairlight/source/redash/sql/redash_queries.sql"
             yield RedashTemplate(
@@ -108,42 +169,145 @@ class RedashTemplateSource(TemplateSource):
                 data_source_name=result[3],
             )
 
-    def get_redash_queries(self) -> list[Row]:
-        """Get Redash queries
+    def sync_redash_queries(self) -> Iterator[list[Any]]:
+        """Get Redash queries, fetching only the ones updated since the last run
+
+        Queries fetched before are kept in the manifest, and updated queries
+        replace them. Updated queries are fetched from all data sources,
+        so that queries archived or moved out of the include are removed.
+
+        Yields:
+            Iterator[list[Any]]: Queries
+        """
+        sync_key = self.get_sync_key()
+        state = self._manifest.get(key=sync_key) or RedashSyncState(
+            UpdatedAt=None, Queries={}
+        )
+        queries = dict(state.Queries)
+        updated_at = parse_updated_at(state.UpdatedAt) if state.UpdatedAt else None
+        latest_updated_at = updated_at
+
+        fetched = 0
+        for row in self.get_redash_queries(
+            path=self.REDASH_UPDATED_QUERIES, updated_at=updated_at
+        ):
+            # see columns "src/stairlight/source/redash/sql/redash_updated_queries.sql"
+            fetched += 1
+            if row[5] or not self.is_included(query_id=row[0], data_source_name=row[3]):
+                queries.pop(str(row[0]), None)
+            else:
+                queries[str(row[0])] = list(row[:4])
+            row_updated_at = parse_updated_at(row[4])
+            if not latest_updated_at or row_updated_at > latest_updated_at:
+                latest_updated_at = row_updated_at
+        logger.info(
+            f"Redash queries: {fetched} fetched since {state.UpdatedAt}, "
+            f"{len(queries)} synchronized"
+        )
+
+        self._manifest.set(
+            key=sync_key,
+            state=RedashSyncState(
+                UpdatedAt=(
+                    latest_updated_at.isoformat() if latest_updated_at else None
+                ),
+                Queries=queries,
+            ),
+        )
+        yield from queries.values()
+
+    def is_included(self, query_id: int, data_source_name: str) -> bool:
+        """Check if a query meets the conditions of the include
+
+        It is the same as the where clauses of WHERE_CLAUSE_TEMPLATES.
+
+        Args:
+            query_id (int): Query ID
+            data_source_name (str): Data source name
 
         Returns:
-            list[Row]: Queries
+            bool: The query is included or not
         """
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        query_text = self.build_query_string(
-            path=f"{current_dir}/{self.REDASH_QUERIES}"
+        return (
+            data_source_name == self._include.DataSourceName
+            and query_id in self._include.QueryIds
         )
-        data_source = self._include.DataSourceName
-        query_ids = tuple(self._include.QueryIds) if self._include.QueryIds else None
 
-        connection_str = self.get_connection_str()
-        engine = create_engine(connection_str)
-        with engine.connect() as conn:
-            queries = conn.execute(  # type: ignore
-                text(query_text),
-                data_source=data_source,
-                query_ids=query_ids,
+    def get_sync_key(self) -> str:
+        """Get a key of the manifest that identifies the include
+
+        Returns:
+            str: Key
+        """
+        attributes = json.dumps(asdict(self._include), sort_keys=True, default=str)
+        return hashlib.sha256(attributes.encode("utf-8")).hexdigest()
+
+    def get_redash_queries(
+        self, path: str = REDASH_QUERIES, updated_at: datetime | None = None
+    ) -> Iterator[Row]:
+        """Get Redash queries
+
+        Queries are streamed with a server-side cursor and fetched in batches,
+        so that templates are yielded before all the queries are fetched.
+
+        Args:
+            path (str, optional):
+                A path of a query file, relative to this module.
+                Defaults to REDASH_QUERIES.
+            updated_at (datetime, optional):
+                If it is set, queries updated at or after it are fetched
+                regardless of the conditions of the include. Defaults to None.
+
+        Yields:
+            Iterator[Row]: Queries
+        """
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        parameters: dict[str, Any]
+        if updated_at:
+            query_text = self.build_query_string(
+                path=f"{current_dir}/{path}",
+                where_clauses=[self.UPDATED_AT_WHERE_CLAUSE],
+            )
+            statement = text(query_text)
+            parameters = {"updated_at": updated_at}
+        else:
+            query_text = self.build_query_string(path=f"{current_dir}/{path}")
+            statement = text(query_text).bindparams(
+                bindparam("query_ids", expanding=True)
             )
-        return queries.fetchall()
+            parameters = {
+                "data_source": self._include.DataSourceName,
+                "query_ids": list(self._include.QueryIds),
+            }
+        batch_size = self._include.BatchSize or self.BATCH_SIZE_DEFAULT
+
+        engine = get_redash_engine(connection_str=self.get_connection_str())
+        with engine.connect() as conn:
+            queries = conn.execution_options(
+                stream_results=True, yield_per=batch_size
+            ).execute(statement, parameters)
+            for batch in queries.partitions():
+                yield from batch
 
-    def build_query_string(self, path: str) -> str:
+    def build_query_string(
+        self, path: str, where_clauses: list[str] | None = None
+    ) -> str:
         """Build a query string
 
         Args:
             path (str): Path
+            where_clauses (list[str], optional):
+                Where clauses used instead of the ones of the include.
+                Defaults to None.
 
         Returns:
             str: Query string
         """
-        where_clauses: list[str] = []
-        for key, value in self.WHERE_CLAUSE_TEMPLATES.items():
-            if key in asdict(self._include).keys():
-                where_clauses.append(value)
+        if where_clauses is None:
+            where_clauses = []
+            for key, value in self.WHERE_CLAUSE_TEMPLATES.items():
+                if key in asdict(self._include).keys():
+                    where_clauses.append(value)
 
         base_query_string = self.read_query_string(path=path)
         return base_query_string + "WHERE " + " AND ".join(where_clauses)
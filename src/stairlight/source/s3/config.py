@@ -12,6 +12,7 @@ class StairlightConfigIncludeS3(StairlightConfigInclude):
     TemplateSourceType: str = source_type.S3.value
     ProjectId: str | None = None
     BucketName: str | None = None
+    Prefix: str | None = None
     Regex: str | None = None
     DefaultTablePrefix: str | None = None
 
@@ -1,20 +1,52 @@
+from __future__ import annotations
+
+import threading
+
 import boto3
-from mypy_boto3_s3.service_resource import Object, S3ServiceResource
+from botocore.config import Config
+from mypy_boto3_s3.client import S3Client
 
 from src.stairlight.source.config_key import S3_URI_SCHEME
 
+# Enough connections for templates read in many threads
+S3_MAX_POOL_CONNECTIONS = 32
+
+# A client is thread-safe unlike a resource, so one client is shared
+_client: S3Client | None = None
+_lock = threading.Lock()
+
+
+def get_s3_client() -> S3Client:
+    """Get a S3 client shared in the process
+
+    Returns:
+        S3Client: S3 client
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            _client = boto3.session.Session().client(
+                "s3", config=Config(max_pool_connections=S3_MAX_POOL_CONNECTIONS)
+            )
+        return _client
+
 
-def get_s3_object(uri: str) -> Object:
-    """Get a S3 object
+def clear_s3_client() -> None:
+    """Drop the shared client, e.g. after credentials change"""
+    global _client
+    with _lock:
+        _client = None
+
+
+def split_s3_uri(uri: str) -> tuple[str, str]:
+    """Split a S3 URI into a bucket name and a key
 
     Args:
         uri (str): URI
 
     Returns:
-        Object: S3 object
+        tuple[str, str]: Bucket name and key
     """
     bucket_name = uri.replace(S3_URI_SCHEME, "").split("/")[0]
     key = uri.replace(f"{S3_URI_SCHEME}{bucket_name}/", "")
-
-    s3: S3ServiceResource = boto3.resource("s3")
-    return s3.Object(bucket_name=bucket_name, key=key)
+    return bucket_name, key
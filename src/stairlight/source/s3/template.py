@@ -3,27 +3,28 @@ from __future__ import annotations
 import re
 from typing import Iterator
 
-import boto3
 from botocore.response import StreamingBody
-from mypy_boto3_s3.service_resource import (
-    Bucket,
-    BucketObjectsCollection,
-    ObjectSummary,
-    S3ServiceResource,
-)
-from mypy_boto3_s3.type_defs import GetObjectOutputTypeDef
+from mypy_boto3_s3.type_defs import GetObjectOutputTypeDef, ObjectTypeDef
 
+from src.stairlight.cache import ObjectManifest
 from src.stairlight.source.config import (
     ConfigAttributeNotFoundException,
     MappingConfig,
     StairlightConfig,
+    find_regex_prefix,
 )
 from src.stairlight.source.controller import S3_URI_SCHEME
 from src.stairlight.source.s3.config import StairlightConfigIncludeS3
-from src.stairlight.source.template import Template, TemplateSource, TemplateSourceType
+from src.stairlight.source.s3.map import get_s3_client
+from src.stairlight.source.template import (
+    ObjectTemplate,
+    Template,
+    TemplateSource,
+    TemplateSourceType,
+)
 
 
-class S3Template(Template):
+class S3Template(ObjectTemplate):
     def __init__(
         self,
         mapping_config: MappingConfig,
@@ -31,6 +32,8 @@ class S3Template(Template):
         bucket: str | None = None,
         project: str | None = None,
         default_table_prefix: str | None = None,
+        validator: str | None = None,
+        manifest: ObjectManifest | None = None,
     ):
         super().__init__(
             mapping_config=mapping_config,
@@ -39,9 +42,10 @@ class S3Template(Template):
             bucket=bucket,
             project=project,
             default_table_prefix=default_table_prefix,
+            validator=validator,
+            manifest=manifest,
         )
         self.uri: str = self.get_uri()
-        self.s3: S3ServiceResource = boto3.resource("s3")
 
     def get_uri(self) -> str:
         """Get uri from bucket and key
@@ -61,8 +65,9 @@ class S3Template(Template):
         if not self.bucket:
             return template_str
 
-        s3_bucket: Bucket = self.s3.Bucket(self.bucket)
-        object_output: GetObjectOutputTypeDef = s3_bucket.Object(self.key).get()
+        object_output: GetObjectOutputTypeDef = get_s3_client().get_object(
+            Bucket=self.bucket, Key=self.key
+        )
         body: StreamingBody = object_output["Body"]
         if body:
             template_str = body.read().decode("utf-8")
@@ -75,13 +80,23 @@ class S3TemplateSource(TemplateSource):
         stairlight_config: StairlightConfig,
         mapping_config: MappingConfig,
         include: StairlightConfigIncludeS3,
+        max_downloads: int = 1,
+        manifest: ObjectManifest | None = None,
     ) -> None:
         super().__init__(
             stairlight_config=stairlight_config,
             mapping_config=mapping_config,
         )
         self._include = include
-        self.s3: S3ServiceResource = boto3.resource("s3")
+        self._max_downloads = max_downloads
+        self._manifest = manifest
+        self._include_pattern = re.compile(rf"{self._include.Regex}")
+
+        # Only objects under the prefix are listed, derived from Regex if not set
+        self._prefix = self._include.Prefix or find_regex_prefix(
+            regex=self._include.Regex
+        )
+        self._source_type = TemplateSourceType(self._include.TemplateSourceType)
 
     def search_templates(self) -> Iterator[Template]:
         """Search SQL template objects from S3
@@ -89,6 +104,16 @@ class S3TemplateSource(TemplateSource):
         Yields:
             Iterator[SQLTemplate]: Attributes of SQL template object
         """
+        return self.prefetch_templates(
+            templates=self.list_templates(), max_downloads=self._max_downloads
+        )
+
+    def list_templates(self) -> Iterator[Template]:
+        """List SQL template objects in S3
+
+        Yields:
+            Iterator[Template]: Attributes of SQL template object
+        """
         project = self._include.ProjectId
         bucket_name = self._include.BucketName
 
@@ -97,33 +122,32 @@ class S3TemplateSource(TemplateSource):
                 f"BucketName is not found. {self._include}"
             )
 
-        objects: BucketObjectsCollection = self.s3.Bucket(bucket_name).objects.all()
-        for obj in objects:
-            if self.is_skipped(obj=obj):
-                self.logger.debug(f"{obj.key} is skipped.")
-                continue
-
-            yield S3Template(
-                mapping_config=self._mapping_config,
-                key=obj.key,
-                project=project,
-                bucket=bucket_name,
-                default_table_prefix=self._include.DefaultTablePrefix,
-            )
-
-    def is_skipped(self, obj: ObjectSummary) -> bool:
+        paginator = get_s3_client().get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=self._prefix):
+            for obj in page.get("Contents", []):
+                if self.is_skipped(obj=obj):
+                    self.logger.debug(f"{obj['Key']} is skipped.")
+                    continue
+
+                yield S3Template(
+                    mapping_config=self._mapping_config,
+                    key=obj["Key"],
+                    project=project,
+                    bucket=bucket_name,
+                    default_table_prefix=self._include.DefaultTablePrefix,
+                    validator=obj.get("ETag"),
+                    manifest=self._manifest,
+                )
+
+    def is_skipped(self, obj: ObjectTypeDef) -> bool:
         """Check the target object is skipped or not
 
         Args:
-            obj (ObjectSummary): Object
+            obj (ObjectTypeDef): Object in a listing
 
         Returns:
             bool: Is skipped or not
         """
-        return not re.fullmatch(
-            rf"{self._include.Regex}",
-            obj.key,
-        ) or self.is_excluded(
-            source_type=TemplateSourceType(self._include.TemplateSourceType),
-            key=obj.key,
+        return not self._include_pattern.fullmatch(obj["Key"]) or self.is_excluded(
+            source_type=self._source_type, key=obj["Key"]
         )
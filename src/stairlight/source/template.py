@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import enum
+import functools
+import hashlib
 import re
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from logging import getLogger
 from string import Template as StringTemplate
 from typing import Any, Iterator
 
 from jinja2 import BaseLoader, Environment
+from jinja2 import Template as JinjaTemplate
 from jinja2.exceptions import UndefinedError
 
+from src.stairlight.cache import ObjectManifest, ObjectManifestEntry, TemplateBodyCache
 from src.stairlight.source.config import (
     MappingConfig,
     MappingConfigMappingTable,
@@ -18,6 +24,27 @@ from src.stairlight.source.config import (
 
 logger = getLogger(__name__)
 
+JINJA_EXPRESSION_PATTERN = re.compile("{{[^}]*}}", re.IGNORECASE)
+JINJA_PARAM_PATTERN = re.compile("[^{}]+", re.IGNORECASE)
+
+# The number of compiled jinja templates kept in memory
+JINJA_TEMPLATE_CACHE_SIZE = 256
+
+JINJA_ENVIRONMENT = Environment(loader=BaseLoader())
+
+
+@functools.lru_cache(maxsize=JINJA_TEMPLATE_CACHE_SIZE)
+def compile_jinja_template(template_str: str) -> JinjaTemplate:
+    """Compile a jinja template, compiled templates are shared by all renders
+
+    Args:
+        template_str (str): Template string
+
+    Returns:
+        JinjaTemplate: Compiled jinja template
+    """
+    return JINJA_ENVIRONMENT.from_string(template_str)
+
 
 class TemplateSourceType(enum.Enum):
     """Query template source type"""
@@ -83,34 +110,20 @@ class Template(ABC):
         self.project_name = project_name
         self.uri = ""
 
+        # Set while a map is built, so that the template is read only once
+        self.body_cache: TemplateBodyCache | None = None
+        self._prefetched_template_str: str | None = None
+
     def find_mapped_table_attributes(self) -> Iterator[MappingConfigMappingTable]:
         """Get mapped tables as iterator
 
         Yields:
             Iterator[dict]: Mapped table attributes
         """
-        mapping: Any
-        for mapping in self._mapping_config.get_mapping():
-            found: bool = False
-            if mapping.TemplateSourceType in (
-                TemplateSourceType.FILE.value,
-                TemplateSourceType.DBT.value,
-            ):
-                if self.key.endswith(mapping.FileSuffix):
-                    found = True
-            elif mapping.TemplateSourceType in (
-                TemplateSourceType.GCS.value,
-                TemplateSourceType.S3.value,
-            ):
-                if self.uri == mapping.Uri:
-                    found = True
-
-            if not found:
-                continue
-
+        mapping = self._mapping_config.find_mapping(key=self.key, uri=self.uri)
+        if mapping:
             for table_attributes in mapping.get_table():
                 yield table_attributes
-            break
 
     @property
     def mapped(self) -> bool:
@@ -135,14 +148,39 @@ class Template(ABC):
         Returns:
             list: Jinja parameters
         """
-        jinja_expressions = "".join(
-            re.findall("{{[^}]*}}", template_str, re.IGNORECASE)
-        )
+        jinja_expressions = "".join(JINJA_EXPRESSION_PATTERN.findall(template_str))
         return [
-            param.strip()
-            for param in re.findall("[^{}]+", jinja_expressions, re.IGNORECASE)
+            param.strip() for param in JINJA_PARAM_PATTERN.findall(jinja_expressions)
         ]
 
+    @staticmethod
+    def create_fingerprint(template_str: str) -> str:
+        """create a hash of template string
+
+        Args:
+            template_str (str): Template string
+
+        Returns:
+            str: Hash of template string
+        """
+        return hashlib.sha256(template_str.encode("utf-8")).hexdigest()
+
+    def get_template_fingerprint(self) -> str:
+        """Get a hash of template string
+
+        Returns:
+            str: Hash of template string
+        """
+        return self.create_fingerprint(template_str=self.read_template_str())
+
+    def find_jinja_params(self) -> list[str]:
+        """Find jinja parameters in template string
+
+        Returns:
+            list[str]: Jinja parameters
+        """
+        return self.get_jinja_params(template_str=self.read_template_str())
+
     def render_by_jinja(
         self,
         template_str: str,
@@ -165,8 +203,7 @@ class Template(ABC):
 
         rendered_str: str = template_str
         try:
-            env = Environment(loader=BaseLoader())
-            template = env.from_string(template_str)
+            template = compile_jinja_template(template_str=template_str)
             rendered_str = template.render(params)
         except UndefinedError as undefined_error:
             logger.warning(
@@ -269,6 +306,48 @@ class Template(ABC):
         """Get template strings that read from template source"""
         pass
 
+    def read_template_str(self) -> str:
+        """Get template strings, from the body cache if it is set
+
+        Returns:
+            str: Template string
+        """
+        if not self.body_cache:
+            return self.fetch_template_str()
+        return self.body_cache.get(
+            key=self.get_body_cache_key(), fetch=self.fetch_template_str
+        )
+
+    def get_body_cache_key(self) -> str:
+        """Get a key of the body cache, that identifies a template
+
+        Returns:
+            str: Cache key
+        """
+        return f"{self.source_type.value}:{self.uri or self.key}"
+
+    def fetch_template_str(self) -> str:
+        """Get template strings, the prefetched ones if exist
+
+        Prefetched strings are handed over once, not to keep them in memory.
+
+        Returns:
+            str: Template string
+        """
+        if self._prefetched_template_str is not None:
+            template_str = self._prefetched_template_str
+            self._prefetched_template_str = None
+            return template_str
+        return self.get_template_str()
+
+    def prefetch_template_str(self) -> None:
+        """Read template strings in advance, it is called in another thread"""
+        try:
+            self._prefetched_template_str = self.get_template_str()
+        except Exception as e:
+            # Read again when it is needed, to raise errors in the caller
+            logger.debug(f"Failed to prefetch {self.uri or self.key}: {e}")
+
     def render(self, params: dict[str, Any], ignore_params: list[str] = None) -> str:
         """Render a query statement from a jinja template
         Args:
@@ -277,7 +356,7 @@ class Template(ABC):
         Returns:
             str: Query statement
         """
-        rendered_str = self.get_template_str()
+        rendered_str = self.read_template_str()
         rendered_str = self.ignore_jinja_params(
             template_str=rendered_str,
             ignore_params=ignore_params,
@@ -303,6 +382,114 @@ class Template(ABC):
         return rendered_str
 
 
+class ObjectTemplate(Template):
+    """Query template in object storage, which has a validator in listing"""
+
+    def __init__(
+        self,
+        mapping_config: MappingConfig,
+        key: str,
+        source_type: TemplateSourceType,
+        bucket: str | None = None,
+        project: str | None = None,
+        default_table_prefix: str | None = None,
+        validator: str | None = None,
+        manifest: ObjectManifest | None = None,
+    ):
+        """Query template in object storage
+
+        Args:
+            mapping_config (MappingConfig): Mapping configuration
+            key (str): Object key
+            source_type (TemplateSourceType): Template source type
+            bucket (str, optional): Bucket name. Defaults to None.
+            project (str, optional): Project ID. Defaults to None.
+            default_table_prefix (str, optional):
+                Default table prefix. Defaults to None.
+            validator (str, optional):
+                A value that changes when the object changes,
+                given by listing objects. Defaults to None.
+            manifest (ObjectManifest, optional):
+                A manifest of template objects. If it is set with a validator,
+                unchanged objects are not downloaded. Defaults to None.
+        """
+        super().__init__(
+            mapping_config=mapping_config,
+            key=key,
+            source_type=source_type,
+            bucket=bucket,
+            project=project,
+            default_table_prefix=default_table_prefix,
+        )
+        self.validator = validator
+        self._manifest = manifest if validator else None
+        self._manifest_entry: ObjectManifestEntry | None = None
+        self._manifest_looked_up = False
+
+    def get_template_fingerprint(self) -> str:
+        """Get a hash of template string, from the manifest if the object is unchanged
+
+        Returns:
+            str: Hash of template string
+        """
+        if not self._manifest:
+            return super().get_template_fingerprint()
+        return self.get_manifest_entry().Hash
+
+    def find_jinja_params(self) -> list[str]:
+        """Find jinja parameters, from the manifest if the object is unchanged
+
+        Returns:
+            list[str]: Jinja parameters
+        """
+        if not self._manifest:
+            return super().find_jinja_params()
+        return list(self.get_manifest_entry().Parameters)
+
+    def prefetch_template_str(self) -> None:
+        """Read template strings in advance, unless the object is unchanged"""
+        if self.find_manifest_entry():
+            return
+        super().prefetch_template_str()
+
+    def find_manifest_entry(self) -> ObjectManifestEntry | None:
+        """Find a manifest entry of the object if it is unchanged
+
+        Returns:
+            ObjectManifestEntry | None:
+                Manifest entry, or None if the object is added or changed
+        """
+        if not self._manifest or not self.validator:
+            return None
+        if not self._manifest_looked_up:
+            self._manifest_looked_up = True
+            self._manifest_entry = self._manifest.get(
+                uri=self.uri or self.get_uri(), validator=self.validator
+            )
+        return self._manifest_entry
+
+    def get_manifest_entry(self) -> ObjectManifestEntry:
+        """Get a manifest entry, the object is downloaded only if it is changed
+
+        Returns:
+            ObjectManifestEntry: Manifest entry
+        """
+        entry = self.find_manifest_entry()
+        if entry:
+            return entry
+
+        template_str = self.read_template_str()
+        entry = ObjectManifestEntry(
+            Validator=self.validator or "",
+            Hash=self.create_fingerprint(template_str=template_str),
+            Parameters=self.get_jinja_params(template_str=template_str),
+        )
+        if self._manifest:
+            self._manifest.set(uri=self.uri or self.get_uri(), entry=entry)
+        self._manifest_entry = entry
+        return entry
+
+
 class RenderingTemplateException(Exception):
     """Exception when failing to render jinja templates.
 
@@ -347,6 +534,49 @@ class TemplateSource(ABC):
         """
         pass
 
+    def prepare(self) -> None:
+        """Prepare to search templates, e.g. build them. Nothing to do by default
+
+        It is called in advance, in another thread if sources are prepared
+        concurrently.
+        """
+        pass
+
+    @staticmethod
+    def prefetch_templates(
+        templates: Iterator[Template], max_downloads: int
+    ) -> Iterator[Template]:
+        """Download template strings in a thread pool while templates are listed
+
+        Templates are yielded in the listed order after they are downloaded.
+        At most max_downloads * 2 templates are kept downloaded ahead.
+
+        Args:
+            templates (Iterator[Template]): Listed templates
+            max_downloads (int): The number of concurrent downloads
+
+        Yields:
+            Iterator[Template]: Downloaded templates
+        """
+        if max_downloads <= 1:
+            yield from templates
+            return
+
+        with ThreadPoolExecutor(max_workers=max_downloads) as executor:
+            futures: deque[tuple[Template, Future[None]]] = deque()
+            for template in templates:
+                futures.append(
+                    (template, executor.submit(template.prefetch_template_str))
+                )
+                if len(futures) >= max_downloads * 2:
+                    downloaded, future = futures.popleft()
+                    future.result()
+                    yield downloaded
+            while futures:
+                downloaded, future = futures.popleft()
+                future.result()
+                yield downloaded
+
     def is_excluded(self, source_type: TemplateSourceType, key: str) -> bool:
         """Check if the specified file is out of scope
 
@@ -357,11 +587,9 @@ class TemplateSource(ABC):
         Returns:
             bool: Return True if the specified file is out of scope
         """
-        result = False
-        for exclude in self._stairlight_config.get_exclude():
-            if source_type == TemplateSourceType(
-                exclude.TemplateSourceType
-            ) and re.search(rf"{exclude.Regex}", key):
-                result = True
-                break
-        return result
+        return any(
+            pattern.search(key)
+            for pattern in self._stairlight_config.get_exclude_patterns(
+                source_type=source_type.value
+            )
+        )
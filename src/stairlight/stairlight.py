@@ -2,13 +2,21 @@ from __future__ import annotations
 
 import enum
 import os
-from dataclasses import asdict
+import sys
+from dataclasses import asdict, dataclass, field
 from logging import getLogger
-from typing import Any, OrderedDict
+from typing import Any, Iterator, OrderedDict
 
 import src.stairlight.util as sl_util
+from src.stairlight.cache import (
+    FileManifest,
+    ObjectManifest,
+    ParseCache,
+    RedashSyncManifest,
+)
 from src.stairlight.configurator import Configurator
 from src.stairlight.map import Map, MappedTemplate
+from src.stairlight.query import QueryParser
 from src.stairlight.source.config import (
     MapKey,
     MappingConfig,
@@ -17,12 +25,15 @@ from src.stairlight.source.config import (
 )
 from src.stairlight.source.config_key import MappingConfigKey
 from src.stairlight.source.controller import LoadMapController, SaveMapController
+from src.stairlight.source.file.config import StairlightConfigIncludeFile
 from src.stairlight.source.template import TemplateSourceType
+from src.stairlight.watcher import Watcher, WatchTarget
 
 STAIRLIGHT_CONFIG_PREFIX_DEFAULT = "stairlight"
 MAPPING_CONFIG_PREFIX_DEFAULT = "mapping"
 CONFIG_UNMAPPED_PREFIX_DEFAULT = "unmapped"
 CONFIG_NOT_FOUND_PREFIX_DEFAULT = "not_found"
+MAX_DOWNLOADS_DEFAULT = 8
 
 logger = getLogger(__name__)
 
@@ -47,6 +58,46 @@ class SearchDirection(enum.Enum):
         return self.name
 
 
+@dataclass
+class SearchFrame:
+    """A frame of the stack to search tables"""
+
+    table_name: str
+    relatives: Iterator[tuple[str, list[dict[str, Any]]]]
+    templates: list[dict[str, Any]] = field(default_factory=list)
+    results: dict[str, Any] = field(default_factory=dict)
+    cut_depth: int = sys.maxsize
+    # Tables without templates in the results, left out when they are on the path
+    leaf_tables: set[str] = field(default_factory=set)
+
+    def add_result(
+        self,
+        table_name: str,
+        templates: list[dict[str, Any]],
+        next_results: dict[str, Any],
+        direction: SearchDirection,
+    ) -> None:
+        """Add a verbose result of the next table
+
+        Args:
+            table_name (str): Next table name
+            templates (list[dict[str, Any]]): Templates that lead to the table
+            next_results (dict[str, Any]): Results of the next table
+            direction (SearchDirection): Search direction
+        """
+        self.results[table_name] = {"Templates": templates}
+        if next_results:
+            self.results[table_name][direction.value] = next_results
+
+
+@dataclass
+class SearchResults:
+    """Results of searching many tables"""
+
+    results: dict[str, list[str] | dict[str, Any]]
+    union: list[str] | dict[str, Any]
+
+
 class StairLight:
     """A table dependency detector"""
 
@@ -57,6 +108,14 @@ class StairLight:
         save_file: str = "",
         stairlight_config_prefix: str = STAIRLIGHT_CONFIG_PREFIX_DEFAULT,
         mapping_config_prefix: str = MAPPING_CONFIG_PREFIX_DEFAULT,
+        max_workers: int | None = None,
+        max_processes: int | None = None,
+        max_downloads: int | None = None,
+        max_dbt_compiles: int | None = None,
+        cache_dir: str | None = None,
+        keep_caches: bool = False,
+        query_parser: str | None = None,
+        dbt_no_compile: bool = False,
     ) -> None:
         """A table dependency detector
 
@@ -67,16 +126,59 @@ class StairLight:
                 file names of loading results if load option set. Defaults to None.
             save_file (str, optional):
                 A file name of saving results if save option set. Defaults to None.
+            max_workers (int, optional):
+                The number of threads to create a map. If it is not set,
+                MaxWorkers in the settings section is used. Defaults to None.
+            max_processes (int, optional):
+                The number of processes to parse queries. If it is not set,
+                MaxProcesses in the settings section is used. Defaults to None.
+            max_downloads (int, optional):
+                The number of threads to download templates from GCS and S3.
+                If it is not set, MaxDownloads in the settings section is used,
+                and 8 is used if neither is set. Defaults to None.
+            max_dbt_compiles (int, optional):
+                The number of dbt projects compiled concurrently.
+                If it is not set, MaxDbtCompiles in the settings section is used.
+                Defaults to None.
+            cache_dir (str, optional):
+                A directory to cache parsed results and manifests of template
+                files and objects across runs. If it is not set, CacheDir in
+                the settings section is used. Defaults to None.
+            keep_caches (bool, optional):
+                Keep parsed results in memory even if cache_dir is not set,
+                to rebuild a map quickly in the same process. Defaults to False.
+            query_parser (str, optional):
+                Engine to detect upstair tables, "regex" or "tokenizer".
+                If it is not set, QueryParser in the settings section is used,
+                and "regex" is used if neither is set. Defaults to None.
+            dbt_no_compile (bool, optional):
+                Read compiled files of dbt projects without executing dbt compile.
+                If it is False, DbtNoCompile in the settings section is used.
+                Defaults to False.
         """
         self.load_files = load_files
         self.save_file: str = save_file
         self._configurator = Configurator(dir=config_dir)
         self._mapped: dict[str, dict[str, list[MappedTemplate] | None] | None] = {}
+        self._upstairs_index: dict[str, dict[str, list[dict[str, Any]]]] = {}
+        self._downstairs_index: dict[str, dict[str, list[dict[str, Any]]]] = {}
         self._unmapped: list[dict[str, Any]] = []
         self._not_found: list[str] = []
         self._mapping_config: MappingConfig | None = None
         self._stairlight_config_prefix: str = stairlight_config_prefix
         self._mapping_config_prefix: str = mapping_config_prefix
+        self._max_workers: int | None = max_workers
+        self._max_processes: int | None = max_processes
+        self._max_downloads: int | None = max_downloads
+        self._max_dbt_compiles: int | None = max_dbt_compiles
+        self._cache_dir: str | None = cache_dir
+        self._keep_caches: bool = keep_caches
+        self._query_parser: str | None = query_parser
+        self._dbt_no_compile: bool = dbt_no_compile
+        self._parse_cache: ParseCache | None = None
+        self._file_manifest: FileManifest | None = None
+        self._object_manifest: ObjectManifest | None = None
+        self._redash_sync_manifest: RedashSyncManifest | None = None
         self._stairlight_config: StairlightConfig = self._configurator.read_stairlight(
             prefix=stairlight_config_prefix
         )
@@ -149,6 +251,7 @@ class StairLight:
                 self._mapped = sl_util.deep_merge(original=self._mapped, add=loaded_map)
             else:
                 self._mapped = loaded_map
+            self.index_map(mapped=loaded_map)
 
     def _set_config(self) -> None:
         """Set configurations"""
@@ -165,6 +268,20 @@ class StairLight:
                 if settings.MappingPrefix
                 else MAPPING_CONFIG_PREFIX_DEFAULT
             )
+            if not self._max_workers:
+                self._max_workers = settings.MaxWorkers
+            if not self._max_processes:
+                self._max_processes = settings.MaxProcesses
+            if not self._max_downloads:
+                self._max_downloads = settings.MaxDownloads
+            if not self._max_dbt_compiles:
+                self._max_dbt_compiles = settings.MaxDbtCompiles
+            if not self._cache_dir:
+                self._cache_dir = settings.CacheDir
+            if not self._query_parser:
+                self._query_parser = settings.QueryParser
+            if not self._dbt_no_compile:
+                self._dbt_no_compile = bool(settings.DbtNoCompile)
 
             if settings.MappingFilesRegex:
                 mapping_config = self._configurator.read_mapping_with_regex(
@@ -182,18 +299,105 @@ class StairLight:
 
     def _write_map(self) -> None:
         """Write a dependency map"""
+        if not self._parse_cache and (self._cache_dir or self._keep_caches):
+            self._parse_cache = ParseCache(cache_dir=self._cache_dir)
+            self._parse_cache.load()
+            self._file_manifest = FileManifest(cache_dir=self._cache_dir)
+            self._file_manifest.load()
+            self._object_manifest = ObjectManifest(cache_dir=self._cache_dir)
+            self._object_manifest.load()
+            self._redash_sync_manifest = RedashSyncManifest(cache_dir=self._cache_dir)
+            self._redash_sync_manifest.load()
+
         dependency_map = Map(
             stairlight_config=self._stairlight_config,
             mapping_config=self._mapping_config,
+            max_workers=self._max_workers or 1,
+            max_processes=self._max_processes or 1,
+            max_downloads=self._max_downloads or MAX_DOWNLOADS_DEFAULT,
+            max_dbt_compiles=self._max_dbt_compiles or 1,
+            parse_cache=self._parse_cache,
+            file_manifest=self._file_manifest,
+            object_manifest=self._object_manifest,
+            redash_sync_manifest=self._redash_sync_manifest,
+            query_parser=self._query_parser or QueryParser.REGEX.value,
+            dbt_no_compile=self._dbt_no_compile,
         )
 
         dependency_map.write()
         if self._mapping_config:
             self._mapped = dependency_map.mapped
+            self.index_map(mapped=self._mapped)
 
         self._unmapped = dependency_map.unmapped
         self._not_found = self.get_templates_not_found()
 
+    def reload_map(self) -> None:
+        """Read configurations again and rebuild a dependency map
+
+        Parsed results are reused if caches are kept,
+        so only added or changed templates are parsed again.
+        """
+        self._stairlight_config = self._configurator.read_stairlight(
+            prefix=self._stairlight_config_prefix
+        )
+        self._mapped = {}
+        self._upstairs_index = {}
+        self._downstairs_index = {}
+        self._unmapped = []
+        self._not_found = []
+        self.create_map()
+
+    def watch(
+        self, interval: float = 1.0, debounce: float = 0.5
+    ) -> Iterator[list[str]]:
+        """Rebuild a dependency map whenever templates or configurations change
+
+        Template files in local file system and configuration files are polled.
+        If save_file is set, the rebuilt map is saved.
+
+        Args:
+            interval (float, optional): Polling interval in seconds. Defaults to 1.0.
+            debounce (float, optional):
+                Seconds to wait until files stop changing. Defaults to 0.5.
+
+        Yields:
+            Iterator[list[str]]: Paths of changed files
+        """
+        self._keep_caches = True
+        watcher = Watcher(
+            targets=self.find_watch_targets(), interval=interval, debounce=debounce
+        )
+        for changes in watcher.watch():
+            self.reload_map()
+            watcher.targets = self.find_watch_targets()
+            yield changes
+
+    def find_watch_targets(self) -> list[WatchTarget]:
+        """Find directories and regexes of files that a map depends on
+
+        Only configuration files that have been read are watched,
+        not to scan the whole configuration directory.
+
+        Returns:
+            list[WatchTarget]: Watch targets
+        """
+        targets: list[WatchTarget] = [
+            WatchTarget(path=config_file, regex=".*")
+            for config_file in sorted(self._configurator.read_files)
+        ]
+        for include in self._stairlight_config.get_include():
+            if (
+                isinstance(include, StairlightConfigIncludeFile)
+                and include.FileSystemPath
+            ):
+                targets.append(
+                    WatchTarget(
+                        path=include.FileSystemPath, regex=include.Regex or ".*"
+                    )
+                )
+        return targets
+
     def get_templates_not_found(self) -> list[str]:
         not_found: set[str] = set()
 
@@ -427,8 +631,6 @@ class StairLight:
                 table_name=table_name,
                 recursive=recursive,
                 direction=direction,
-                searched_tables=[],
-                head=True,
             )
 
         if response_type in [type.value for type in ResponseType]:
@@ -437,8 +639,6 @@ class StairLight:
                 recursive=recursive,
                 response_type=response_type,
                 direction=direction,
-                searched_tables=[],
-                head=True,
             )
 
         return []
@@ -448,139 +648,552 @@ class StairLight:
         table_name: str,
         recursive: bool,
         direction: SearchDirection,
-        searched_tables: list[str],
-        head: bool,
+        cached_results: dict[str, SearchFrame] | None = None,
     ) -> dict[str, Any]:
         """Search nodes and return verbose results
 
+        Tables are traversed with an explicit stack, and results of each table
+        are cached to be reused when the table is reachable from multiple paths.
+        A result cut off by a circular reference to a table on the path
+        is not cached, and a cached result is not reused on a path that has
+        one of its tables without templates.
+
         Args:
             table_name (str): Table name
             recursive (bool): Search recursively or not
             direction (SearchDirection): Search direction
-            searched_tables (list[str]): a list of searched tables
-            head (bool): Current position is head or not
+            cached_results (dict[str, SearchFrame], optional):
+                Finished frames of tables whose results do not depend on
+                the path, shared by searches of many tables. Defaults to None.
 
         Returns:
             dict: Search results
         """
-        search_results: dict[str, dict[str, Any]] = {}
-        response: dict[str, Any] = {table_name: {}}
+        if not recursive:
+            relative_map = self.create_relative_map(
+                target_table_name=table_name, direction=direction
+            )
+            return {
+                table_name: {
+                    direction.value: {
+                        next_table_name: {"Templates": templates}
+                        for next_table_name, templates in relative_map.items()
+                    }
+                }
+            }
+
+        if cached_results is None:
+            cached_results = {}
+        # Tables on the current path with their depths
+        searched_tables: dict[str, int] = {table_name: 0}
+        stack: list[SearchFrame] = [
+            self.create_search_frame(table_name=table_name, direction=direction)
+        ]
+        while True:
+            frame = stack[-1]
+            relative = next(frame.relatives, None)
+
+            if relative is None:
+                stack.pop()
+                searched_tables.popitem()
+
+                # Results depending on the tables on the path are not reusable
+                if frame.cut_depth > len(stack):
+                    cached_results[frame.table_name] = frame
+                if not stack:
+                    return {table_name: {direction.value: frame.results}}
+
+                stack[-1].add_result(
+                    table_name=frame.table_name,
+                    templates=frame.templates,
+                    next_results=frame.results,
+                    direction=direction,
+                )
+                stack[-1].cut_depth = min(stack[-1].cut_depth, frame.cut_depth)
+                stack[-1].leaf_tables.update(frame.leaf_tables)
+                continue
+
+            next_table_name, templates = relative
+            if next_table_name in searched_tables:
+                details = {
+                    "table_name": frame.table_name,
+                    "next_table_name": next_table_name,
+                    "searched_tables": list(searched_tables) + [next_table_name],
+                }
+                logger.warning(f"Circular references detected!: {details}")
+                frame.cut_depth = min(frame.cut_depth, searched_tables[next_table_name])
+                continue
+
+            # Tables without templates are not searched further, but whether
+            # they are on the path or not changes results of tables above
+            if not templates:
+                frame.leaf_tables.add(next_table_name)
+                frame.add_result(
+                    table_name=next_table_name,
+                    templates=templates,
+                    next_results={},
+                    direction=direction,
+                )
+                continue
+
+            cached_frame = cached_results.get(next_table_name)
+            if cached_frame and cached_frame.leaf_tables.isdisjoint(searched_tables):
+                frame.add_result(
+                    table_name=next_table_name,
+                    templates=templates,
+                    next_results=cached_frame.results,
+                    direction=direction,
+                )
+                frame.leaf_tables.update(cached_frame.leaf_tables)
+                continue
+
+            searched_tables[next_table_name] = len(stack)
+            stack.append(
+                self.create_search_frame(
+                    table_name=next_table_name,
+                    direction=direction,
+                    templates=templates,
+                )
+            )
 
-        relative_map = self.create_relative_map(
-            target_table_name=table_name, direction=direction
-        )
+    def search_plain(
+        self,
+        table_name: str,
+        recursive: bool,
+        response_type: str,
+        direction: SearchDirection,
+    ) -> list[str]:
+        """Search nodes and return simple results
 
-        for next_table_name, templates in relative_map.items():
-            if recursive:
-                if head:
-                    searched_tables = [table_name]
+        Tables are traversed with an explicit stack,
+        and each table is searched only once.
+        A circular reference back to a table on the path counts only if
+        the table that refers to it is reachable without passing it,
+        so results do not depend on the order tables are searched in.
 
-                searched_tables.append(next_table_name)
+        Args:
+            table_name (str): Table name
+            recursive (bool): Search recursively or not
+            response_type (str): Response type value
+            direction (SearchDirection): Search direction
 
-                if sl_util.is_cyclic(tables=searched_tables):
-                    details = {
-                        "table_name": table_name,
-                        "next_table_name": next_table_name,
-                        "searched_tables": searched_tables,
-                    }
-                    logger.warning(f"Circular references detected!: {details}")
-                    continue
+        Returns:
+            list[str]: Search results
+        """
+        response: set[str] = set()
+        visited_tables: set[str] = {table_name}
+        # Tables on the current path
+        searched_tables: dict[str, None] = {table_name: None}
+        postorder: list[str] = []
+        predecessors: dict[str, list[str]] = {table_name: []}
+        circular_references: list[tuple[str, str, list[dict[str, Any]]]] = []
+        stack: list[SearchFrame] = [
+            self.create_search_frame(table_name=table_name, direction=direction)
+        ]
+        while stack:
+            frame = stack[-1]
+            relative = next(frame.relatives, None)
+
+            if relative is None:
+                stack.pop()
+                searched_tables.popitem()
+                postorder.append(frame.table_name)
+                continue
+
+            next_table_name, templates = relative
+            if recursive and templates:
+                predecessors.setdefault(next_table_name, []).append(frame.table_name)
+            if recursive and next_table_name in searched_tables:
+                details = {
+                    "table_name": frame.table_name,
+                    "next_table_name": next_table_name,
+                    "searched_tables": list(searched_tables) + [next_table_name],
+                }
+                logger.info(f"Circular references detected!: {details}")
+                circular_references.append(
+                    (frame.table_name, next_table_name, templates)
+                )
+                continue
+
+            self.add_plain_results(
+                response=response,
+                next_table_name=next_table_name,
+                templates=templates,
+                response_type=response_type,
+            )
 
-            search_results[next_table_name] = {}
-            search_results[next_table_name]["Templates"] = []
-            for template in templates:
-                if recursive:
-                    next_response = self.search_verbose(
-                        table_name=next_table_name,
-                        direction=direction,
-                        recursive=recursive,
-                        searched_tables=searched_tables,
-                        head=False,
+            if recursive and templates and next_table_name not in visited_tables:
+                visited_tables.add(next_table_name)
+                searched_tables[next_table_name] = None
+                stack.append(
+                    self.create_search_frame(
+                        table_name=next_table_name, direction=direction
                     )
+                )
 
-                    if not next_response.get(next_table_name):
-                        continue
+        if circular_references:
+            dominators = self.find_dominators(
+                postorder=postorder, predecessors=predecessors
+            )
+            for current_table_name, next_table_name, templates in circular_references:
+                # Every path to the table passes the referenced table
+                dominated = current_table_name == next_table_name
+                while not dominated and current_table_name != table_name:
+                    current_table_name = dominators[current_table_name]
+                    dominated = current_table_name == next_table_name
+                if dominated:
+                    continue
+                self.add_plain_results(
+                    response=response,
+                    next_table_name=next_table_name,
+                    templates=templates,
+                    response_type=response_type,
+                )
 
-                    search_results[next_table_name]["Templates"] = relative_map[
-                        next_table_name
-                    ]
-                    if next_response[next_table_name][direction.value]:
-                        search_results[next_table_name][direction.value] = (
-                            next_response[next_table_name][direction.value]
-                        )
-                else:
-                    search_results[table_name]["Templates"].append(template)
+        return sorted(response)
 
-        response[table_name][direction.value] = search_results
-        return response
+    @staticmethod
+    def add_plain_results(
+        response: set[str],
+        next_table_name: str,
+        templates: list[dict[str, Any]],
+        response_type: str,
+    ) -> None:
+        """Add simple results of the next table
 
-    def search_plain(
+        Args:
+            response (set[str]): Search results to add to
+            next_table_name (str): Next table name
+            templates (list[dict[str, Any]]): Templates that lead to the table
+            response_type (str): Response type value
+        """
+        for template in templates:
+            if response_type == ResponseType.TABLE.value:
+                response.add(next_table_name)
+            elif response_type == ResponseType.URI.value:
+                uri = template.get(MapKey.URI)
+                if uri:
+                    response.add(uri)
+
+    @staticmethod
+    def find_dominators(
+        postorder: list[str], predecessors: dict[str, list[str]]
+    ) -> dict[str, str]:
+        """Find immediate dominators by Cooper, Harvey and Kennedy's algorithm
+
+        A table dominates another table if every path from the searched table
+        to the other table passes it.
+
+        Args:
+            postorder (list[str]):
+                Tables in postorder of a depth-first search,
+                whose last table is the searched table
+            predecessors (dict[str, list[str]]): Tables that lead to each table
+
+        Returns:
+            dict[str, str]: Immediate dominator of each table
+        """
+        orders = {table_name: i for i, table_name in enumerate(postorder)}
+        root_table_name = postorder[-1]
+        dominators: dict[str, str] = {root_table_name: root_table_name}
+
+        changed = True
+        while changed:
+            changed = False
+            for table_name in reversed(postorder[:-1]):
+                dominator: str | None = None
+                for predecessor in predecessors[table_name]:
+                    if predecessor not in dominators:
+                        continue
+                    if dominator is None:
+                        dominator = predecessor
+                        continue
+                    while predecessor != dominator:
+                        while orders[predecessor] < orders[dominator]:
+                            predecessor = dominators[predecessor]
+                        while orders[dominator] < orders[predecessor]:
+                            dominator = dominators[dominator]
+                if dominator is not None and dominators.get(table_name) != dominator:
+                    dominators[table_name] = dominator
+                    changed = True
+        return dominators
+
+    def search_many(
         self,
-        table_name: str,
+        table_names: list[str],
         recursive: bool,
+        verbose: bool,
         response_type: str,
         direction: SearchDirection,
-        searched_tables: list[str],
-        head: bool,
-    ) -> list[str]:
-        """Search nodes and return simple results
+    ) -> SearchResults:
+        """Search nodes of many tables at once
+
+        Tables reachable from more than one table are searched only once.
 
         Args:
-            table_name (str): Table name
+            table_names (list[str]): Table names
             recursive (bool): Search recursively or not
+            verbose (bool): Return verbose results or not
             response_type (str): Response type value
             direction (SearchDirection): Search direction
-            searched_tables (list[str]): a list of searched tables
-            head (bool): Current position is head or not
 
         Returns:
-            list[str]: Search results
+            SearchResults: Results of each table and the union of them
         """
-        relative_map = self.create_relative_map(
-            target_table_name=table_name, direction=direction
+        table_names = list(dict.fromkeys(table_names))
+        if verbose:
+            cached_results: dict[str, SearchFrame] = {}
+            verbose_results: dict[str, Any] = {
+                table_name: self.search_verbose(
+                    table_name=table_name,
+                    recursive=recursive,
+                    direction=direction,
+                    cached_results=cached_results,
+                )
+                for table_name in table_names
+            }
+            union: dict[str, Any] = {}
+            for verbose_result in verbose_results.values():
+                union.update(verbose_result)
+            return SearchResults(results=verbose_results, union=union)
+
+        plain_results: dict[str, list[str]]
+        if response_type not in [type.value for type in ResponseType]:
+            plain_results = {table_name: [] for table_name in table_names}
+        elif recursive:
+            plain_results = self.search_plain_many(
+                table_names=table_names,
+                response_type=response_type,
+                direction=direction,
+            )
+        else:
+            plain_results = {
+                table_name: self.search_plain(
+                    table_name=table_name,
+                    recursive=recursive,
+                    response_type=response_type,
+                    direction=direction,
+                )
+                for table_name in table_names
+            }
+        return SearchResults(
+            results=dict(plain_results),
+            union=sorted(set().union(*plain_results.values())),
         )
-        response: list[str] = []
-        if not relative_map:
-            return response
-
-        next_table_name: str
-        for next_table_name, templates in relative_map.items():
-            if recursive:
-                if head:
-                    searched_tables = []
-                    searched_tables.append(table_name)
-
-                searched_tables.append(next_table_name)
-
-                if sl_util.is_cyclic(tables=searched_tables):
-                    details = {
-                        "table_name": table_name,
-                        "next_table_name": next_table_name,
-                        "searched_tables": searched_tables,
-                    }
-                    logger.info(f"Circular references detected!: {details}")
-                    continue
 
-            for template in templates:
-                if recursive:
-                    next_response = self.search_plain(
-                        table_name=next_table_name,
-                        direction=direction,
-                        recursive=recursive,
-                        response_type=response_type,
-                        searched_tables=searched_tables,
-                        head=False,
+    def search_plain_many(
+        self,
+        table_names: list[str],
+        response_type: str,
+        direction: SearchDirection,
+    ) -> dict[str, list[str]]:
+        """Search nodes of many tables recursively and return simple results
+
+        Each table has a bit of a mask, and masks are propagated
+        to reachable tables in a single traversal from all tables.
+        The results of a table are the tables, or URIs of templates that lead
+        from the tables, whose masks have its bit.
+
+        Args:
+            table_names (list[str]): Table names
+            response_type (str): Response type value
+            direction (SearchDirection): Search direction
+
+        Returns:
+            dict[str, list[str]]: Search results of each table
+        """
+        index = (
+            self._upstairs_index
+            if direction == SearchDirection.UP
+            else self._downstairs_index
+        )
+
+        # Depth-first search from all tables, to sort tables topologically
+        postorder: list[str] = []
+        visited_tables: set[str] = set()
+        cyclic_tables: set[str] = set()
+        for table_name in table_names:
+            if table_name in visited_tables:
+                continue
+            visited_tables.add(table_name)
+            # Tables on the current path
+            searched_tables: dict[str, None] = {table_name: None}
+            stack: list[tuple[str, Iterator[str]]] = [
+                (table_name, iter(index.get(table_name, {})))
+            ]
+            while stack:
+                current_table_name, relatives = stack[-1]
+                next_table_name = next(relatives, None)
+                if next_table_name is None:
+                    stack.pop()
+                    searched_tables.popitem()
+                    postorder.append(current_table_name)
+                    continue
+                if not index[current_table_name][next_table_name]:
+                    continue
+                if next_table_name in searched_tables:
+                    cyclic_tables.add(current_table_name)
+                elif next_table_name not in visited_tables:
+                    visited_tables.add(next_table_name)
+                    searched_tables[next_table_name] = None
+                    stack.append(
+                        (next_table_name, iter(index.get(next_table_name, {})))
                     )
-                    response = response + next_response
 
-                if response_type == ResponseType.TABLE.value:
-                    response.append(next_table_name)
-                elif response_type == ResponseType.URI.value:
-                    uri = template.get(MapKey.URI)
-                    if uri:
-                        response.append(uri)
+        masks: dict[str, int] = dict.fromkeys(postorder, 0)
+        for i, table_name in enumerate(table_names):
+            masks[table_name] |= 1 << i
+
+        # Propagate masks again while they change, only if there are cycles
+        changed = True
+        while changed:
+            changed = False
+            for table_name in reversed(postorder):
+                mask = masks[table_name]
+                for next_table_name, templates in index.get(table_name, {}).items():
+                    if (
+                        templates
+                        and masks[next_table_name] | mask != masks[next_table_name]
+                    ):
+                        masks[next_table_name] |= mask
+                        changed = True
+            if not cyclic_tables:
+                break
+
+        results: list[set[str]] = [set() for _ in table_names]
+        for table_name, mask in masks.items():
+            items: set[str] = set()
+            if response_type == ResponseType.TABLE.value:
+                items = {table_name}
+            elif response_type == ResponseType.URI.value:
+                items = {
+                    template[MapKey.URI]
+                    for templates in index.get(table_name, {}).values()
+                    for template in templates
+                    if template.get(MapKey.URI)
+                }
+            while mask:
+                bit = mask & -mask
+                results[bit.bit_length() - 1].update(items)
+                mask ^= bit
+
+        cyclic_mask = 0
+        for table_name in cyclic_tables:
+            cyclic_mask |= masks[table_name]
+
+        search_results: dict[str, list[str]] = {}
+        for i, table_name in enumerate(table_names):
+            if response_type == ResponseType.URI.value and cyclic_mask >> i & 1:
+                # Templates of circular references depend on the paths to them
+                search_results[table_name] = self.search_plain(
+                    table_name=table_name,
+                    recursive=True,
+                    response_type=response_type,
+                    direction=direction,
+                )
+                continue
+            if response_type == ResponseType.TABLE.value:
+                results[i].discard(table_name)
+            search_results[table_name] = sorted(results[i])
+        return search_results
 
-        return sorted(list(set(response)))
+    def find_cycles(self) -> list[list[str]]:
+        """Find circular references by Tarjan's strongly connected components
+
+        Returns:
+            list[list[str]]: Tables of each circular reference
+        """
+        indexes: dict[str, int] = {}
+        lowlinks: dict[str, int] = {}
+        component_stack: list[str] = []
+        on_component_stack: set[str] = set()
+        cycles: list[list[str]] = []
+
+        for root_table_name in list(self._upstairs_index.keys()):
+            if root_table_name in indexes:
+                continue
+
+            stack: list[tuple[str, Iterator[str]]] = []
+            table_name: str | None = root_table_name
+            while True:
+                if table_name is not None:
+                    indexes[table_name] = lowlinks[table_name] = len(indexes)
+                    component_stack.append(table_name)
+                    on_component_stack.add(table_name)
+                    stack.append((table_name, self.iterate_upstairs(table_name)))
+
+                current_table_name, upstairs = stack[-1]
+                table_name = next(upstairs, None)
+                if table_name is not None:
+                    if table_name in indexes:
+                        if table_name in on_component_stack:
+                            lowlinks[current_table_name] = min(
+                                lowlinks[current_table_name], indexes[table_name]
+                            )
+                        table_name = None
+                    continue
+
+                stack.pop()
+                if lowlinks[current_table_name] == indexes[current_table_name]:
+                    component: list[str] = []
+                    while True:
+                        member = component_stack.pop()
+                        on_component_stack.remove(member)
+                        component.append(member)
+                        if member == current_table_name:
+                            break
+                    if len(component) > 1 or self._upstairs_index.get(
+                        current_table_name, {}
+                    ).get(current_table_name):
+                        cycles.append(sorted(component))
+
+                if not stack:
+                    break
+                parent_table_name = stack[-1][0]
+                lowlinks[parent_table_name] = min(
+                    lowlinks[parent_table_name], lowlinks[current_table_name]
+                )
+
+        return sorted(cycles)
+
+    def iterate_upstairs(self, table_name: str) -> Iterator[str]:
+        """Iterate upstairs that templates lead to
+
+        Args:
+            table_name (str): Table name
+
+        Yields:
+            Iterator[str]: Upstairs table names
+        """
+        for upstair_name, templates in self._upstairs_index.get(table_name, {}).items():
+            if templates:
+                yield upstair_name
+
+    def create_search_frame(
+        self,
+        table_name: str,
+        direction: SearchDirection,
+        templates: list[dict[str, Any]] | None = None,
+    ) -> SearchFrame:
+        """Create a frame to search relatives of the specified table
+
+        Args:
+            table_name (str): Table name
+            direction (SearchDirection): Search direction
+            templates (list[dict[str, Any]], optional):
+                Templates that lead to the table. Defaults to None.
+
+        Returns:
+            SearchFrame: Search frame
+        """
+        relative_map = self.create_relative_map(
+            target_table_name=table_name, direction=direction
+        )
+        return SearchFrame(
+            table_name=table_name,
+            relatives=iter(relative_map.items()),
+            templates=templates or [],
+        )
 
     def create_relative_map(
         self, target_table_name: str, direction: SearchDirection
@@ -596,21 +1209,41 @@ class StairLight:
         """
         relative_map: dict[str, list[dict[str, Any]]] = {}
         if direction == SearchDirection.UP:
-            upstairs = self._mapped.get(target_table_name, {})
-            for upstair_name, mapped_templates in upstairs.items():
-                relative_map[upstair_name] = [
-                    asdict(mapped_template) for mapped_template in mapped_templates
-                ]
+            relative_map = dict(self._upstairs_index.get(target_table_name, {}))
         elif direction == SearchDirection.DOWN:
-            for table_name, upstairs in self._mapped.items():
-                for upstair_name, mapped_templates in upstairs.items():
-                    if mapped_templates and upstair_name == target_table_name:
-                        relative_map[table_name] = [
-                            asdict(mapped_template)
-                            for mapped_template in mapped_templates
-                        ]
+            relative_map = dict(self._downstairs_index.get(target_table_name, {}))
         return relative_map
 
+    def index_map(
+        self, mapped: dict[str, dict[str, list[MappedTemplate] | None] | None]
+    ) -> None:
+        """Index tables in both directions to look up relatives in constant time
+
+        Entries are taken from the merged map, so indexing a map that has just
+        been merged into it keeps the indexes up to date.
+
+        Args:
+            mapped (dict): Mapped results that have been added to the map
+        """
+        for table_name, upstairs in mapped.items():
+            for upstair_name in (upstairs or {}).keys():
+                mapped_templates = self._mapped[table_name][upstair_name] or []
+                templates: list[dict[str, Any]] = [
+                    (
+                        asdict(mapped_template)
+                        if isinstance(mapped_template, MappedTemplate)
+                        else mapped_template
+                    )
+                    for mapped_template in mapped_templates
+                ]
+                self._upstairs_index.setdefault(table_name, {})[
+                    upstair_name
+                ] = templates
+                if templates:
+                    self._downstairs_index.setdefault(upstair_name, {})[
+                        table_name
+                    ] = templates
+
     def find_tables_by_labels(self, target_labels: list[str]) -> list[str]:
         """Find tables by labels
 
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import pathlib
+import re
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Iterator
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class WatchTarget:
+    path: str
+    regex: str
+
+
+class Watcher:
+    """Polls files and reports changes"""
+
+    def __init__(
+        self,
+        targets: list[WatchTarget],
+        interval: float = 1.0,
+        debounce: float = 0.5,
+    ) -> None:
+        """Polls files and reports changes
+
+        Args:
+            targets (list[WatchTarget]):
+                Directories or files, and regexes of files to watch
+            interval (float, optional): Polling interval in seconds. Defaults to 1.0.
+            debounce (float, optional):
+                Seconds to wait until files stop changing. Defaults to 0.5.
+        """
+        self.targets = targets
+        self.interval = interval
+        self.debounce = debounce
+
+    @property
+    def targets(self) -> list[WatchTarget]:
+        """Return targets
+
+        Returns:
+            list[WatchTarget]: Directories or files, and regexes of files to watch
+        """
+        return self._targets
+
+    @targets.setter
+    def targets(self, targets: list[WatchTarget]) -> None:
+        self._targets = targets
+        self._patterns = [re.compile(rf"{target.regex}") for target in targets]
+
+    def snapshot(self) -> dict[str, tuple[int, int]]:
+        """Take modification times and sizes of watched files
+
+        Returns:
+            dict[str, tuple[int, int]]: Modification times and sizes by path
+        """
+        results: dict[str, tuple[int, int]] = {}
+        for target, pattern in zip(self.targets, self._patterns):
+            root = pathlib.Path(target.path)
+            paths = [root] if root.is_file() else root.glob("**/*")
+            for p in paths:
+                if not pattern.fullmatch(str(p)):
+                    continue
+                try:
+                    stat = p.stat()
+                except OSError:
+                    continue
+                if p.is_dir():
+                    continue
+                results[str(p)] = (stat.st_mtime_ns, stat.st_size)
+        return results
+
+    @staticmethod
+    def find_changes(
+        before: dict[str, tuple[int, int]], after: dict[str, tuple[int, int]]
+    ) -> list[str]:
+        """Find added, changed or deleted files
+
+        Args:
+            before (dict[str, tuple[int, int]]): Previous snapshot
+            after (dict[str, tuple[int, int]]): Current snapshot
+
+        Returns:
+            list[str]: Paths of changed files
+        """
+        return sorted(
+            path
+            for path in before.keys() | after.keys()
+            if before.get(path) != after.get(path)
+        )
+
+    def watch(self) -> Iterator[list[str]]:
+        """Wait for changes of watched files
+
+        Changes are debounced, so that saving many files at once
+        is reported only once.
+
+        Yields:
+            Iterator[list[str]]: Paths of changed files
+        """
+        previous = self.snapshot()
+        while True:
+            time.sleep(self.interval)
+            current = self.snapshot()
+            changes = self.find_changes(before=previous, after=current)
+            if not changes:
+                continue
+
+            while True:
+                time.sleep(self.debounce)
+                settled = self.snapshot()
+                more_changes = self.find_changes(before=current, after=settled)
+                if not more_changes:
+                    break
+                changes = sorted(set(changes) | set(more_changes))
+                current = settled
+
+            previous = current
+            logger.info(f"{len(changes)} files changed")
+            yield changes
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import json
 import pathlib
+import shutil
+import subprocess
 from typing import Any, OrderedDict
 
 import pytest
@@ -215,3 +218,246 @@ class TestDbtTemplateSource:
             target=target,
             vars=vars,
         )
+
+
+class TestDbtTemplateSourceCompile:
+    @pytest.fixture(scope="function")
+    def project_dir(self, tmp_path) -> str:
+        project_dir = tmp_path / "project_01"
+        shutil.copytree("tests/dbt/project_01", project_dir)
+        shutil.copy("tests/dbt/profiles.yml", tmp_path)
+        return str(project_dir)
+
+    @pytest.fixture(scope="function")
+    def execute_dbt_compile(self, mocker, project_dir: str):
+        def compile(**kwargs):
+            pathlib.Path(project_dir, "target/compiled").mkdir(parents=True)
+            return 0
+
+        return mocker.patch(
+            "src.stairlight.source.dbt.template.DbtTemplateSource.execute_dbt_compile",
+            side_effect=compile,
+        )
+
+    def create_dbt_template_source(
+        self,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        project_dir: str,
+        no_compile: bool = False,
+    ) -> DbtTemplateSource:
+        return DbtTemplateSource(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            include=StairlightConfigIncludeDbt(
+                TemplateSourceType=TemplateSourceType.DBT.value,
+                ProjectDir=project_dir,
+                ProfilesDir=str(pathlib.Path(project_dir).parent),
+                Target="prod",
+            ),
+            no_compile=no_compile,
+        )
+
+    def test_compile_skipped(
+        self,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        project_dir: str,
+        execute_dbt_compile,
+    ):
+        dbt_template_source = self.create_dbt_template_source(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            project_dir=project_dir,
+        )
+        dbt_project_config = dbt_template_source.read_dbt_project_yml(
+            project_dir=project_dir
+        )
+        for _ in range(2):
+            dbt_template_source.compile(
+                project_dir=project_dir,
+                profiles_dir=str(pathlib.Path(project_dir).parent),
+                dbt_project_config=dbt_project_config,
+            )
+        assert execute_dbt_compile.call_count == 1
+
+        # A changed model is compiled again
+        shutil.rmtree(pathlib.Path(project_dir, "target/compiled"))
+        model = next(pathlib.Path(project_dir, "models").glob("**/*.sql"))
+        model.write_text(model.read_text() + "\n")
+        dbt_template_source.compile(
+            project_dir=project_dir,
+            profiles_dir=str(pathlib.Path(project_dir).parent),
+            dbt_project_config=dbt_project_config,
+        )
+        assert execute_dbt_compile.call_count == 2
+
+    def test_create_compile_fingerprint(
+        self,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        project_dir: str,
+    ):
+        dbt_template_source = self.create_dbt_template_source(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            project_dir=project_dir,
+        )
+        dbt_project_config = dbt_template_source.read_dbt_project_yml(
+            project_dir=project_dir
+        )
+        fingerprint = dbt_template_source.create_compile_fingerprint(
+            project_dir=project_dir,
+            profiles_dir=str(pathlib.Path(project_dir).parent),
+            dbt_project_config=dbt_project_config,
+        )
+        dbt_template_source._include.Vars = OrderedDict({"key_a": "changed"})
+        assert fingerprint != dbt_template_source.create_compile_fingerprint(
+            project_dir=project_dir,
+            profiles_dir=str(pathlib.Path(project_dir).parent),
+            dbt_project_config=dbt_project_config,
+        )
+
+    def test_prepare(
+        self,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        project_dir: str,
+        execute_dbt_compile,
+    ):
+        dbt_template_source = self.create_dbt_template_source(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            project_dir=project_dir,
+        )
+        dbt_template_source.prepare()
+        _ = list(dbt_template_source.search_templates())
+        assert execute_dbt_compile.call_count == 1
+
+    def test_execute_dbt_compile_failed(
+        self,
+        mocker,
+        caplog,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        project_dir: str,
+    ):
+        mocker.patch(
+            "src.stairlight.source.dbt.template.subprocess.run",
+            side_effect=subprocess.CalledProcessError(
+                returncode=1, cmd="dbt compile", output="Compilation Error\n"
+            ),
+        )
+        dbt_template_source = self.create_dbt_template_source(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            project_dir=project_dir,
+        )
+        with pytest.raises(subprocess.CalledProcessError):
+            dbt_template_source.execute_dbt_compile(
+                project_dir=project_dir, profiles_dir="tests/dbt"
+            )
+        assert "Compilation Error" in caplog.text
+
+    def test_search_templates_no_compile(
+        self,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        project_dir: str,
+        execute_dbt_compile,
+    ):
+        dbt_template_source = self.create_dbt_template_source(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            project_dir=project_dir,
+            no_compile=True,
+        )
+        _ = list(dbt_template_source.search_templates())
+        execute_dbt_compile.assert_not_called()
+
+
+class TestDbtTemplateSourceManifest:
+    @pytest.fixture(scope="function")
+    def dbt_template_source(
+        self,
+        tmp_path,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+    ) -> DbtTemplateSource:
+        project_dir = tmp_path / "project_01"
+        shutil.copytree("tests/dbt/project_01", project_dir)
+        nodes = {
+            "model.project_01.example_a": {
+                "resource_type": "model",
+                "package_name": "project_01",
+                "original_file_path": "models/a/example_a.sql",
+                "compiled_path": "target/compiled/project_01/models/a/example_a.sql",
+                "compiled_code": "SELECT * FROM PROJECT.DATASET.TABLE_A",
+            },
+            "model.project_01.example_b": {
+                "resource_type": "model",
+                "package_name": "project_01",
+                "original_file_path": "models/b/example_b.sql",
+                "compiled_sql": "SELECT * FROM PROJECT.DATASET.TABLE_B",
+            },
+            "test.project_01.not_null": {
+                "resource_type": "test",
+                "package_name": "project_01",
+                "original_file_path": "models/example/schema.yml",
+                "compiled_code": "SELECT 1",
+            },
+            "model.other.example_c": {
+                "resource_type": "model",
+                "package_name": "other",
+                "original_file_path": "models/c/example_c.sql",
+                "compiled_code": "SELECT 1",
+            },
+        }
+        (project_dir / "target").mkdir()
+        (project_dir / "target/manifest.json").write_text(json.dumps({"nodes": nodes}))
+        return DbtTemplateSource(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            include=StairlightConfigIncludeDbt(
+                TemplateSourceType=TemplateSourceType.DBT.value,
+                ProjectDir=str(project_dir),
+                ProfilesDir="tests/dbt",
+            ),
+            no_compile=True,
+        )
+
+    def test_search_templates(self, dbt_template_source: DbtTemplateSource):
+        project_dir = dbt_template_source._include.ProjectDir
+        templates = list(dbt_template_source.search_templates())
+        assert [template.key for template in templates] == [
+            f"{project_dir}/target/compiled/project_01/models/a/example_a.sql",
+            f"{project_dir}/target/compiled/project_01/models/b/example_b.sql",
+        ]
+        assert [template.get_template_str() for template in templates] == [
+            "SELECT * FROM PROJECT.DATASET.TABLE_A",
+            "SELECT * FROM PROJECT.DATASET.TABLE_B",
+        ]
+
+    def test_search_templates_not_compiled(
+        self, caplog, dbt_template_source: DbtTemplateSource
+    ):
+        project_dir = pathlib.Path(str(dbt_template_source._include.ProjectDir))
+        compiled_dir = project_dir / "target/compiled/project_01/models"
+        compiled_dir.mkdir(parents=True)
+        (compiled_dir / "compiled.sql").write_text("SELECT * FROM PROJECT.DATASET.C")
+        nodes = {
+            f"model.project_01.{name}": {
+                "resource_type": "model",
+                "package_name": "project_01",
+                "original_file_path": f"models/{name}.sql",
+            }
+            for name in ("compiled", "not_compiled")
+        }
+        (project_dir / "target/manifest.json").write_text(json.dumps({"nodes": nodes}))
+
+        templates = list(dbt_template_source.search_templates())
+        assert [template.key for template in templates] == [
+            str(compiled_dir / "compiled.sql")
+        ]
+        assert templates[0].get_template_str() == "SELECT * FROM PROJECT.DATASET.C"
+        assert "not_compiled.sql is not compiled" in caplog.text
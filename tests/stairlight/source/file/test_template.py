@@ -4,6 +4,7 @@ from typing import Any
 
 import pytest
 
+from src.stairlight.cache import FileManifest
 from src.stairlight.configurator import Configurator
 from src.stairlight.source.config import (
     ConfigAttributeNotFoundException,
@@ -456,3 +457,47 @@ class TestFileTemplateSourceConfigKeyNotFound:
         assert exception.value.args[0] == (
             f"FileSystemPath is not found. {file_template_source._include}"
         )
+
+
+class TestFileTemplateManifest:
+    @pytest.fixture(scope="function")
+    def template_file(self, tmp_path) -> str:
+        template_file = tmp_path / "a.sql"
+        template_file.write_text("SELECT * FROM {{ table }}")
+        return str(template_file)
+
+    def create_template(
+        self, mapping_config: MappingConfig, key: str, manifest: FileManifest
+    ) -> FileTemplate:
+        return FileTemplate(mapping_config=mapping_config, key=key, manifest=manifest)
+
+    def test_unchanged(self, mocker, tmp_path, mapping_config, template_file):
+        manifest = FileManifest(cache_dir=str(tmp_path))
+        template = self.create_template(mapping_config, template_file, manifest)
+        fingerprint = template.get_template_fingerprint()
+        assert template.find_jinja_params() == ["table"]
+        manifest.save()
+
+        manifest = FileManifest(cache_dir=str(tmp_path))
+        manifest.load()
+        spy = mocker.spy(FileTemplate, "get_template_str")
+        template = self.create_template(mapping_config, template_file, manifest)
+        assert template.get_template_fingerprint() == fingerprint
+        assert template.find_jinja_params() == ["table"]
+        assert spy.call_count == 0
+        assert manifest.hits == 1
+
+    def test_changed(self, tmp_path, mapping_config, template_file):
+        manifest = FileManifest(cache_dir=str(tmp_path))
+        template = self.create_template(mapping_config, template_file, manifest)
+        fingerprint = template.get_template_fingerprint()
+        manifest.save()
+
+        with open(template_file, "a") as f:
+            f.write(" WHERE {{ condition }}")
+        manifest = FileManifest(cache_dir=str(tmp_path))
+        manifest.load()
+        template = self.create_template(mapping_config, template_file, manifest)
+        assert template.get_template_fingerprint() != fingerprint
+        assert template.find_jinja_params() == ["table", "condition"]
+        assert manifest.changed == 1
@@ -1,6 +1,36 @@
-from src.stairlight.source.gcs.map import get_gcs_blob
+from typing import Iterator
 
+import pytest
 
-def test_get_gcs_blob(mocker):
-    mocker.patch("src.stairlight.source.gcs.map.Client.get_bucket")
+from src.stairlight.source.gcs.map import (
+    clear_gcs_clients,
+    get_gcs_blob,
+    get_gcs_bucket,
+    get_gcs_client,
+)
+
+
+@pytest.fixture(scope="function")
+def mock_client(mocker) -> Iterator:
+    clear_gcs_clients()
+    yield mocker.patch("src.stairlight.source.gcs.map.Client")
+    clear_gcs_clients()
+
+
+def test_get_gcs_blob(mock_client):
+    assert get_gcs_blob(uri="gs://stairlight/expected/test.json")
+
+
+def test_get_gcs_client(mock_client):
+    assert get_gcs_client(project="a") is get_gcs_client(project="a")
+    assert mock_client.call_count == 1
+    get_gcs_client(project="b")
+    assert mock_client.call_count == 2
+
+
+def test_get_gcs_bucket(mock_client):
+    bucket = get_gcs_bucket(bucket_name="stairlight")
+    assert get_gcs_bucket(bucket_name="stairlight") is bucket
     assert get_gcs_blob(uri="gs://stairlight/expected/test.json")
+    mock_client.return_value.bucket.assert_called_once_with("stairlight")
+    mock_client.return_value.get_bucket.assert_not_called()
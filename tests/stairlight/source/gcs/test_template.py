@@ -157,6 +157,41 @@ class TestGcsTemplateSource:
             result.append(file)
         assert len(result) > 0
 
+    def test_search_templates_reuse_blobs(
+        self, mocker, gcs_template_source: GcsTemplateSource
+    ):
+        blob = mocker.MagicMock()
+        blob.name = "sql/cte/cte_multi_line.sql"
+        blob.download_as_bytes.return_value = b"SELECT 1"
+        get_gcs_client = mocker.patch(
+            "src.stairlight.source.gcs.template.get_gcs_client"
+        )
+        get_gcs_client.return_value.list_blobs.return_value = [blob]
+        get_gcs_bucket = mocker.patch(
+            "src.stairlight.source.gcs.template.get_gcs_bucket"
+        )
+        templates = list(gcs_template_source.search_templates())
+        assert [template.get_template_str() for template in templates] == ["SELECT 1"]
+        get_gcs_bucket.assert_not_called()
+        get_gcs_client.return_value.list_blobs.assert_called_once_with(
+            "stairlight", prefix="sql/"
+        )
+
+    @pytest.mark.parametrize(
+        ("generation", "md5_hash", "expected"),
+        [(3, "abc", "3"), (None, "abc", "abc"), (None, None, None)],
+        ids=["generation", "md5_hash", "none"],
+    )
+    def test_get_validator(
+        self,
+        mocker,
+        generation: int | None,
+        md5_hash: str | None,
+        expected: str | None,
+    ):
+        blob = mocker.MagicMock(generation=generation, md5_hash=md5_hash)
+        assert GcsTemplateSource.get_validator(blob=blob) == expected
+
     @pytest.mark.integration
     def test_search_templates_integration(self, gcs_template_source: GcsTemplateSource):
         result = []
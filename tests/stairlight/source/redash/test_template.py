@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import os
+import pathlib
 from collections import OrderedDict
-from typing import Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, Optional
 
 import pytest
+from sqlalchemy import create_engine, text
 from sqlalchemy.exc import ArgumentError
 
+from src.stairlight.cache import RedashSyncManifest, TemplateBodyCache
 from src.stairlight.configurator import Configurator
 from src.stairlight.source.config import MappingConfig, MappingConfigMappingTable
 from src.stairlight.source.config_key import StairlightConfigKey as SlKey
@@ -15,10 +19,43 @@ from src.stairlight.source.redash.template import (
     RedashTemplate,
     RedashTemplateSource,
     TemplateSourceType,
+    clear_redash_engines,
+    get_redash_engine,
+    parse_updated_at,
 )
 from src.stairlight.source.template import Template
 
 
+@pytest.fixture(autouse=True)
+def clear_engines() -> Iterator[None]:
+    clear_redash_engines()
+    yield
+    clear_redash_engines()
+
+
+def create_redash_database(path: pathlib.Path) -> str:
+    """Create a SQLite database that has tables of Redash"""
+    connection_str = f"sqlite:///{path}"
+    with create_engine(connection_str).begin() as conn:
+        conn.execute(text("CREATE TABLE data_sources (id INT, name TEXT)"))
+        conn.execute(
+            text(
+                "CREATE TABLE queries (id INT, name TEXT, query TEXT, "
+                "data_source_id INT, updated_at TEXT, is_archived BOOLEAN)"
+            )
+        )
+        conn.execute(text("INSERT INTO data_sources VALUES (1, 'metadata')"))
+        conn.execute(text("INSERT INTO data_sources VALUES (2, 'other')"))
+        for query_id, data_source_id in zip(range(1, 8), [1] * 6 + [2]):
+            conn.execute(
+                text(
+                    f"INSERT INTO queries VALUES ({query_id}, 'q', 'SELECT 1', "
+                    f"{data_source_id}, '2024-01-01T00:00:00', 0)"
+                )
+            )
+    return connection_str
+
+
 @pytest.mark.parametrize(
     (
         "query_id",
@@ -79,12 +116,52 @@ class TestRedashTemplate:
             break
         assert actual == expected
 
+    def test_find_mapped_table_attributes_mappings(
+        self, redash_template: RedashTemplate
+    ):
+        mapping_config = MappingConfig(
+            Mapping=[
+                OrderedDict(
+                    {
+                        "TemplateSourceType": "Redash",
+                        "DataSourceName": redash_template.data_source_name,
+                        "QueryId": redash_template.query_id,
+                        "Tables": [{"TableName": table_name}],
+                    }
+                )
+                for table_name in ("FIRST", "SECOND")
+            ]
+        )
+        redash_template._mapping_config = mapping_config
+        assert [
+            table_attributes.TableName
+            for table_attributes in redash_template.find_mapped_table_attributes()
+        ] == ["FIRST", "SECOND"]
+
     def test_get_template_str(self, redash_template: RedashTemplate):
         assert redash_template.get_template_str() == "SELECT * FROM {{ table }}"
 
     def test_render(self, redash_template, params: RedashTemplate):
         assert redash_template.render(params=params) == "SELECT * FROM dashboards"
 
+    def test_read_template_str_same_name(self, redash_template: RedashTemplate):
+        other_template = RedashTemplate(
+            mapping_config=redash_template._mapping_config,
+            query_id=redash_template.query_id + 1,
+            query_name=redash_template.uri,
+            query_str="SELECT * FROM queries",
+            data_source_name=redash_template.data_source_name,
+        )
+        body_cache = TemplateBodyCache(max_size=100)
+        redash_template.body_cache = body_cache
+        other_template.body_cache = body_cache
+        assert redash_template.read_template_str() == "SELECT * FROM {{ table }}"
+        assert other_template.read_template_str() == "SELECT * FROM queries"
+        assert (
+            redash_template.get_template_fingerprint()
+            != other_template.get_template_fingerprint()
+        )
+
 
 @pytest.mark.parametrize(
     ("env_key", "path", "expected_conn_str"),
@@ -145,7 +222,107 @@ class TestRedashTemplateSource:
         redash_template_source: RedashTemplateSource,
     ):
         mocker.patch("src.stairlight.source.redash.template.create_engine")
-        _ = redash_template_source.get_redash_queries()
+        _ = list(redash_template_source.get_redash_queries())
+
+    def test_get_redash_queries_streamed(
+        self,
+        monkeypatch,
+        tmp_path,
+        redash_template_source: RedashTemplateSource,
+        env_key: str,
+    ):
+        connection_str = create_redash_database(path=tmp_path / "redash.db")
+        monkeypatch.setenv(env_key, connection_str)
+        redash_template_source._include.BatchSize = 2
+
+        queries = redash_template_source.get_redash_queries()
+        assert next(queries)[0] == 1
+        assert [query[0] for query in queries] == [3, 5]
+
+    def test_sync_redash_queries(
+        self,
+        mocker,
+        monkeypatch,
+        tmp_path,
+        redash_template_source: RedashTemplateSource,
+        env_key: str,
+    ):
+        connection_str = create_redash_database(path=tmp_path / "redash.db")
+        monkeypatch.setenv(env_key, connection_str)
+        redash_template_source._include.Incremental = True
+
+        def sync() -> dict[int, str]:
+            manifest = RedashSyncManifest(cache_dir=str(tmp_path))
+            manifest.load()
+            redash_template_source._manifest = manifest
+            templates = {
+                template.query_id: template.get_template_str()
+                for template in redash_template_source.search_templates()
+            }
+            manifest.save()
+            return templates
+
+        assert sync() == {1: "SELECT 1", 3: "SELECT 1", 5: "SELECT 1"}
+
+        with create_engine(connection_str).begin() as conn:
+            conn.execute(
+                text(
+                    "UPDATE queries SET query = 'SELECT 2', "
+                    "updated_at = '2024-01-02T00:00:00' WHERE id = 3"
+                )
+            )
+            conn.execute(
+                text(
+                    "UPDATE queries SET is_archived = 1, "
+                    "updated_at = '2024-01-02T00:00:00' WHERE id = 5"
+                )
+            )
+        get_redash_queries = mocker.spy(redash_template_source, "get_redash_queries")
+        assert sync() == {1: "SELECT 1", 3: "SELECT 2"}
+        assert get_redash_queries.call_args.kwargs["updated_at"] == datetime(
+            2024, 1, 1, tzinfo=timezone.utc
+        )
+
+        # The later time as a string is the earlier one as a time
+        with create_engine(connection_str).begin() as conn:
+            conn.execute(
+                text(
+                    "UPDATE queries SET data_source_id = 2, "
+                    "updated_at = '2024-01-03T01:00:00+02:00' WHERE id = 1"
+                )
+            )
+            conn.execute(
+                text(
+                    "UPDATE queries SET query = 'SELECT 3', "
+                    "updated_at = '2024-01-02T23:30:00' WHERE id = 3"
+                )
+            )
+        assert sync() == {3: "SELECT 3"}
+        assert get_redash_queries.call_args.kwargs["updated_at"] == datetime(
+            2024, 1, 2, tzinfo=timezone.utc
+        )
+        manifest = RedashSyncManifest(cache_dir=str(tmp_path))
+        manifest.load()
+        state = manifest.get(key=redash_template_source.get_sync_key())
+        assert state and state.UpdatedAt == "2024-01-02T23:30:00+00:00"
+
+    @pytest.mark.parametrize(
+        ("query_id", "data_source_name", "expected"),
+        [(1, "metadata", True), (2, "metadata", False), (1, "other", False)],
+    )
+    def test_is_included(
+        self,
+        redash_template_source: RedashTemplateSource,
+        query_id: int,
+        data_source_name: str,
+        expected: bool,
+    ):
+        assert (
+            redash_template_source.is_included(
+                query_id=query_id, data_source_name=data_source_name
+            )
+            == expected
+        )
 
     def test_build_query_string_data_source(
         self,
@@ -206,3 +383,24 @@ class TestRedashTemplateSourceConfigKeyNotFound:
         with pytest.raises(ArgumentError) as exception:
             next(iter)
         assert exception
+
+
+@pytest.mark.parametrize(
+    "updated_at",
+    [
+        datetime(2024, 1, 2, 9, tzinfo=timezone(timedelta(hours=9))),
+        datetime(2024, 1, 2),
+        "2024-01-02 00:00:00",
+        "2024-01-02T00:00:00Z",
+        "2024-01-01T22:00:00-02:00",
+    ],
+    ids=["aware", "naive", "space", "utc", "offset"],
+)
+def test_parse_updated_at(updated_at: Any):
+    assert parse_updated_at(updated_at) == datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+def test_get_redash_engine(tmp_path):
+    connection_str = f"sqlite:///{tmp_path}/redash.db"
+    engine = get_redash_engine(connection_str=connection_str)
+    assert get_redash_engine(connection_str=connection_str) is engine
@@ -1,6 +1,43 @@
-from src.stairlight.source.s3.map import get_s3_object
+from typing import Iterator
 
+import boto3
+import pytest
+from moto import mock_aws
 
-def test_get_s3_object(mocker):
-    mocker.patch("src.stairlight.source.s3.map.boto3.resource")
-    assert get_s3_object(uri="gs://stairlight/expected/test.json")
+from src.stairlight.source.controller import LoadMapController, SaveMapController
+from src.stairlight.source.s3.map import (
+    clear_s3_client,
+    get_s3_client,
+    split_s3_uri,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_client() -> Iterator[None]:
+    clear_s3_client()
+    yield
+    clear_s3_client()
+
+
+def test_split_s3_uri():
+    assert split_s3_uri(uri="s3://stairlight/expected/test.json") == (
+        "stairlight",
+        "expected/test.json",
+    )
+
+
+def test_get_s3_client(mocker):
+    session = mocker.patch("src.stairlight.source.s3.map.boto3.session.Session")
+    assert get_s3_client() is get_s3_client()
+    assert session.return_value.client.call_count == 1
+
+
+@mock_aws
+def test_save_and_load():
+    boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="stairlight")
+    mapped: dict[str, dict] = {"PROJECT_A.DATASET_A.TABLE_A": {}}
+    SaveMapController(
+        save_file="s3://stairlight/expected/test.json", mapped=mapped
+    ).save()
+    loaded = LoadMapController(load_file="s3://stairlight/expected/test.json").load()
+    assert loaded == mapped
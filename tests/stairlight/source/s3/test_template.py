@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Iterator
 
 import boto3
 import pytest
 from moto import mock_aws
 
+from src.stairlight.cache import ObjectManifest
 from src.stairlight.configurator import Configurator
 from src.stairlight.source.config import (
     ConfigAttributeNotFoundException,
@@ -14,6 +15,7 @@ from src.stairlight.source.config import (
 )
 from src.stairlight.source.config_key import StairlightConfigKey
 from src.stairlight.source.s3.config import StairlightConfigIncludeS3
+from src.stairlight.source.s3.map import clear_s3_client
 from src.stairlight.source.s3.template import (
     S3_URI_SCHEME,
     S3Template,
@@ -24,6 +26,14 @@ from src.stairlight.source.s3.template import (
 BUCKET_NAME = "stairlight"
 
 
+@pytest.fixture(autouse=True)
+def clear_client() -> Iterator[None]:
+    # A shared client keeps credentials given by the mock that created it
+    clear_s3_client()
+    yield
+    clear_s3_client()
+
+
 @pytest.mark.parametrize(
     ("bucket", "key", "params", "ignore_params", "expected"),
     [
@@ -156,6 +166,125 @@ class TestS3TemplateSource:
             result.append(file)
         assert len(result) > 0
 
+    @mock_aws
+    def test_search_templates_prefetched(
+        self,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        mocker,
+    ):
+        s3_client = boto3.resource("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket=BUCKET_NAME)
+        s3_bucket = s3_client.Bucket(BUCKET_NAME)
+        for i in range(5):
+            s3_bucket.upload_file(
+                "tests/sql/gcs/cte/cte_multi_line.sql", f"sql/cte_multi_line_{i}.sql"
+            )
+        _include = StairlightConfigIncludeS3(
+            **{
+                StairlightConfigKey.TEMPLATE_SOURCE_TYPE: TemplateSourceType.S3.value,
+                StairlightConfigKey.S3.BUCKET_NAME: BUCKET_NAME,
+                StairlightConfigKey.REGEX: "sql/.*/*.sql",
+            }
+        )
+        s3_template_source = S3TemplateSource(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            include=_include,
+            max_downloads=2,
+        )
+        result = list(s3_template_source.search_templates())
+        assert [template.key for template in result] == [
+            f"sql/cte_multi_line_{i}.sql" for i in range(5)
+        ]
+
+        # Prefetched strings are read without another request
+        spy = mocker.spy(S3Template, "get_template_str")
+        with open("tests/sql/gcs/cte/cte_multi_line.sql") as f:
+            assert result[0].read_template_str() == f.read()
+        assert spy.call_count == 0
+
+    @mock_aws
+    def test_search_templates_unchanged(
+        self,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        mocker,
+        tmp_path,
+    ):
+        s3_client = boto3.resource("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket=BUCKET_NAME)
+        s3_bucket = s3_client.Bucket(BUCKET_NAME)
+        for key in ("sql/a.sql", "sql/b.sql"):
+            s3_bucket.put_object(Key=key, Body=b"SELECT * FROM {{ table }}")
+        _include = StairlightConfigIncludeS3(
+            **{
+                StairlightConfigKey.TEMPLATE_SOURCE_TYPE: TemplateSourceType.S3.value,
+                StairlightConfigKey.S3.BUCKET_NAME: BUCKET_NAME,
+                StairlightConfigKey.REGEX: "sql/.*/*.sql",
+            }
+        )
+
+        def search(max_downloads: int) -> dict[str, list[str]]:
+            manifest = ObjectManifest(cache_dir=str(tmp_path))
+            manifest.load()
+            s3_template_source = S3TemplateSource(
+                stairlight_config=stairlight_config,
+                mapping_config=mapping_config,
+                include=_include,
+                max_downloads=max_downloads,
+                manifest=manifest,
+            )
+            params = {
+                template.key: template.find_jinja_params()
+                for template in s3_template_source.search_templates()
+            }
+            manifest.save()
+            return params
+
+        assert search(max_downloads=2) == {
+            "sql/a.sql": ["table"],
+            "sql/b.sql": ["table"],
+        }
+
+        # Only the changed object is downloaded again
+        s3_bucket.put_object(Key="sql/b.sql", Body=b"SELECT * FROM {{ view }}")
+        spy = mocker.spy(S3Template, "get_template_str")
+        assert search(max_downloads=2) == {
+            "sql/a.sql": ["table"],
+            "sql/b.sql": ["view"],
+        }
+        assert spy.call_count == 1
+        assert spy.call_args.args[0].key == "sql/b.sql"
+
+    @mock_aws
+    def test_search_templates_prefix(
+        self,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        mocker,
+    ):
+        s3_client = boto3.resource("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket=BUCKET_NAME)
+        s3_bucket = s3_client.Bucket(BUCKET_NAME)
+        for key in ("sql/a.sql", "logs/b.sql"):
+            s3_bucket.put_object(Key=key, Body=b"SELECT 1")
+        _include = StairlightConfigIncludeS3(
+            **{
+                StairlightConfigKey.TEMPLATE_SOURCE_TYPE: TemplateSourceType.S3.value,
+                StairlightConfigKey.S3.BUCKET_NAME: BUCKET_NAME,
+                StairlightConfigKey.REGEX: "^sql/.*\\.sql$",
+            }
+        )
+        s3_template_source = S3TemplateSource(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            include=_include,
+        )
+        is_skipped = mocker.spy(s3_template_source, "is_skipped")
+        assert [t.key for t in s3_template_source.search_templates()] == ["sql/a.sql"]
+        assert is_skipped.call_count == 1
+
     @pytest.mark.integration
     def test_search_templates_integration(self, s3_template_source: S3TemplateSource):
         result = []
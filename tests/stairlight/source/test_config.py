@@ -1,6 +1,14 @@
 from typing import OrderedDict
 
-from src.stairlight.source.config import MappingConfig
+import pytest
+
+from src.stairlight.source.config import (
+    MappingConfig,
+    StairlightConfig,
+    compile_merged_patterns,
+    find_regex_prefix,
+)
+from src.stairlight.source.file.config import MappingConfigMappingFile
 
 
 class TestMappingConfigEmpty:
@@ -15,3 +23,203 @@ class TestMappingConfigEmpty:
     def test_get_extra_labels(self):
         mapping_config = MappingConfig(Mapping=[OrderedDict({})])
         assert mapping_config.get_extra_labels()
+
+
+class TestMappingConfigIndex:
+    @pytest.fixture(scope="class")
+    def mapping_config(self) -> MappingConfig:
+        return MappingConfig(
+            Mapping=[
+                OrderedDict(
+                    {
+                        "TemplateSourceType": "File",
+                        "FileSuffix": "sql/cte.sql",
+                        "Tables": [{"TableName": "CTE"}],
+                    }
+                ),
+                OrderedDict(
+                    {
+                        "TemplateSourceType": "File",
+                        "FileSuffix": "cte.sql",
+                        "Tables": [{"TableName": "SHORTER"}],
+                    }
+                ),
+                OrderedDict(
+                    {
+                        "TemplateSourceType": "GCS",
+                        "Uri": "gs://stairlight/sql/a.sql",
+                        "Tables": [{"TableName": "GCS"}],
+                    }
+                ),
+                OrderedDict(
+                    {
+                        "TemplateSourceType": "dbt",
+                        "FileSuffix": "a.sql",
+                        "Tables": [{"TableName": "DBT"}],
+                    }
+                ),
+                OrderedDict(
+                    {
+                        "TemplateSourceType": "Redash",
+                        "DataSourceName": "metadata",
+                        "QueryId": 5,
+                        "Tables": [{"TableName": "REDASH"}],
+                    }
+                ),
+                OrderedDict(
+                    {
+                        "TemplateSourceType": "Redash",
+                        "DataSourceName": "metadata",
+                        "QueryId": 5,
+                        "Tables": [{"TableName": "DUPLICATED"}],
+                    }
+                ),
+            ]
+        )
+
+    @pytest.mark.parametrize(
+        ("key", "uri", "expected"),
+        [
+            ("tests/sql/cte.sql", "", "CTE"),
+            ("tests/cte.sql", "", "SHORTER"),
+            ("sql/a.sql", "gs://stairlight/sql/a.sql", "GCS"),
+            ("sql/a.sql", "", "DBT"),
+            ("sql/b.sql", "", None),
+        ],
+    )
+    def test_find_mapping(
+        self,
+        mapping_config: MappingConfig,
+        key: str,
+        uri: str,
+        expected: str | None,
+    ):
+        mapping = mapping_config.find_mapping(key=key, uri=uri)
+        actual = next(mapping.get_table()).TableName if mapping else None
+        assert actual == expected
+
+    @pytest.mark.parametrize(
+        ("data_source_name", "query_id", "expected"),
+        [
+            ("metadata", 5, ["REDASH", "DUPLICATED"]),
+            ("metadata", 6, []),
+            ("other", 5, []),
+        ],
+    )
+    def test_find_redash_mappings(
+        self,
+        mapping_config: MappingConfig,
+        data_source_name: str,
+        query_id: int,
+        expected: list[str],
+    ):
+        actual = [
+            next(mapping.get_table()).TableName
+            for mapping in mapping_config.find_redash_mappings(
+                data_source_name=data_source_name, query_id=query_id
+            )
+        ]
+        assert actual == expected
+
+    def test_get_index(self, mapping_config: MappingConfig):
+        assert mapping_config.get_index() is mapping_config.get_index()
+
+    def test_find_mapping_empty_suffix(self):
+        mapping_config = MappingConfig(
+            Mapping=[
+                OrderedDict(
+                    {"TemplateSourceType": "File", "FileSuffix": "", "Tables": []}
+                ),
+                OrderedDict(
+                    {"TemplateSourceType": "File", "FileSuffix": "a.sql", "Tables": []}
+                ),
+            ]
+        )
+        mapping = mapping_config.find_mapping(key="sql/a.sql", uri="")
+        assert isinstance(mapping, MappingConfigMappingFile)
+        assert mapping.FileSuffix == ""
+
+
+class TestStairlightConfigExclude:
+    @pytest.fixture(scope="class")
+    def stairlight_config(self) -> StairlightConfig:
+        return StairlightConfig(
+            Exclude=[
+                {"TemplateSourceType": "File", "Regex": "main_process.sql$"},
+                {"TemplateSourceType": "File", "Regex": r"^tests/sql/exclude/"},
+                {"TemplateSourceType": "S3", "Regex": "sql/exclude.sql$"},
+            ]
+        )
+
+    @pytest.mark.parametrize(
+        ("source_type", "key", "expected"),
+        [
+            ("File", "tests/sql/main_process.sql", True),
+            ("File", "tests/sql/exclude/a.sql", True),
+            ("File", "tests/sql/cte.sql", False),
+            ("File", "sql/exclude.sql", False),
+            ("S3", "sql/exclude.sql", True),
+            ("GCS", "sql/exclude.sql", False),
+        ],
+    )
+    def test_get_exclude_patterns(
+        self,
+        stairlight_config: StairlightConfig,
+        source_type: str,
+        key: str,
+        expected: bool,
+    ):
+        patterns = stairlight_config.get_exclude_patterns(source_type=source_type)
+        assert len(patterns) <= 1
+        assert any(pattern.search(key) for pattern in patterns) == expected
+
+
+class TestCompileMergedPatterns:
+    def test_merged(self):
+        patterns = compile_merged_patterns(regexes=["a$", "^b"])
+        assert len(patterns) == 1
+        assert patterns[0].search("xa")
+        assert patterns[0].search("bx")
+        assert not patterns[0].search("ab")
+
+    def test_backreference(self):
+        patterns = compile_merged_patterns(regexes=["a$", r"(b)\1", "^c"])
+        assert len(patterns) == 2
+        assert any(pattern.search("xbb") for pattern in patterns)
+        assert not any(pattern.search("xbc") for pattern in patterns)
+
+    def test_inline_flags(self):
+        patterns = compile_merged_patterns(regexes=["(?i)a$", "^b"])
+        assert len(patterns) == 2
+        assert any(pattern.search("xA") for pattern in patterns)
+
+    def test_inline_flags_not_merged(self):
+        patterns = compile_merged_patterns(regexes=["ABC", "(?i)xyz", "^d"])
+        assert len(patterns) == 2
+        assert any(pattern.search("XYZ") for pattern in patterns)
+        assert not any(pattern.search("abc") for pattern in patterns)
+        assert not any(pattern.search("D") for pattern in patterns)
+
+    def test_scoped_inline_flags(self):
+        patterns = compile_merged_patterns(regexes=["ABC", "(?i:xyz)"])
+        assert len(patterns) == 1
+        assert patterns[0].search("XYZ")
+        assert not patterns[0].search("abc")
+
+
+@pytest.mark.parametrize(
+    ("regex", "expected"),
+    [
+        ("^sql/.*/*\\.sql$", "sql/"),
+        ("sql/cte/.*", "sql/cte/"),
+        ("sql\\.d/x+", "sql.d/x"),
+        ("sql/a?b", "sql/"),
+        ("sql/a{2}", "sql/"),
+        ("sql/\\d+", "sql/"),
+        ("sql/(a|b)/.*", ""),
+        ("(?i)sql/.*", ""),
+        (None, ""),
+    ],
+)
+def test_find_regex_prefix(regex: str | None, expected: str):
+    assert find_regex_prefix(regex=regex) == expected
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import threading
+
+from src.stairlight.source.config import MappingConfig
+from src.stairlight.source.template import (
+    Template,
+    TemplateSource,
+    TemplateSourceType,
+    compile_jinja_template,
+)
+
+
+class CountedTemplate(Template):
+    def __init__(self, mapping_config: MappingConfig, key: str) -> None:
+        super().__init__(
+            mapping_config=mapping_config,
+            key=key,
+            source_type=TemplateSourceType.FILE,
+        )
+        self.read_threads: list[str] = []
+
+    def get_uri(self) -> str:
+        return self.key
+
+    def get_template_str(self) -> str:
+        self.read_threads.append(threading.current_thread().name)
+        return f"SELECT * FROM {self.key}"
+
+
+class TestCompileJinjaTemplate:
+    def test_reused(self):
+        template_str = "SELECT * FROM {{ table }} WHERE id = {{ id }}"
+        template = compile_jinja_template(template_str=template_str)
+        assert compile_jinja_template(template_str=template_str) is template
+        assert (
+            template.render({"table": "a", "id": 1}) == "SELECT * FROM a WHERE id = 1"
+        )
+        assert (
+            template.render({"table": "b", "id": 2}) == "SELECT * FROM b WHERE id = 2"
+        )
+
+    def test_different(self):
+        assert compile_jinja_template(
+            template_str="SELECT {{ a }}"
+        ) is not compile_jinja_template(template_str="SELECT {{ b }}")
+
+
+class TestPrefetchTemplates:
+    def test_prefetched(self, mapping_config: MappingConfig):
+        templates = [
+            CountedTemplate(mapping_config=mapping_config, key=f"TABLE_{i}")
+            for i in range(10)
+        ]
+        result = list(
+            TemplateSource.prefetch_templates(
+                templates=iter(templates), max_downloads=3
+            )
+        )
+        assert result == templates
+        for template in templates:
+            assert template.read_template_str() == f"SELECT * FROM {template.key}"
+            assert len(template.read_threads) == 1
+            assert template.read_threads[0] != threading.current_thread().name
+
+    def test_not_prefetched(self, mapping_config: MappingConfig):
+        templates = [CountedTemplate(mapping_config=mapping_config, key="TABLE_A")]
+        result = list(
+            TemplateSource.prefetch_templates(
+                templates=iter(templates), max_downloads=1
+            )
+        )
+        assert result == templates
+        assert templates[0].read_threads == []
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from src.stairlight.cache import (
+    FileManifest,
+    FileManifestEntry,
+    ObjectManifest,
+    ObjectManifestEntry,
+    ParseCache,
+    RedashSyncManifest,
+    RedashSyncState,
+    TemplateBodyCache,
+)
+from src.stairlight.query import UpstairTableReference
+
+REFERENCES = [
+    UpstairTableReference(
+        TableName="PROJECT_X.DATASET_X.TABLE_X",
+        Line={
+            "LineNumber": 1,
+            "LineString": "SELECT * FROM PROJECT_X.DATASET_X.TABLE_X",
+        },
+    )
+]
+
+
+def create_key(
+    template_type: str = "FileTemplate",
+    template_fingerprint: str = "0123456789abcdef",
+    params: dict[str, Any] | None = None,
+    ignore_params: list[str] | None = None,
+    default_table_prefix: str | None = None,
+    query_parser: str = "regex",
+) -> str:
+    return ParseCache.create_key(
+        template_type=template_type,
+        template_fingerprint=template_fingerprint,
+        params=params or {"table": "PROJECT_X.DATASET_X.TABLE_X"},
+        ignore_params=ignore_params,
+        default_table_prefix=default_table_prefix,
+        query_parser=query_parser,
+    )
+
+
+class TestCreateKey:
+    def test_deterministic(self):
+        assert create_key() == create_key()
+
+    @pytest.mark.parametrize(
+        ("attributes"),
+        [
+            {"template_type": "S3Template"},
+            {"template_fingerprint": "fedcba9876543210"},
+            {"params": {"table": "PROJECT_X.DATASET_X.TABLE_Y"}},
+            {"ignore_params": ["table"]},
+            {"default_table_prefix": "PROJECT_Y"},
+            {"query_parser": "tokenizer"},
+        ],
+        ids=[
+            "template_type",
+            "template_fingerprint",
+            "params",
+            "ignore_params",
+            "default_table_prefix",
+            "query_parser",
+        ],
+    )
+    def test_changed(self, attributes: dict):
+        assert create_key(**attributes) != create_key()
+
+
+class TestParseCache:
+    def test_save_and_load(self, tmp_path):
+        parse_cache = ParseCache(cache_dir=str(tmp_path))
+        parse_cache.set(key="a", references=REFERENCES)
+        parse_cache.save()
+
+        loaded = ParseCache(cache_dir=str(tmp_path))
+        loaded.load()
+        assert loaded.get(key="a") == REFERENCES
+        assert loaded.get(key="b") is None
+        assert loaded.hits == 1
+
+    def test_save_used_entries(self, tmp_path):
+        parse_cache = ParseCache(cache_dir=str(tmp_path))
+        parse_cache.set(key="a", references=REFERENCES)
+        parse_cache.set(key="b", references=[])
+        parse_cache.save()
+
+        second = ParseCache(cache_dir=str(tmp_path))
+        second.load()
+        second.get(key="b")
+        second.save()
+
+        third = ParseCache(cache_dir=str(tmp_path))
+        third.load()
+        assert third.get(key="a") is None
+        assert third.get(key="b") == []
+
+    def test_load_broken_file(self, tmp_path):
+        (tmp_path / ParseCache.FILE_NAME).write_text("{")
+        parse_cache = ParseCache(cache_dir=str(tmp_path))
+        parse_cache.load()
+        assert parse_cache.get(key="a") is None
+
+    def test_load_other_version(self, tmp_path):
+        (tmp_path / ParseCache.FILE_NAME).write_text(
+            json.dumps(
+                {
+                    "Version": ParseCache.VERSION + 1,
+                    "Entries": {"a": []},
+                }
+            )
+        )
+        parse_cache = ParseCache(cache_dir=str(tmp_path))
+        parse_cache.load()
+        assert parse_cache.get(key="a") is None
+
+
+class TestFileManifest:
+    @pytest.fixture(scope="function")
+    def manifest(self, tmp_path) -> FileManifest:
+        manifest = FileManifest(cache_dir=str(tmp_path))
+        for path in ("a.sql", "b.sql", "c.sql"):
+            manifest.set(
+                path=path,
+                entry=FileManifestEntry(MTime=1, Size=10, Hash=path, Parameters=[]),
+            )
+        manifest.save()
+        manifest = FileManifest(cache_dir=str(tmp_path))
+        manifest.load()
+        return manifest
+
+    def test_get(self, manifest: FileManifest):
+        assert manifest.get(path="a.sql", mtime=1, size=10) == FileManifestEntry(
+            MTime=1, Size=10, Hash="a.sql", Parameters=[]
+        )
+        assert manifest.get(path="b.sql", mtime=2, size=10) is None
+        assert manifest.get(path="c.sql", mtime=1, size=11) is None
+        assert manifest.get(path="d.sql", mtime=1, size=10) is None
+        assert (manifest.hits, manifest.changed, manifest.added) == (1, 2, 1)
+
+    def test_save_drops_deleted_files(self, tmp_path, manifest: FileManifest):
+        manifest.get(path="a.sql", mtime=1, size=10)
+        manifest.save()
+
+        loaded = FileManifest(cache_dir=str(tmp_path))
+        loaded.load()
+        assert loaded.get(path="a.sql", mtime=1, size=10)
+        assert loaded.get(path="b.sql", mtime=1, size=10) is None
+
+
+class TestObjectManifest:
+    def test_get(self, tmp_path):
+        manifest = ObjectManifest(cache_dir=str(tmp_path))
+        for uri in ("s3://a/a.sql", "s3://a/b.sql"):
+            manifest.set(
+                uri=uri,
+                entry=ObjectManifestEntry(Validator="1", Hash=uri, Parameters=["a"]),
+            )
+        manifest.save()
+
+        loaded = ObjectManifest(cache_dir=str(tmp_path))
+        loaded.load()
+        assert loaded.get(uri="s3://a/a.sql", validator="1") == ObjectManifestEntry(
+            Validator="1", Hash="s3://a/a.sql", Parameters=["a"]
+        )
+        assert loaded.get(uri="s3://a/b.sql", validator="2") is None
+        assert loaded.get(uri="s3://a/c.sql", validator="1") is None
+        assert (loaded.hits, loaded.changed, loaded.added) == (1, 1, 1)
+
+
+class TestRedashSyncManifest:
+    def test_get(self, tmp_path):
+        state = RedashSyncState(
+            UpdatedAt="2024-01-01T00:00:00",
+            Queries={"1": [1, "q", "SELECT 1", "metadata"]},
+        )
+        manifest = RedashSyncManifest(cache_dir=str(tmp_path))
+        manifest.set(key="a", state=state)
+        manifest.save()
+
+        loaded = RedashSyncManifest(cache_dir=str(tmp_path))
+        loaded.load()
+        assert loaded.get(key="a") == state
+        assert loaded.get(key="b") is None
+
+
+class TestTemplateBodyCache:
+    def test_get(self):
+        template_body_cache = TemplateBodyCache(max_size=100)
+        fetch = {"a": lambda: "SELECT 1", "b": lambda: "SELECT 2"}
+        assert template_body_cache.get(key="a", fetch=fetch["a"]) == "SELECT 1"
+        assert template_body_cache.get(key="a", fetch=fetch["b"]) == "SELECT 1"
+        assert template_body_cache.get(key="b", fetch=fetch["b"]) == "SELECT 2"
+        assert (template_body_cache.fetches, template_body_cache.hits) == (2, 1)
+
+    def test_evicted(self):
+        template_body_cache = TemplateBodyCache(max_size=10)
+        template_body_cache.get(key="a", fetch=lambda: "a" * 6)
+        template_body_cache.get(key="b", fetch=lambda: "b" * 6)
+        template_body_cache.get(key="c", fetch=lambda: "c" * 11)
+        template_body_cache.get(key="a", fetch=lambda: "a" * 6)
+        template_body_cache.get(key="b", fetch=lambda: "b" * 6)
+        assert template_body_cache.fetches == 5
+        assert template_body_cache.evictions == 3
+
+    def test_clear(self):
+        template_body_cache = TemplateBodyCache(max_size=100)
+        template_body_cache.get(key="a", fetch=lambda: "SELECT 1")
+        template_body_cache.clear()
+        template_body_cache.get(key="a", fetch=lambda: "SELECT 2")
+        assert template_body_cache.get(key="a", fetch=lambda: "") == "SELECT 2"
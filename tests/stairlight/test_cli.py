@@ -63,6 +63,37 @@ class TestSuccess:
         )
         assert not message
 
+    def test_max_workers(self):
+        args = self.parser.parse_args(["--max-workers", "4"])
+        assert args.max_workers == 4
+
+    def test_max_workers_subcommand(self):
+        args = self.parser.parse_args(["up", "-t", "dummy", "--max-workers", "4"])
+        assert args.max_workers == 4
+
+    def test_serve(self):
+        args = self.parser.parse_args(["serve", "--socket", "/tmp/stairlight.sock"])
+        assert args.handler == cli_main.command_serve
+        assert (args.host, args.port, args.socket) == (
+            "127.0.0.1",
+            8642,
+            "/tmp/stairlight.sock",
+        )
+
+    def test_watch(self):
+        args = self.parser.parse_args(["watch", "--interval", "2", "--debounce", "1"])
+        assert args.handler == cli_main.command_watch
+        assert (args.interval, args.debounce) == (2.0, 1.0)
+
+    @pytest.mark.parametrize(
+        "argv",
+        [["watch", "--save", "map.json"], ["--save", "map.json", "watch"]],
+        ids=["after", "before"],
+    )
+    def test_watch_save(self, argv: list[str]):
+        args = self.parser.parse_args(argv)
+        assert args.save == "map.json"
+
     @pytest.mark.integration
     def test_command_up_table(self, stairlight_save: StairLight):
         args = self.parser.parse_args(
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
+import threading
 from collections import OrderedDict
+from typing import Iterator
 
 import pytest
 
+from src.stairlight.cache import FileManifest, ParseCache
+from src.stairlight.configurator import Configurator
 from src.stairlight.map import Map, create_dict_key_list
+from src.stairlight.query import Query
 from src.stairlight.source.config import (
     MappingConfig,
     MappingConfigMappingTable,
     StairlightConfig,
 )
 from src.stairlight.source.config_key import MapKey
-from src.stairlight.source.template import Template, TemplateSourceType
+from src.stairlight.source.file.template import FileTemplate
+from src.stairlight.source.template import Template, TemplateSource, TemplateSourceType
 
 
 @pytest.fixture(scope="session")
@@ -36,6 +42,11 @@ def dependency_map_single(
     return dependency_map
 
 
+@pytest.fixture(scope="session")
+def stairlight_config_file(configurator: Configurator) -> StairlightConfig:
+    return configurator.read_stairlight(prefix="stairlight_no_exclude")
+
+
 @pytest.mark.integration
 class TestSuccess:
     def test_mapped(self, dependency_map: Map):
@@ -183,6 +194,217 @@ class TestSuccessNoExtraLables:
         assert dependency_map.unmapped
 
 
+class TestConcurrency:
+    @pytest.fixture(scope="class")
+    def dependency_map_serial(
+        self, stairlight_config_file: StairlightConfig, mapping_config: MappingConfig
+    ) -> Map:
+        dependency_map = Map(
+            stairlight_config=stairlight_config_file, mapping_config=mapping_config
+        )
+        dependency_map.write()
+        return dependency_map
+
+    @pytest.fixture(scope="class")
+    def dependency_map_concurrent(
+        self, stairlight_config_file: StairlightConfig, mapping_config: MappingConfig
+    ) -> Map:
+        dependency_map = Map(
+            stairlight_config=stairlight_config_file,
+            mapping_config=mapping_config,
+            max_workers=4,
+        )
+        dependency_map.write()
+        return dependency_map
+
+    @pytest.fixture(scope="class")
+    def dependency_map_processes(
+        self, stairlight_config_file: StairlightConfig, mapping_config: MappingConfig
+    ) -> Map:
+        dependency_map = Map(
+            stairlight_config=stairlight_config_file,
+            mapping_config=mapping_config,
+            max_workers=4,
+            max_processes=2,
+        )
+        dependency_map.PARSING_CHUNK_SIZE = 2
+        dependency_map.write()
+        return dependency_map
+
+    def test_mapped(self, dependency_map_serial: Map, dependency_map_concurrent: Map):
+        assert dependency_map_concurrent.mapped
+        assert dependency_map_concurrent.mapped == dependency_map_serial.mapped
+
+    def test_mapped_order(
+        self, dependency_map_serial: Map, dependency_map_concurrent: Map
+    ):
+        assert list(dependency_map_concurrent.mapped.keys()) == list(
+            dependency_map_serial.mapped.keys()
+        )
+
+    def test_mapped_processes(
+        self, dependency_map_serial: Map, dependency_map_processes: Map
+    ):
+        assert dependency_map_processes.mapped == dependency_map_serial.mapped
+        assert list(dependency_map_processes.mapped.keys()) == list(
+            dependency_map_serial.mapped.keys()
+        )
+
+    def test_unmapped(self, dependency_map_serial: Map, dependency_map_concurrent: Map):
+        assert [
+            (unmapped[MapKey.TEMPLATE].key, unmapped[MapKey.PARAMETERS])
+            for unmapped in dependency_map_concurrent.unmapped
+        ] == [
+            (unmapped[MapKey.TEMPLATE].key, unmapped[MapKey.PARAMETERS])
+            for unmapped in dependency_map_serial.unmapped
+        ]
+
+
+class TestParseCache:
+    def create_map(
+        self,
+        stairlight_config: StairlightConfig,
+        mapping_config: MappingConfig,
+        cache_dir: str,
+    ) -> Map:
+        parse_cache = ParseCache(cache_dir=cache_dir)
+        parse_cache.load()
+        file_manifest = FileManifest(cache_dir=cache_dir)
+        file_manifest.load()
+        dependency_map = Map(
+            stairlight_config=stairlight_config,
+            mapping_config=mapping_config,
+            parse_cache=parse_cache,
+            file_manifest=file_manifest,
+        )
+        dependency_map.write()
+        return dependency_map
+
+    def test_mapped(
+        self,
+        tmp_path,
+        mocker,
+        stairlight_config_file: StairlightConfig,
+        mapping_config: MappingConfig,
+    ):
+        serial = Map(
+            stairlight_config=stairlight_config_file, mapping_config=mapping_config
+        )
+        serial.write()
+        first = self.create_map(
+            stairlight_config=stairlight_config_file,
+            mapping_config=mapping_config,
+            cache_dir=str(tmp_path),
+        )
+        spy = mocker.spy(Query, "detect_upstair_table_reference")
+        spy_read = mocker.spy(FileTemplate, "get_template_str")
+        second = self.create_map(
+            stairlight_config=stairlight_config_file,
+            mapping_config=mapping_config,
+            cache_dir=str(tmp_path),
+        )
+        assert first.mapped == serial.mapped
+        assert second.mapped == serial.mapped
+        assert second.parse_cache and second.parse_cache.hits > 0
+        assert spy.call_count == 0
+        assert spy_read.call_count == 0
+
+    def test_mapped_processes(
+        self,
+        tmp_path,
+        stairlight_config_file: StairlightConfig,
+        mapping_config: MappingConfig,
+    ):
+        serial = Map(
+            stairlight_config=stairlight_config_file, mapping_config=mapping_config
+        )
+        serial.write()
+        parse_cache = ParseCache(cache_dir=str(tmp_path))
+        dependency_map = Map(
+            stairlight_config=stairlight_config_file,
+            mapping_config=mapping_config,
+            max_processes=2,
+            parse_cache=parse_cache,
+        )
+        dependency_map.write()
+        second = self.create_map(
+            stairlight_config=stairlight_config_file,
+            mapping_config=mapping_config,
+            cache_dir=str(tmp_path),
+        )
+        assert dependency_map.mapped == serial.mapped
+        assert second.mapped == serial.mapped
+
+
+class TestTemplateBodyCache:
+    def test_read_once(
+        self,
+        mocker,
+        stairlight_config_file: StairlightConfig,
+        mapping_config: MappingConfig,
+    ):
+        spy = mocker.spy(FileTemplate, "get_template_str")
+        dependency_map = Map(
+            stairlight_config=stairlight_config_file, mapping_config=mapping_config
+        )
+        dependency_map.write()
+        keys = [call.args[0].key for call in spy.call_args_list]
+        assert keys
+        assert len(keys) == len(set(keys))
+
+    def test_max_workers(
+        self,
+        mocker,
+        stairlight_config_file: StairlightConfig,
+        mapping_config: MappingConfig,
+    ):
+        spy = mocker.spy(FileTemplate, "get_template_str")
+        dependency_map = Map(
+            stairlight_config=stairlight_config_file,
+            mapping_config=mapping_config,
+            max_workers=4,
+        )
+        dependency_map.write()
+        keys = [call.args[0].key for call in spy.call_args_list]
+        assert len(keys) == len(set(keys))
+
+
+class TestPrepareTemplateSources:
+    class PreparedTemplateSource(TemplateSource):
+        def __init__(self, barrier: threading.Barrier, **kwargs) -> None:
+            super().__init__(**kwargs)
+            self.barrier = barrier
+            self.prepared = False
+
+        def prepare(self) -> None:
+            # Every source waits for the others, so it passes only concurrently
+            self.barrier.wait(timeout=5)
+            self.prepared = True
+
+        def search_templates(self) -> Iterator[Template]:
+            yield from []
+
+    def test_prepared_concurrently(
+        self, stairlight_config_file: StairlightConfig, mapping_config: MappingConfig
+    ):
+        barrier = threading.Barrier(3)
+        template_sources = [
+            self.PreparedTemplateSource(
+                barrier=barrier,
+                stairlight_config=stairlight_config_file,
+                mapping_config=mapping_config,
+            )
+            for _ in range(3)
+        ]
+        dependency_map = Map(
+            stairlight_config=stairlight_config_file,
+            mapping_config=mapping_config,
+            max_dbt_compiles=3,
+        )
+        dependency_map.prepare_template_sources(template_sources=template_sources)
+        assert all(template_source.prepared for template_source in template_sources)
+
+
 def test_create_dict_key_list():
     d = {
         "params": {
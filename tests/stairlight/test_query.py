@@ -2,7 +2,12 @@ from __future__ import annotations
 
 import pytest
 
-from src.stairlight.query import Query, UpstairTableReference, solve_table_prefix
+from src.stairlight.query import (
+    Query,
+    QueryParser,
+    UpstairTableReference,
+    solve_table_prefix,
+)
 from src.stairlight.source.config import MapKey
 
 
@@ -330,10 +335,11 @@ class TestSuccess:
             "tests/sql/extract_date_from_timestamp.sql",
         ],
     )
-    def test_detect_upstairs_attributes(self, file, expected):
+    @pytest.mark.parametrize("parser", list(QueryParser), ids=str)
+    def test_detect_upstairs_attributes(self, file, expected, parser: QueryParser):
         with open(file) as f:
             query_str = f.read()
-        query = Query(query_str=query_str)
+        query = Query(query_str=query_str, parser=parser.value)
         actual = []
         for result in query.detect_upstair_table_reference():
             actual.append(result)
@@ -362,3 +368,48 @@ class TestSuccess:
             table=table, default_table_prefix=default_table_prefix
         )
         assert actual == expected
+
+
+class TestTokenizer:
+    def detect(self, query_str: str) -> list[tuple[str, int]]:
+        query = Query(query_str=query_str, parser=QueryParser.TOKENIZER.value)
+        return [
+            (result.TableName, result.Line[MapKey.LINE_NUMBER])
+            for result in query.detect_upstair_table_reference()
+        ]
+
+    def test_comments_and_strings(self):
+        query_str = (
+            "/* SELECT * FROM PROJECT_X.DATASET_X.TABLE_X */\n"
+            "SELECT 'FROM PROJECT_X.DATASET_X.TABLE_Y' AS a\n"
+            "FROM PROJECT_X.DATASET_X.TABLE_Z -- JOIN PROJECT_X.DATASET_X.TABLE_W\n"
+        )
+        assert self.detect(query_str=query_str) == [("PROJECT_X.DATASET_X.TABLE_Z", 3)]
+
+    def test_functions(self):
+        query_str = (
+            "SELECT EXTRACT(DATE FROM ts), SUBSTRING(name FROM 2)\n"
+            "FROM PROJECT_X.DATASET_X.TABLE_X, UNNEST(items)\n"
+            "JOIN ML.PREDICT(MODEL m, TABLE t)\n"
+            "WHERE id IN (SELECT id FROM PROJECT_X.DATASET_X.TABLE_Y)"
+        )
+        assert self.detect(query_str=query_str) == [
+            ("PROJECT_X.DATASET_X.TABLE_X", 2),
+            ("PROJECT_X.DATASET_X.TABLE_Y", 4),
+        ]
+
+    def test_lines_of_references_only(self):
+        query_str = (
+            "WITH TABLE_X AS (SELECT * FROM PROJECT_X.DATASET_X.TABLE_X)\n"
+            "SELECT TABLE_X.id, PROJECT_X.DATASET_X.TABLE_X\n"
+            "FROM TABLE_X\n"
+            "JOIN PROJECT_X.DATASET_X.TABLE_X USING (id)"
+        )
+        assert self.detect(query_str=query_str) == [
+            ("PROJECT_X.DATASET_X.TABLE_X", 1),
+            ("PROJECT_X.DATASET_X.TABLE_X", 4),
+        ]
+
+    def test_invalid_parser(self):
+        with pytest.raises(ValueError):
+            Query(query_str="SELECT 1", parser="invalid")
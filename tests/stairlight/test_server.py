@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import http.client
+import json
+import pathlib
+import socket
+import threading
+from typing import Iterator
+
+import pytest
+
+from src.stairlight import StairLight
+from src.stairlight.server import RequestError, create_server, respond, serve
+
+TABLE = "PROJECT_j.DATASET_k.TABLE_l"
+
+
+@pytest.fixture(scope="module")
+def stairlight_file() -> StairLight:
+    stairlight = StairLight(
+        config_dir="tests/config", stairlight_config_prefix="stairlight_no_exclude"
+    )
+    stairlight.create_map()
+    return stairlight
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str) -> None:
+        super().__init__("localhost")
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def request(connection: http.client.HTTPConnection, path: str) -> tuple[int, dict]:
+    connection.request("GET", path)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+class TestRespond:
+    def test_list(self, stairlight_file: StairLight):
+        assert respond(
+            stairlight=stairlight_file, path="/list", query={}
+        ) == stairlight_file.list_(response_type="table")
+
+    @pytest.mark.parametrize(
+        ("path", "query", "expected"),
+        [
+            ("/up", {"table": [TABLE]}, {}),
+            ("/up", {"table": [TABLE], "recursive": ["true"]}, {"recursive": True}),
+            ("/down", {"table": [TABLE], "output": ["uri"]}, {"response_type": "uri"}),
+            ("/down", {"table": [TABLE], "verbose": ["1"]}, {"verbose": True}),
+        ],
+        ids=["up", "up_recursive", "down_uri", "down_verbose"],
+    )
+    def test_search(
+        self, stairlight_file: StairLight, path: str, query: dict, expected: dict
+    ):
+        func = stairlight_file.up if path == "/up" else stairlight_file.down
+        assert respond(stairlight=stairlight_file, path=path, query=query) == func(
+            table_name=TABLE, **expected
+        )
+
+    def test_search_labels(self, stairlight_file: StairLight):
+        assert respond(
+            stairlight=stairlight_file, path="/up", query={"label": ["Test:b"]}
+        ) == [
+            stairlight_file.up(table_name=table_name)
+            for table_name in stairlight_file.find_tables_by_labels(["Test:b"])
+        ]
+
+    def test_search_tables(self, stairlight_file: StairLight):
+        other = "PROJECT_u.DATASET_u.TABLE_u"
+        assert respond(
+            stairlight=stairlight_file, path="/down", query={"table": [TABLE, other]}
+        ) == [
+            stairlight_file.down(table_name=TABLE),
+            stairlight_file.down(table_name=other),
+        ]
+
+    @pytest.mark.parametrize(
+        ("path", "query", "status"),
+        [
+            ("/map", {}, 404),
+            ("/up", {}, 400),
+            ("/up", {"table": [TABLE], "output": ["json"]}, 400),
+        ],
+        ids=["not_found", "no_table", "invalid_output"],
+    )
+    def test_error(
+        self, stairlight_file: StairLight, path: str, query: dict, status: int
+    ):
+        with pytest.raises(RequestError) as e:
+            respond(stairlight=stairlight_file, path=path, query=query)
+        assert e.value.status == status
+
+
+class TestServer:
+    @pytest.fixture(scope="class")
+    def http_server(self, stairlight_file: StairLight) -> Iterator[tuple[str, int]]:
+        server = create_server(stairlight=stairlight_file, port=0)
+        thread = threading.Thread(target=serve, kwargs={"server": server})
+        thread.start()
+        # A TCP server listens on a host and a port
+        assert isinstance(server.server_address, tuple)
+        yield server.server_address[0], server.server_address[1]
+        server.shutdown()
+        thread.join()
+
+    @pytest.fixture(scope="class")
+    def unix_server(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        stairlight_file: StairLight,
+    ) -> Iterator[str]:
+        socket_path = str(tmp_path_factory.mktemp("server") / "stairlight.sock")
+        server = create_server(stairlight=stairlight_file, socket_path=socket_path)
+        thread = threading.Thread(target=serve, kwargs={"server": server})
+        thread.start()
+        yield socket_path
+        server.shutdown()
+        thread.join()
+        assert not pathlib.Path(socket_path).exists()
+
+    def test_http(self, stairlight_file: StairLight, http_server: tuple[str, int]):
+        connection = http.client.HTTPConnection(*http_server)
+        assert request(connection, f"/up?table={TABLE}") == (
+            200,
+            stairlight_file.up(table_name=TABLE),
+        )
+        assert request(connection, "/unknown")[0] == 404
+
+    def test_unix_socket(self, stairlight_file: StairLight, unix_server: str):
+        connection = UnixHTTPConnection(socket_path=unix_server)
+        assert request(connection, f"/down?table={TABLE}&recursive=true") == (
+            200,
+            stairlight_file.down(table_name=TABLE, recursive=True),
+        )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import pathlib
 from typing import Any, Iterator
 
 import pytest
@@ -26,6 +27,91 @@ def stairlight_merge() -> Iterator[StairLight]:
     teardown_rm_file(save_file)
 
 
+def create_templates(table_name: str) -> list[dict[str, Any]]:
+    return [
+        {
+            MapKey.TEMPLATE_SOURCE_TYPE: "File",
+            MapKey.KEY: f"{table_name}.sql",
+            MapKey.URI: f"/sql/{table_name}.sql",
+            MapKey.LINES: [],
+        }
+    ]
+
+
+def create_stairlight_from_map(
+    tmp_path_factory: pytest.TempPathFactory, mapped: dict[str, Any]
+) -> StairLight:
+    load_file = tmp_path_factory.mktemp("map") / "map.json"
+    load_file.write_text(json.dumps(mapped))
+    stairlight = StairLight(config_dir="tests/config", load_files=[str(load_file)])
+    stairlight.create_map()
+    return stairlight
+
+
+def search_by_paths(
+    stairlight: StairLight,
+    table_name: str,
+    direction: SearchDirection,
+    searched_tables: list[str],
+) -> dict[str, Any]:
+    """Search verbose results along every path, without any cache"""
+    results: dict[str, Any] = {}
+    relative_map = stairlight.create_relative_map(
+        target_table_name=table_name, direction=direction
+    )
+    for next_table_name, templates in relative_map.items():
+        if next_table_name in searched_tables:
+            continue
+        results[next_table_name] = {"Templates": templates}
+        if not templates:
+            continue
+        next_results = search_by_paths(
+            stairlight=stairlight,
+            table_name=next_table_name,
+            direction=direction,
+            searched_tables=searched_tables + [next_table_name],
+        )
+        if next_results:
+            results[next_table_name][direction.value] = next_results
+    return results
+
+
+@pytest.fixture(scope="session")
+def stairlight_lattice(tmp_path_factory: pytest.TempPathFactory) -> StairLight:
+    mapped: dict[str, Any] = {}
+
+    # A chain deeper than the recursion limit
+    for i in range(2000):
+        mapped[f"chain_{i}"] = {f"chain_{i + 1}": create_templates(f"chain_{i}")}
+
+    # Diamonds stacked on each other
+    for i in range(40):
+        for j in ("a", "b"):
+            mapped[f"diamond_{i}_{j}"] = {
+                f"diamond_{i + 1}_{k}": create_templates(f"diamond_{i}_{j}")
+                for k in ("a", "b")
+            }
+
+    return create_stairlight_from_map(tmp_path_factory=tmp_path_factory, mapped=mapped)
+
+
+@pytest.fixture(scope="session")
+def stairlight_cyclic(tmp_path_factory: pytest.TempPathFactory) -> StairLight:
+    edges = [
+        ("a", "b"),
+        ("b", "c"),
+        ("c", "a"),
+        ("c", "d"),
+        ("d", "e"),
+        ("e", "e"),
+        ("f", "a"),
+    ]
+    mapped: dict[str, Any] = {}
+    for table_name, upstair_name in edges:
+        mapped.setdefault(table_name, {})[upstair_name] = create_templates(table_name)
+    return create_stairlight_from_map(tmp_path_factory=tmp_path_factory, mapped=mapped)
+
+
 class TestResponseType:
     def test_table(self):
         assert ResponseType.TABLE.value == "table"
@@ -341,3 +427,446 @@ class TestStairLightNoConfig:
 
     def test_has_stairlight_config(self):
         assert not self.stairlight.has_stairlight_config()
+
+
+class TestStairLightIndex:
+    def test_up_merged(self, stairlight_merge: StairLight):
+        result = stairlight_merge.up(
+            table_name="test_project.beam_streaming.taxirides_aggregation"
+        )
+        assert result == [
+            "test_project.beam_streaming.taxirides_realtime",
+            "test_project.beam_streaming.taxirides_realtime_bak",
+        ]
+
+    def test_down_merged(self, stairlight_merge: StairLight):
+        result = stairlight_merge.down(table_name="PROJECT_A.DATASET_A.TABLE_A")
+        assert result == [
+            "PROJECT_A.DATASET_B.TABLE_C",
+            "PROJECT_a.DATASET_b.TABLE_c",
+        ]
+
+    def test_create_relative_map_down_merged(self, stairlight_merge: StairLight):
+        result = stairlight_merge.create_relative_map(
+            target_table_name="PROJECT_C.DATASET_C.TABLE_C",
+            direction=SearchDirection.DOWN,
+        )
+        assert sorted(result.keys()) == [
+            "PROJECT_D.DATASET_E.TABLE_F",
+            "PROJECT_G.DATASET_H.TABLE_I",
+            "PROJECT_d.DATASET_e.TABLE_f",
+        ]
+
+
+class TestStairLightTraversal:
+    def test_up_next_verbose(self, stairlight_merge: StairLight):
+        table_name = "PROJECT_J.DATASET_K.TABLE_L"
+        result = stairlight_merge.up(table_name=table_name, verbose=True)
+        assert isinstance(result, dict)
+        upstairs = result[table_name][SearchDirection.UP.value]
+        assert sorted(upstairs.keys()) == [
+            "PROJECT_P.DATASET_Q.TABLE_R",
+            "PROJECT_S.DATASET_T.TABLE_U",
+            "PROJECT_V.DATASET_W.TABLE_X",
+        ]
+        assert all(upstair["Templates"] for upstair in upstairs.values())
+
+    def test_up_recursive_deep_chain(self, stairlight_lattice: StairLight):
+        result = stairlight_lattice.up(table_name="chain_0", recursive=True)
+        assert len(result) == 2000
+
+    def test_down_recursive_deep_chain(self, stairlight_lattice: StairLight):
+        result = stairlight_lattice.down(
+            table_name="chain_2000",
+            recursive=True,
+            response_type=ResponseType.URI.value,
+        )
+        assert len(result) == 2000
+
+    def test_up_recursive_diamonds(self, stairlight_lattice: StairLight):
+        result = stairlight_lattice.up(table_name="diamond_0_a", recursive=True)
+        assert len(result) == 80
+
+    def test_up_recursive_verbose_diamonds(self, stairlight_lattice: StairLight):
+        table_name = "diamond_38_a"
+        result = stairlight_lattice.up(
+            table_name=table_name, recursive=True, verbose=True
+        )
+        assert isinstance(result, dict)
+        upstairs = result[table_name][SearchDirection.UP.value]
+        assert sorted(upstairs.keys()) == ["diamond_39_a", "diamond_39_b"]
+        assert sorted(upstairs["diamond_39_b"][SearchDirection.UP.value].keys()) == [
+            "diamond_40_a",
+            "diamond_40_b",
+        ]
+
+    def test_up_recursive_verbose_shares_results(self, stairlight_lattice: StairLight):
+        table_name = "diamond_0_a"
+        result = stairlight_lattice.up(
+            table_name=table_name, recursive=True, verbose=True
+        )
+        assert isinstance(result, dict)
+        up = SearchDirection.UP.value
+        upstairs = result[table_name][up]
+        assert (
+            upstairs["diamond_1_a"][up]["diamond_2_a"][up]
+            is upstairs["diamond_1_b"][up]["diamond_2_a"][up]
+        )
+
+    @pytest.mark.parametrize(
+        "edges",
+        [
+            [("r", "a"), ("r", "b"), ("a", "b"), ("b", "a")],
+            [("r", "a"), ("a", "b"), ("b", "c"), ("c", "a"), ("r", "c")],
+            [("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("d", "d")],
+            [("r", "a"), ("r", "c"), ("a", "f"), ("f", "c", []), ("c", "a")],
+            [("r", "a"), ("r", "b"), ("a", "s"), ("b", "s"), ("s", "b", [])],
+        ],
+        ids=["reached_twice", "entered_twice", "nested", "without_templates", "leaf"],
+    )
+    @pytest.mark.parametrize("direction", list(SearchDirection), ids=str)
+    def test_search_verbose_same_as_paths(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        edges: list[tuple],
+        direction: SearchDirection,
+    ):
+        mapped: dict[str, Any] = {}
+        for table_name, upstair_name, *templates in edges:
+            mapped.setdefault(table_name, {})[upstair_name] = (
+                templates[0] if templates else create_templates(table_name)
+            )
+        stairlight = create_stairlight_from_map(
+            tmp_path_factory=tmp_path_factory, mapped=mapped
+        )
+        for table_name in sorted({edge[0] for edge in edges}):
+            result = stairlight.search_verbose(
+                table_name=table_name, recursive=True, direction=direction
+            )
+            assert result == {
+                table_name: {
+                    direction.value: search_by_paths(
+                        stairlight=stairlight,
+                        table_name=table_name,
+                        direction=direction,
+                        searched_tables=[table_name],
+                    )
+                }
+            }
+
+    def test_up_recursive_verbose_shares_results_without_templates(
+        self, tmp_path_factory: pytest.TempPathFactory
+    ):
+        mapped = {
+            "r": {"a": create_templates("r"), "b": create_templates("r")},
+            "a": {"s": create_templates("a")},
+            "b": {"s": create_templates("b")},
+            "s": {"x": []},
+        }
+        stairlight = create_stairlight_from_map(
+            tmp_path_factory=tmp_path_factory, mapped=mapped
+        )
+        up = SearchDirection.UP.value
+        result = stairlight.search_verbose(
+            table_name="r", recursive=True, direction=SearchDirection.UP
+        )
+        upstairs = result["r"][up]
+        assert upstairs["a"][up]["s"][up] == {"x": {"Templates": []}}
+        assert upstairs["a"][up]["s"][up] is upstairs["b"][up]["s"][up]
+
+
+class TestStairLightCycles:
+    def test_find_cycles(self, stairlight_cyclic: StairLight):
+        assert stairlight_cyclic.find_cycles() == [["a", "b", "c"], ["e"]]
+
+    def test_find_cycles_merged(self, stairlight_merge: StairLight):
+        assert stairlight_merge.find_cycles() == [
+            ["PROJECT_d.DATASET_e.TABLE_f", "PROJECT_j.DATASET_k.TABLE_l"]
+        ]
+
+    def test_find_cycles_acyclic(self, stairlight_lattice: StairLight):
+        assert stairlight_lattice.find_cycles() == []
+
+    def test_find_cycles_self_without_templates(
+        self, tmp_path_factory: pytest.TempPathFactory
+    ):
+        mapped = {"a": {"a": [], "b": create_templates("a")}}
+        stairlight = create_stairlight_from_map(
+            tmp_path_factory=tmp_path_factory, mapped=mapped
+        )
+        assert stairlight.find_cycles() == []
+
+    def test_up_recursive_cyclic(self, stairlight_cyclic: StairLight):
+        result = stairlight_cyclic.up(table_name="f", recursive=True)
+        assert result == ["a", "b", "c", "d", "e"]
+
+    @pytest.mark.parametrize(
+        ("upstairs", "expected"),
+        [
+            (["a", "b"], ["/sql/a.sql", "/sql/b.sql", "/sql/r.sql"]),
+            (["b", "a"], ["/sql/a.sql", "/sql/b.sql", "/sql/r.sql"]),
+            (["a"], ["/sql/a.sql", "/sql/r.sql"]),
+        ],
+        ids=["a_first", "b_first", "a_only"],
+    )
+    def test_up_recursive_uri_cyclic_reached_twice(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        upstairs: list[str],
+        expected: list[str],
+    ):
+        mapped = {
+            "r": {upstair_name: create_templates("r") for upstair_name in upstairs},
+            "a": {"b": create_templates("a")},
+            "b": {"a": create_templates("b")},
+        }
+        stairlight = create_stairlight_from_map(
+            tmp_path_factory=tmp_path_factory, mapped=mapped
+        )
+        result = stairlight.up(
+            table_name="r", recursive=True, response_type=ResponseType.URI.value
+        )
+        assert result == expected
+
+    def test_up_recursive_verbose_cyclic(self, stairlight_cyclic: StairLight):
+        up = SearchDirection.UP.value
+        result = stairlight_cyclic.up(table_name="a", recursive=True, verbose=True)
+        assert isinstance(result, dict)
+        upstairs_c = result["a"][up]["b"][up]["c"][up]
+        assert sorted(upstairs_c.keys()) == ["d"]
+        assert sorted(upstairs_c["d"][up].keys()) == ["e"]
+
+    def test_up_recursive_verbose_reached_twice(
+        self, tmp_path_factory: pytest.TempPathFactory
+    ):
+        mapped = {
+            "r": {"t": create_templates("r"), "x": create_templates("r")},
+            "t": {"x": create_templates("t")},
+            "x": {"t": create_templates("x")},
+        }
+        stairlight = create_stairlight_from_map(
+            tmp_path_factory=tmp_path_factory, mapped=mapped
+        )
+        up = SearchDirection.UP.value
+        result = stairlight.up(table_name="r", recursive=True, verbose=True)
+        assert isinstance(result, dict)
+        assert list(result["r"][up]["t"][up].keys()) == ["x"]
+        assert up not in result["r"][up]["t"][up]["x"]
+        assert list(result["r"][up]["x"][up].keys()) == ["t"]
+        assert up not in result["r"][up]["x"][up]["t"]
+
+    def test_up_recursive_verbose_without_templates(
+        self, tmp_path_factory: pytest.TempPathFactory
+    ):
+        mapped = {
+            "r": {"a": create_templates("r"), "b": create_templates("r")},
+            "a": {"c": create_templates("a")},
+            "b": {"a": create_templates("b")},
+            "c": {"b": []},
+        }
+        stairlight = create_stairlight_from_map(
+            tmp_path_factory=tmp_path_factory, mapped=mapped
+        )
+        up = SearchDirection.UP.value
+        result = stairlight.up(table_name="r", recursive=True, verbose=True)
+        assert isinstance(result, dict)
+        assert result["r"][up]["a"][up]["c"][up] == {"b": {"Templates": []}}
+        assert up not in result["r"][up]["b"][up]["a"][up]["c"]
+
+
+@pytest.mark.parametrize(
+    ("recursive", "verbose", "response_type"),
+    [
+        (True, False, ResponseType.TABLE.value),
+        (True, False, ResponseType.URI.value),
+        (True, True, ResponseType.TABLE.value),
+        (False, False, ResponseType.TABLE.value),
+        (False, True, ResponseType.TABLE.value),
+    ],
+    ids=["recursive", "recursive_uri", "recursive_verbose", "plain", "verbose"],
+)
+@pytest.mark.parametrize("direction", list(SearchDirection), ids=str)
+class TestStairLightSearchMany:
+    def assert_search_many(
+        self,
+        stairlight: StairLight,
+        table_names: list[str],
+        recursive: bool,
+        verbose: bool,
+        response_type: str,
+        direction: SearchDirection,
+    ):
+        search_results = stairlight.search_many(
+            table_names=table_names,
+            recursive=recursive,
+            verbose=verbose,
+            response_type=response_type,
+            direction=direction,
+        )
+        expected = {
+            table_name: stairlight.search(
+                table_name=table_name,
+                recursive=recursive,
+                verbose=verbose,
+                response_type=response_type,
+                direction=direction,
+            )
+            for table_name in table_names
+        }
+        assert search_results.results == expected
+        if verbose:
+            assert search_results.union == {
+                table_name: result[table_name]
+                for table_name, result in expected.items()
+                if isinstance(result, dict)
+            }
+        else:
+            assert search_results.union == sorted(
+                set().union(*expected.values())  # type: ignore
+            )
+
+    def test_diamonds(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        recursive: bool,
+        verbose: bool,
+        response_type: str,
+        direction: SearchDirection,
+    ):
+        mapped: dict[str, Any] = {}
+        for i in range(5):
+            for j in ("a", "b"):
+                mapped[f"diamond_{i}_{j}"] = {
+                    f"diamond_{i + 1}_{k}": create_templates(f"diamond_{i}_{j}")
+                    for k in ("a", "b")
+                }
+        self.assert_search_many(
+            stairlight=create_stairlight_from_map(
+                tmp_path_factory=tmp_path_factory, mapped=mapped
+            ),
+            table_names=["diamond_0_a", "diamond_3_b", "diamond_3_b", "not_found"],
+            recursive=recursive,
+            verbose=verbose,
+            response_type=response_type,
+            direction=direction,
+        )
+
+    def test_cyclic(
+        self,
+        stairlight_cyclic: StairLight,
+        recursive: bool,
+        verbose: bool,
+        response_type: str,
+        direction: SearchDirection,
+    ):
+        self.assert_search_many(
+            stairlight=stairlight_cyclic,
+            table_names=["a", "c", "d", "f"],
+            recursive=recursive,
+            verbose=verbose,
+            response_type=response_type,
+            direction=direction,
+        )
+
+
+class TestStairLightWatch:
+    @pytest.fixture(scope="function")
+    def stairlight_watch(self, tmp_path: pathlib.Path) -> StairLight:
+        sql_dir = tmp_path / "sql"
+        sql_dir.mkdir()
+        (sql_dir / "a.sql").write_text("SELECT * FROM PROJECT_A.DATASET_A.TABLE_X")
+        (tmp_path / "stairlight.yaml").write_text(
+            "Include:\n"
+            "  - TemplateSourceType: File\n"
+            f"    FileSystemPath: {sql_dir}\n"
+            "    Regex: .*\\.sql\n"
+        )
+        (tmp_path / "mapping.yaml").write_text(
+            "Mapping:\n"
+            "  - TemplateSourceType: File\n"
+            "    FileSuffix: sql/a.sql\n"
+            "    Tables:\n"
+            "      - TableName: PROJECT_A.DATASET_A.TABLE_A\n"
+        )
+        stairlight = StairLight(config_dir=str(tmp_path), keep_caches=True)
+        stairlight.create_map()
+        return stairlight
+
+    def test_find_watch_targets(
+        self, tmp_path: pathlib.Path, stairlight_watch: StairLight
+    ):
+        assert [
+            (target.path, target.regex)
+            for target in stairlight_watch.find_watch_targets()
+        ] == [
+            (str(tmp_path / "mapping.yaml"), ".*"),
+            (str(tmp_path / "stairlight.yaml"), ".*"),
+            (str(tmp_path / "sql"), r".*\.sql"),
+        ]
+
+    def test_watch(self, mocker, tmp_path: pathlib.Path, stairlight_watch: StairLight):
+        edits = [
+            lambda: (tmp_path / "sql" / "b.sql").write_text("SELECT 1"),
+            lambda: (tmp_path / "sql" / "a.sql").write_text(
+                "SELECT * FROM PROJECT_A.DATASET_A.TABLE_Y"
+            ),
+            lambda: None,
+        ]
+        mocker.patch(
+            "src.stairlight.watcher.time.sleep", side_effect=lambda _: edits.pop(0)()
+        )
+        assert stairlight_watch.up(table_name="PROJECT_A.DATASET_A.TABLE_A") == [
+            "PROJECT_A.DATASET_A.TABLE_X"
+        ]
+
+        changes = next(stairlight_watch.watch(interval=0, debounce=0))
+        assert changes == [
+            str(tmp_path / "sql" / "a.sql"),
+            str(tmp_path / "sql" / "b.sql"),
+        ]
+        assert stairlight_watch.up(table_name="PROJECT_A.DATASET_A.TABLE_A") == [
+            "PROJECT_A.DATASET_A.TABLE_Y"
+        ]
+        assert [
+            unmapped[MapKey.TEMPLATE].key for unmapped in stairlight_watch.unmapped
+        ] == [str(tmp_path / "sql" / "b.sql")]
+
+    def test_watch_config(
+        self, mocker, tmp_path: pathlib.Path, stairlight_watch: StairLight
+    ):
+        (tmp_path / "node_modules").mkdir()
+        edits = [
+            lambda: (tmp_path / "node_modules" / "package.yaml").write_text("a: 1"),
+            lambda: (tmp_path / "mapping.yaml").write_text(
+                (tmp_path / "mapping.yaml").read_text().replace("TABLE_A", "TABLE_B")
+            ),
+            lambda: None,
+        ]
+        mocker.patch(
+            "src.stairlight.watcher.time.sleep", side_effect=lambda _: edits.pop(0)()
+        )
+        changes = next(stairlight_watch.watch(interval=0, debounce=0))
+        assert changes == [str(tmp_path / "mapping.yaml")]
+        assert stairlight_watch.up(table_name="PROJECT_A.DATASET_A.TABLE_B") == [
+            "PROJECT_A.DATASET_A.TABLE_X"
+        ]
+
+    def test_watch_save(
+        self, mocker, tmp_path: pathlib.Path, stairlight_watch: StairLight
+    ):
+        save_file = tmp_path / "map.json"
+        stairlight_watch.save_file = str(save_file)
+        edits = [
+            lambda: (tmp_path / "sql" / "a.sql").write_text(
+                "SELECT * FROM PROJECT_A.DATASET_A.TABLE_Y"
+            ),
+            lambda: None,
+        ]
+        mocker.patch(
+            "src.stairlight.watcher.time.sleep", side_effect=lambda _: edits.pop(0)()
+        )
+        next(stairlight_watch.watch(interval=0, debounce=0))
+        saved = json.loads(save_file.read_text())
+        assert list(saved["PROJECT_A.DATASET_A.TABLE_A"]) == [
+            "PROJECT_A.DATASET_A.TABLE_Y"
+        ]
@@ -1,45 +1,6 @@
-import pytest
-
 import src.stairlight.util as st_util
 
 
-class TestIsCyclic:
-    @pytest.mark.parametrize(
-        ("node_list", "expected"),
-        [
-            (["1", "2", "1", "2", "1", "2", "1", "2"], True),
-            (["1", "2", "3", "2", "3", "2", "3"], True),
-            (["1", "2", "3", "4", "5", "3", "4", "5"], True),
-            (["1", "2", "3", "4", "5", "1", "2", "3", "4"], True),
-            (["1", "2", "3", "4", "5"], False),
-            (
-                [
-                    "PROJECT_D.DATASET_E.TABLE_F",
-                    "PROJECT_J.DATASET_K.TABLE_L",
-                    "PROJECT_P.DATASET_Q.TABLE_R",
-                    "PROJECT_S.DATASET_T.TABLE_U",
-                    "PROJECT_V.DATASET_W.TABLE_X",
-                    "PROJECT_C.DATASET_C.TABLE_C",
-                    "PROJECT_d.DATASET_d.TABLE_d",
-                    "PROJECT_J.DATASET_K.TABLE_L",
-                ],
-                True,
-            ),
-        ],
-        ids=[
-            "each",
-            "except_first",
-            "except_first_two",
-            "first_four",
-            "not cyclic",
-            "cyclic_tables",
-        ],
-    )
-    def test_is_cyclic(self, node_list, expected):
-        actual = st_util.is_cyclic(node_list)
-        assert expected == actual
-
-
 class TestDeepMerge:
     def test_success(self):
         original = {
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+from src.stairlight.watcher import Watcher, WatchTarget
+
+
+@pytest.fixture(scope="function")
+def watched_dir(tmp_path: pathlib.Path) -> pathlib.Path:
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.sql").write_text("SELECT 1")
+    (tmp_path / "sub" / "b.sql").write_text("SELECT 2")
+    (tmp_path / "c.txt").write_text("not watched")
+    return tmp_path
+
+
+@pytest.fixture(scope="function")
+def watcher(watched_dir: pathlib.Path) -> Watcher:
+    return Watcher(
+        targets=[WatchTarget(path=str(watched_dir), regex=r".*\.sql")],
+        interval=0,
+        debounce=0,
+    )
+
+
+class TestWatcher:
+    def test_snapshot(self, watched_dir: pathlib.Path, watcher: Watcher):
+        assert sorted(watcher.snapshot().keys()) == [
+            str(watched_dir / "a.sql"),
+            str(watched_dir / "sub" / "b.sql"),
+        ]
+
+    def test_snapshot_file(self, watched_dir: pathlib.Path):
+        watcher = Watcher(
+            targets=[WatchTarget(path=str(watched_dir / "c.txt"), regex=".*")]
+        )
+        assert list(watcher.snapshot().keys()) == [str(watched_dir / "c.txt")]
+        (watched_dir / "c.txt").unlink()
+        assert watcher.snapshot() == {}
+
+    def test_find_changes(self):
+        before = {"a.sql": (1, 1), "b.sql": (1, 1), "c.sql": (1, 1)}
+        after = {"a.sql": (1, 1), "b.sql": (2, 1), "d.sql": (1, 1)}
+        assert Watcher.find_changes(before=before, after=after) == [
+            "b.sql",
+            "c.sql",
+            "d.sql",
+        ]
+
+    def test_watch(self, mocker, watched_dir: pathlib.Path, watcher: Watcher):
+        edits = [
+            lambda: (watched_dir / "a.sql").write_text("SELECT 10"),
+            lambda: (watched_dir / "sub" / "b.sql").unlink(),
+            lambda: None,
+        ]
+        mocker.patch(
+            "src.stairlight.watcher.time.sleep", side_effect=lambda _: edits.pop(0)()
+        )
+        changes = next(watcher.watch())
+        assert changes == [
+            str(watched_dir / "a.sql"),
+            str(watched_dir / "sub" / "b.sql"),
+        ]
+        assert not edits